@@ -1,17 +1,19 @@
-import anthropic
+import threading
+import time
 from typing import List, Optional, Dict, Any
+from llm_transport import LLMTransport, build_anthropic_client
 
 class AIGenerator:
     """Handles interactions with Anthropic's Claude API for generating responses"""
 
     MAX_TOOL_ROUNDS = 2
 
-    # Static system prompt to avoid rebuilding on each call
+    # System prompt template, filled in once per generator with the configured tool round limit
     SYSTEM_PROMPT = """ You are an AI assistant specialized in course materials and educational content with access to a comprehensive search tool for course information.
 
 Search Tool Usage:
 - Use the search tool **only** for questions about specific course content or detailed educational materials
-- You may make up to **2 tool calls** per query when needed (e.g., get an outline then search, or search two different courses)
+- {tool_call_limit} (e.g., get an outline then search, or search two different courses)
 - Prefer a single tool call when possible; use a second only when the first result is insufficient or the question involves multiple courses/topics
 - Synthesize search results into accurate, fact-based responses
 - If search yields no results, state this clearly without offering alternatives
@@ -37,9 +39,44 @@ All responses must be:
 Provide only the direct answer to what was asked.
 """
     
-    def __init__(self, api_key: str, model: str):
-        self.client = anthropic.Anthropic(api_key=api_key)
+    def __init__(self, api_key: str, model: str,
+                 max_connections: int = 20,
+                 connect_timeout: float = 5.0,
+                 read_timeout: float = 60.0,
+                 transport: Optional[LLMTransport] = None,
+                 max_tool_rounds: int = MAX_TOOL_ROUNDS,
+                 early_stop_distance: float = 0.0,
+                 latency_budget: float = 0.0,
+                 token_budget: int = 0,
+                 compact_chars: int = 0):
+        if max_tool_rounds < 1:
+            raise ValueError(f"max_tool_rounds must be at least 1, got {max_tool_rounds}")
+        # One pooled client for all requests; retries and concurrency live in the transport
+        self.client = build_anthropic_client(api_key, max_connections, connect_timeout, read_timeout)
+        self.transport = transport or LLMTransport()
         self.model = model
+
+        # Adaptive tool rounds (0 disables each stopping rule below)
+        self.max_tool_rounds = max_tool_rounds
+        self.system_prompt = self.SYSTEM_PROMPT.format(
+            tool_call_limit=f"You may make up to **{max_tool_rounds} tool calls** per query when needed"
+        )
+        self.early_stop_distance = early_stop_distance
+        self.latency_budget = latency_budget
+        self.token_budget = token_budget
+        self.compact_chars = compact_chars
+        self._lock = threading.Lock()
+        self._stats = {
+            "tool_responses": 0,      # Answers that used at least one tool round
+            "tool_rounds": 0,
+            "rounds_histogram": {},   # Tool rounds per answer -> count
+            "early_stop": 0,          # Stopped after a close search match
+            "latency_budget": 0,      # Stopped because the request ran out of time
+            "token_budget": 0,        # Stopped because the request used its tokens
+            "max_rounds": 0,          # Answer forced because the last allowed round was reached
+            "compacted_results": 0,
+            "tokens": 0,
+        }
         
         # Pre-build base API parameters
         self.base_params = {
@@ -67,9 +104,9 @@ Provide only the direct answer to what was asked.
         
         # Build system content efficiently - avoid string ops when possible
         system_content = (
-            f"{self.SYSTEM_PROMPT}\n\nPrevious conversation:\n{conversation_history}"
+            f"{self.system_prompt}\n\nPrevious conversation:\n{conversation_history}"
             if conversation_history 
-            else self.SYSTEM_PROMPT
+            else self.system_prompt
         )
         
         # Prepare API call parameters efficiently
@@ -84,35 +121,47 @@ Provide only the direct answer to what was asked.
             api_params["tools"] = tools
             api_params["tool_choice"] = {"type": "auto"}
         
-        # Get response from Claude
-        response = self.client.messages.create(**api_params)
+        # Get response from Claude (raises LLMUnavailableError when the API is down)
+        started = time.perf_counter()
+        response = self.transport.call(self.client.messages.create, **api_params)
         
         # Handle tool execution if needed
         if response.stop_reason == "tool_use" and tool_manager:
-            return self._handle_tool_execution(response, api_params, tool_manager)
+            return self._handle_tool_execution(response, api_params, tool_manager, started)
         
         # Return direct response
         return response.content[0].text
     
-    def _handle_tool_execution(self, initial_response, base_params: Dict[str, Any], tool_manager):
+    def _handle_tool_execution(self, initial_response, base_params: Dict[str, Any], tool_manager,
+                               started: Optional[float] = None):
         """
-        Handle sequential tool execution across up to MAX_TOOL_ROUNDS rounds.
+        Handle sequential tool execution across up to max_tool_rounds rounds.
 
         Each round: execute tool calls from the response, send results back to Claude
         with tools still available so it can make further tool calls if needed.
+        The follow-up is made with tool_choice "none" instead, forcing an answer, on
+        the last allowed round, when a search came back close enough (early_stop_distance)
+        or when the request has used its latency or token budget. Tool results from earlier rounds are shortened
+        to compact_chars before each follow-up, since Claude has already read them.
 
         Args:
             initial_response: The response containing tool use requests
             base_params: Base API parameters (includes tools and system prompt)
             tool_manager: Manager to execute tools
+            started: perf_counter() when the request's first call was made
 
         Returns:
             Final response text after all tool rounds complete
         """
+        started = time.perf_counter() if started is None else started
         messages = base_params["messages"].copy()
         current_response = initial_response
+        tokens = self._usage_tokens(initial_response)
+        rounds = 0
+        stop = None
 
-        for _round in range(self.MAX_TOOL_ROUNDS):
+        for _round in range(self.max_tool_rounds):
+            rounds += 1
             # Append assistant's response (contains tool_use blocks)
             messages.append({"role": "assistant", "content": current_response.content})
 
@@ -131,25 +180,94 @@ Provide only the direct answer to what was asked.
                     })
 
             if tool_results:
+                self._compact_tool_results(messages)
                 messages.append({"role": "user", "content": tool_results})
 
+            stop = self._stop_reason(tool_manager, started, tokens)
+            if stop is None and rounds >= self.max_tool_rounds:
+                stop = "max_rounds"
+
             # Follow-up call WITH tools so Claude can make another call if needed
             followup_params = {
                 **self.base_params,
                 "messages": messages,
                 "system": base_params["system"],
                 "tools": base_params["tools"],
-                "tool_choice": {"type": "auto"}
+                "tool_choice": {"type": "none"} if stop else {"type": "auto"}
             }
 
-            current_response = self.client.messages.create(**followup_params)
+            current_response = self.transport.call(self.client.messages.create, **followup_params)
+            tokens += self._usage_tokens(current_response)
 
-            # If Claude didn't request another tool, we're done
-            if current_response.stop_reason != "tool_use":
+            # If Claude didn't request another tool (or may not), we're done
+            if stop or current_response.stop_reason != "tool_use":
                 break
 
+        self._record_rounds(rounds, stop, tokens)
+
         # Extract text from the final response
         for block in current_response.content:
             if hasattr(block, "text"):
                 return block.text
-        return "I wasn't able to complete the request. Please try rephrasing your question."
\ No newline at end of file
+        return "I wasn't able to complete the request. Please try rephrasing your question."
+
+    def _stop_reason(self, tool_manager, started: float, tokens: int) -> Optional[str]:
+        """Why no further tool rounds should be offered, or None to continue"""
+        if self.early_stop_distance > 0 and hasattr(tool_manager, "get_best_distance"):
+            best = tool_manager.get_best_distance()
+            if isinstance(best, (int, float)) and best <= self.early_stop_distance:
+                return "early_stop"
+        if self.latency_budget > 0 and time.perf_counter() - started >= self.latency_budget:
+            return "latency_budget"
+        if self.token_budget > 0 and tokens >= self.token_budget:
+            return "token_budget"
+        return None
+
+    def _compact_tool_results(self, messages: List[Dict[str, Any]]):
+        """Shorten tool results already sent in earlier rounds (replaced, not mutated in place)"""
+        if self.compact_chars <= 0:
+            return
+        compacted = 0
+        for i, message in enumerate(messages):
+            if message["role"] != "user" or not isinstance(message["content"], list):
+                continue
+            content = []
+            for block in message["content"]:
+                is_tool_result = isinstance(block, dict) and block.get("type") == "tool_result"
+                text = block.get("content") if is_tool_result else None
+                if isinstance(text, str) and len(text) > self.compact_chars:
+                    block = {**block, "content": text[:self.compact_chars] + "\n[... earlier result shortened]"}
+                    compacted += 1
+                content.append(block)
+            messages[i] = {**message, "content": content}
+        if compacted:
+            with self._lock:
+                self._stats["compacted_results"] += compacted
+
+    @staticmethod
+    def _usage_tokens(response) -> int:
+        usage = getattr(response, "usage", None)
+        total = 0
+        for name in ("input_tokens", "output_tokens"):
+            value = getattr(usage, name, 0)
+            total += value if isinstance(value, int) else 0
+        return total
+
+    def _record_rounds(self, rounds: int, stop: Optional[str], tokens: int):
+        with self._lock:
+            self._stats["tool_responses"] += 1
+            self._stats["tool_rounds"] += rounds
+            self._stats["tokens"] += tokens
+            histogram = self._stats["rounds_histogram"]
+            histogram[rounds] = histogram.get(rounds, 0) + 1
+            if stop:
+                self._stats[stop] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get API call metrics (retries, queueing, circuit state) and tool round counts"""
+        with self._lock:
+            rounds = {**self._stats, "rounds_histogram": dict(self._stats["rounds_histogram"])}
+        rounds["avg_rounds"] = (
+            round(rounds["tool_rounds"] / rounds["tool_responses"], 2) if rounds["tool_responses"] else 0.0
+        )
+        return {**self.transport.get_stats(), "rounds": rounds}
\ No newline at end of file
@@ -1,16 +1,22 @@
 import warnings
 warnings.filterwarnings("ignore", message="resource_tracker: There appear to be.*")
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from pydantic import BaseModel
 from typing import List, Optional
+import functools
 import os
 
 from config import config
 from rag_system import RAGSystem
+from document_extractors import SUPPORTED_EXTENSIONS
+from ingestion_queue import IngestionJob, IngestionQueue, QueueFullError
+from server import RequestTimeoutMiddleware, claim_writer_lock, restore_index_snapshot
+from static_assets import AssetStaticFiles, DevStaticFiles, build_static_assets
 
 # Initialize FastAPI app
 app = FastAPI(title="Course Materials RAG System", root_path="")
@@ -31,14 +37,32 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Bound how long an API request can hold a connection
+app.add_middleware(RequestTimeoutMiddleware, timeout=config.REQUEST_TIMEOUT)
+
+# Compress API responses; precompressed static files already carry Content-Encoding and pass through
+app.add_middleware(GZipMiddleware, minimum_size=config.GZIP_MIN_SIZE, compresslevel=6)
+
+# Seed a new node from a prebuilt index instead of embedding docs/ on first start
+# (server.py already did this before spawning workers; the lock makes repeats no-ops)
+restore_index_snapshot(config)
+
 # Initialize RAG system
 rag_system = RAGSystem(config)
 
+# Uploaded documents are ingested in the background, one at a time
+ingestion_queue = IngestionQueue(
+    config.INGESTION_QUEUE_PATH,
+    functools.partial(rag_system.add_course_document, raise_errors=True),
+    max_pending=config.INGESTION_QUEUE_SIZE
+)
+
 # Pydantic models for request/response
 class QueryRequest(BaseModel):
     """Request model for course queries"""
     query: str
     session_id: Optional[str] = None
+    retrieval_only: bool = False  # Return matching course excerpts without generating an answer
 
 class QueryResponse(BaseModel):
     """Response model for course queries"""
@@ -62,8 +86,10 @@ async def query_documents(request: QueryRequest):
         if not session_id:
             session_id = rag_system.session_manager.create_session()
         
-        # Process query using RAG system
-        answer, sources = rag_system.query(request.query, session_id)
+        # Process query using RAG system (blocking: model calls and search run off the event loop)
+        answer, sources = await run_in_threadpool(
+            rag_system.query, request.query, session_id, retrieval_only=request.retrieval_only
+        )
         
         return QueryResponse(
             answer=answer,
@@ -77,7 +103,7 @@ async def query_documents(request: QueryRequest):
 async def get_course_stats():
     """Get course analytics and statistics"""
     try:
-        analytics = rag_system.get_course_analytics()
+        analytics = await run_in_threadpool(rag_system.get_course_analytics)
         return CourseStats(
             total_courses=analytics["total_courses"],
             course_titles=analytics["course_titles"]
@@ -85,35 +111,83 @@ async def get_course_stats():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/metrics")
+async def get_metrics():
+    """Get runtime metrics (embedding queue depth, batch sizes, ingestion jobs)"""
+    try:
+        metrics = await run_in_threadpool(rag_system.get_metrics)
+        return {**metrics, "ingestion": ingestion_queue.get_stats()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/documents", response_model=IngestionJob, status_code=202)
+async def upload_document(file: UploadFile = File(...)):
+    """Queue an uploaded course document (.txt, .pdf, .docx) for ingestion"""
+    filename = os.path.basename(file.filename or "")
+    if not filename.lower().endswith(SUPPORTED_EXTENSIONS):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file type. Expected one of: {', '.join(SUPPORTED_EXTENSIONS)}"
+        )
+
+    max_bytes = config.MAX_UPLOAD_MB * 1024 * 1024
+    data = await file.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise HTTPException(status_code=413, detail=f"File is larger than {config.MAX_UPLOAD_MB} MB")
+
+    try:
+        return await run_in_threadpool(ingestion_queue.submit, filename, data)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/documents/jobs", response_model=List[IngestionJob])
+async def list_ingestion_jobs(limit: int = 50):
+    """List recent ingestion jobs, newest first"""
+    try:
+        return ingestion_queue.list_jobs(limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/documents/jobs/{job_id}", response_model=IngestionJob)
+async def get_ingestion_job(job_id: str):
+    """Get the status of an ingestion job"""
+    job = ingestion_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
 @app.on_event("startup")
 async def startup_event():
     """Load initial documents on startup"""
-    docs_path = "../docs"
+    # With several server workers, only one loads documents and runs the ingestion worker
+    if not claim_writer_lock(os.path.join(config.INGESTION_QUEUE_PATH, "writer.lock")):
+        print("Serving queries only; another worker handles ingestion")
+        return
+
+    docs_path = config.DOCS_PATH
     if os.path.exists(docs_path):
         print("Loading initial documents...")
         try:
-            courses, chunks = rag_system.add_course_folder(docs_path, clear_existing=False)
+            courses, chunks = rag_system.add_course_folder(docs_path, clear_existing=False, watch=config.WATCH_DOCS)
             print(f"Loaded {courses} courses with {chunks} chunks")
         except Exception as e:
             print(f"Error loading documents: {e}")
 
-# Custom static file handler with no-cache headers for development
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-import os
-from pathlib import Path
-
-
-class DevStaticFiles(StaticFiles):
-    async def get_response(self, path: str, scope):
-        response = await super().get_response(path, scope)
-        if isinstance(response, FileResponse):
-            # Add no-cache headers for development
-            response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
-            response.headers["Pragma"] = "no-cache"
-            response.headers["Expires"] = "0"
-        return response
-    
-    
-# Serve static files for the frontend
-app.mount("/", StaticFiles(directory="../frontend", html=True), name="static")
\ No newline at end of file
+    # Resume any uploads queued before a restart
+    ingestion_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Let the ingestion worker and docs folder sync finish their current work"""
+    rag_system.stop_watching(timeout=30)
+    ingestion_queue.stop(timeout=30)
+
+# Serve static files for the frontend: as-is and uncached in development, otherwise
+# from a build with hashed, precompressed assets and long-lived cache headers
+if config.DEV_MODE:
+    app.mount("/", DevStaticFiles(directory=config.FRONTEND_PATH, html=True), name="static")
+else:
+    build_static_assets(config.FRONTEND_PATH, config.STATIC_BUILD_PATH)
+    app.mount("/", AssetStaticFiles(directory=config.STATIC_BUILD_PATH, html=True), name="static")
@@ -0,0 +1,63 @@
+"""
+Measure ChromaDB ingestion throughput for different write batch sizes.
+
+Writes synthetic 384-d embeddings (the all-MiniLM-L6-v2 dimension) with chunk-like
+documents and metadata through collection.upsert, as VectorStore.add_course_content
+does, so the numbers cover storage only, not the embedding model.
+
+Usage (from backend/):
+    uv run python -m benchmarks.bench_chroma_writes
+    uv run python -m benchmarks.bench_chroma_writes --chunks 50000 --batch-sizes 100 1000 5000
+"""
+
+import argparse
+import tempfile
+import time
+
+import chromadb
+import numpy as np
+from chromadb.config import Settings
+
+from numpy_index import normalize_rows
+from vector_store import VectorStore
+
+DIM = 384
+
+
+def bench_batch_size(chunks: int, batch_size: int, embeddings: np.ndarray) -> float:
+    """Chunks written per second into a fresh persistent collection"""
+    with tempfile.TemporaryDirectory() as tmp:
+        client = chromadb.PersistentClient(path=tmp, settings=Settings(anonymized_telemetry=False))
+        collection = client.create_collection("bench_content", embedding_function=None)
+        ids = [VectorStore.chunk_id("Benchmark Course", i) for i in range(chunks)]
+        documents = [f"Course Benchmark Course Lesson {i // 20} content: chunk {i}" for i in range(chunks)]
+        metadatas = [{"course_title": "Benchmark Course", "lesson_number": i // 20, "chunk_index": i}
+                     for i in range(chunks)]
+
+        t0 = time.perf_counter()
+        for start in range(0, chunks, batch_size):
+            end = start + batch_size
+            collection.upsert(ids=ids[start:end], documents=documents[start:end],
+                              metadatas=metadatas[start:end], embeddings=embeddings[start:end])
+        return chunks / (time.perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=20_000)
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[16, 64, 256, 1024, 0],
+                        help="0 means the client's maximum batch size")
+    args = parser.parse_args()
+
+    max_batch = chromadb.EphemeralClient(Settings(anonymized_telemetry=False)).get_max_batch_size()
+    embeddings = normalize_rows(np.random.default_rng(0).normal(size=(args.chunks, DIM)).astype(np.float32))
+
+    print(f"client max batch size: {max_batch}")
+    print(f"{'batch':>8}{'chunks/s':>12}")
+    for batch_size in args.batch_sizes:
+        size = min(batch_size or max_batch, max_batch)
+        print(f"{size:>8}{bench_batch_size(args.chunks, size, embeddings):>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
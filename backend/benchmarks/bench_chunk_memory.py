@@ -0,0 +1,104 @@
+"""
+Benchmark building and holding chunks, and holding the vector index's per-chunk metadata.
+
+`LegacyCourseChunk` is a frozen copy of the Pydantic model CourseChunk replaced.
+Chunk texts come from a small pool, so the numbers show per-chunk overhead
+rather than the text itself. Course titles are built per chunk, as they are
+when chunks or metadata are deserialized.
+
+Usage (from backend/):
+    uv run python -m benchmarks.bench_chunk_memory
+    uv run python -m benchmarks.bench_chunk_memory --count 100000 --courses 20
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from typing import Callable, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from models import CourseChunk
+from numpy_index import compact_metadata
+
+TEXT_POOL = 1000
+
+
+class LegacyCourseChunk(BaseModel):
+    """CourseChunk as it was: a validated Pydantic model"""
+    content: str
+    course_title: str
+    lesson_number: Optional[int] = None
+    chunk_index: int
+    start_char: Optional[int] = None
+    end_char: Optional[int] = None
+    page_number: Optional[int] = None
+    section: Optional[str] = None
+
+
+def build_chunks(chunk_class, count: int, courses: int) -> List:
+    texts = [f"Course content chunk {i} " * 30 for i in range(TEXT_POOL)]
+    return [
+        chunk_class(
+            content=texts[i % TEXT_POOL],
+            course_title=f"Course {i % courses}: Building with Retrieval",
+            lesson_number=i % 12,
+            chunk_index=i,
+            start_char=i * 700,
+            end_char=i * 700 + 800,
+        )
+        for i in range(count)
+    ]
+
+
+def metadata_lines(count: int, courses: int) -> List[str]:
+    """chunks.jsonl metadata as the numpy index reads it back"""
+    return [
+        json.dumps({"course_title": f"Course {i % courses}: Building with Retrieval",
+                    "lesson_number": i % 12, "chunk_index": i})
+        for i in range(count)
+    ]
+
+
+def measure(build: Callable[[], List]) -> Tuple[float, float]:
+    """(seconds to build, MB held by the result) - timed without tracing, then measured with it"""
+    gc.collect()
+    t0 = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - t0
+    del result
+    gc.collect()
+
+    tracemalloc.start()
+    result = build()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return seconds, held / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--courses", type=int, default=50)
+    args = parser.parse_args()
+
+    lines = metadata_lines(args.count, args.courses)
+    cases = [
+        ("chunks: pydantic", lambda: build_chunks(LegacyCourseChunk, args.count, args.courses)),
+        ("chunks: slotted dataclass", lambda: build_chunks(CourseChunk, args.count, args.courses)),
+        ("index metadata: json dicts", lambda: [json.loads(line) for line in lines]),
+        ("index metadata: interned", lambda: [compact_metadata(json.loads(line)) for line in lines]),
+    ]
+
+    print(f"{args.count} chunks, {args.courses} courses")
+    print(f"{'':28}{'seconds':>9}{'chunks/s':>12}{'MB held':>10}{'B/chunk':>9}")
+    for name, build in cases:
+        seconds, mb = measure(build)
+        print(f"{name:28}{seconds:>9.2f}{args.count / seconds:>12,.0f}{mb:>10.1f}{mb * 1e6 / args.count:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
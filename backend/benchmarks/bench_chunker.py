@@ -0,0 +1,112 @@
+"""
+Benchmark DocumentProcessor.chunk_text against the previous quadratic chunker.
+
+`legacy_chunk_text` is a frozen copy of the sentence-list implementation the
+offset-based chunker replaced; the tests use it as the reference output.
+
+Usage (from backend/):
+    uv run python -m benchmarks.bench_chunker
+    uv run python -m benchmarks.bench_chunker --sizes 10000 1000000 --chunk-size 800 --overlap 100
+"""
+
+import argparse
+import random
+import re
+import time
+from typing import List
+
+from document_processor import DocumentProcessor
+
+WORDS = ("model context protocol server client tool resource prompt transport "
+         "request response schema lesson course retrieval embedding vector").split()
+
+
+def legacy_chunk_text(text: str, chunk_size: int, chunk_overlap: int) -> List[str]:
+    """The chunker as it was before offsets: rebuilds and re-joins sentence lists per chunk"""
+    text = re.sub(r'\s+', ' ', text.strip())
+    sentence_endings = re.compile(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\!|\?)\s+(?=[A-Z])')
+    sentences = [s.strip() for s in sentence_endings.split(text) if s.strip()]
+
+    chunks = []
+    i = 0
+    while i < len(sentences):
+        current_chunk = []
+        current_size = 0
+        for j in range(i, len(sentences)):
+            sentence = sentences[j]
+            space_size = 1 if current_chunk else 0
+            total_addition = len(sentence) + space_size
+            if current_size + total_addition > chunk_size and current_chunk:
+                break
+            current_chunk.append(sentence)
+            current_size += total_addition
+
+        if current_chunk:
+            chunks.append(' '.join(current_chunk))
+            if chunk_overlap > 0:
+                overlap_size = 0
+                overlap_sentences = 0
+                for k in range(len(current_chunk) - 1, -1, -1):
+                    sentence_len = len(current_chunk[k]) + (1 if k < len(current_chunk) - 1 else 0)
+                    if overlap_size + sentence_len <= chunk_overlap:
+                        overlap_size += sentence_len
+                        overlap_sentences += 1
+                    else:
+                        break
+                next_start = i + len(current_chunk) - overlap_sentences
+                i = max(next_start, i + 1)
+            else:
+                i += len(current_chunk)
+        else:
+            i += 1
+    return chunks
+
+
+def synthetic_text(size: int, max_words: int = 25, seed: int = 0) -> str:
+    """Roughly `size` characters of capitalised sentences, with a paragraph break every few sentences"""
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    while length < size:
+        words = [rng.choice(WORDS) for _ in range(rng.randint(1, max_words))]
+        sentence = " ".join(words).capitalize() + rng.choice(".!?")
+        parts.append(sentence)
+        parts.append(rng.choice([" "] * 8 + ["\n", "\n\n"]))
+        length += len(sentence) + 1
+    return "".join(parts)
+
+
+def time_call(fn, repeats: int) -> float:
+    """Best-of-n wall time in milliseconds"""
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - t0) * 1000)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--chunk-size", type=int, default=800)
+    parser.add_argument("--overlap", type=int, default=100)
+    parser.add_argument("--max-words", type=int, default=25, help="Longest synthetic sentence, in words")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    processor = DocumentProcessor(args.chunk_size, args.overlap)
+    print(f"{'chars':>10}{'chunks':>8}{'legacy ms':>11}{'offsets ms':>12}{'speedup':>9}  same")
+    for size in args.sizes:
+        text = synthetic_text(size, args.max_words)
+        legacy = legacy_chunk_text(text, args.chunk_size, args.overlap)
+        current = processor.chunk_text(text)
+
+        legacy_ms = time_call(lambda: legacy_chunk_text(text, args.chunk_size, args.overlap), args.repeats)
+        current_ms = time_call(lambda: processor.chunk_text(text), args.repeats)
+        print(f"{size:>10}{len(current):>8}{legacy_ms:>11.1f}{current_ms:>12.1f}"
+              f"{legacy_ms / current_ms:>8.1f}x  {legacy == current}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark course document parsing on a synthetic transcript with many lessons.
+
+Reports end-to-end process_course_document time and how much of it is spent in
+chunk_text, so parser overhead (line classification, lesson bookkeeping) can be
+read off as the difference.
+
+Usage (from backend/):
+    uv run python -m benchmarks.bench_document_parsing
+    uv run python -m benchmarks.bench_document_parsing --lessons 10000 --lines-per-lesson 20
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from config import config
+from document_processor import DocumentProcessor
+
+WORDS = ("model context protocol server client tool resource prompt transport "
+         "request response schema lesson course retrieval embedding vector").split()
+
+
+def write_synthetic_course(path: str, lessons: int, lines_per_lesson: int, seed: int = 0):
+    """Write a course file in the transcript format: header, then lesson markers, links and text"""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("Course Title: Synthetic Course\n")
+        f.write("Course Link: https://example.com/course\n")
+        f.write("Course Instructor: Benchmark\n\n")
+        for lesson in range(lessons):
+            f.write(f"Lesson {lesson}: Topic {lesson}\n")
+            f.write(f"Lesson Link: https://example.com/course/{lesson}\n")
+            for _ in range(lines_per_lesson):
+                words = [rng.choice(WORDS) for _ in range(rng.randint(4, 20))]
+                f.write(" ".join(words).capitalize() + ".\n")
+            f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lessons", type=int, default=10_000)
+    parser.add_argument("--lines-per-lesson", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    processor = DocumentProcessor(config.CHUNK_SIZE, config.CHUNK_OVERLAP)
+    chunk_text_with_offsets = processor.chunk_text_with_offsets
+    chunking = [0.0]
+
+    def timed_chunking(text):
+        t0 = time.perf_counter()
+        try:
+            return chunk_text_with_offsets(text)
+        finally:
+            chunking[0] += time.perf_counter() - t0
+
+    processor.chunk_text_with_offsets = timed_chunking
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "course.txt")
+        write_synthetic_course(path, args.lessons, args.lines_per_lesson)
+        with open(path, encoding="utf-8") as f:
+            lines = sum(1 for _ in f)
+
+        best = None
+        for _ in range(args.repeats):
+            chunking[0] = 0.0
+            t0 = time.perf_counter()
+            course, chunks = processor.process_course_document(path)
+            total = time.perf_counter() - t0
+            if best is None or total < best[0]:
+                best = (total, chunking[0])
+
+    total, chunk_s = best
+    print(f"lessons={len(course.lessons)} lines={lines} chunks={len(chunks)}")
+    print(f"total {total * 1000:.1f} ms  chunking {chunk_s * 1000:.1f} ms  "
+          f"parsing {(total - chunk_s) * 1000:.1f} ms  ({lines / (total - chunk_s) / 1e6:.2f} M lines/s)")
+
+
+if __name__ == "__main__":
+    main()
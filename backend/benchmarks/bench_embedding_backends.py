@@ -0,0 +1,98 @@
+"""
+Benchmark embedding backends: per-query latency, batch throughput and memory.
+
+Each backend runs in its own subprocess so peak RSS reflects only that backend.
+
+Usage (from backend/):
+    uv run python -m benchmarks.bench_embedding_backends
+    uv run python -m benchmarks.bench_embedding_backends --backends onnx onnx-int8 --queries 200
+"""
+
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+from config import config
+from embedding_backends import EMBEDDING_BACKENDS, create_embedding_function
+
+SAMPLE_TEXT = (
+    "The Model Context Protocol standardizes how applications provide context to "
+    "language models, letting a client connect to servers that expose tools, "
+    "resources and prompts over a common transport."
+)
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_backend(backend: str, queries: int, batch_size: int, batches: int) -> dict:
+    """Measure a single backend in the current process"""
+    rss_before = _peak_rss_mb()
+
+    start = time.perf_counter()
+    embed = create_embedding_function(backend, config.EMBEDDING_MODEL)
+    embed(["warm up"])
+    load_s = time.perf_counter() - start
+
+    latencies = []
+    for i in range(queries):
+        t0 = time.perf_counter()
+        embed([f"question {i}: what does lesson {i % 10} cover?"])
+        latencies.append((time.perf_counter() - t0) * 1000)
+    latencies.sort()
+
+    batch = [f"{SAMPLE_TEXT} ({i})" for i in range(batch_size)]
+    t0 = time.perf_counter()
+    for _ in range(batches):
+        embed(batch)
+    batch_s = time.perf_counter() - t0
+
+    return {
+        "backend": backend,
+        "load_s": round(load_s, 2),
+        "query_p50_ms": round(statistics.median(latencies), 2),
+        "query_p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+        "batch_texts_per_s": round(batch_size * batches / batch_s, 1),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "rss_delta_mb": round(_peak_rss_mb() - rss_before, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=list(EMBEDDING_BACKENDS), choices=EMBEDDING_BACKENDS)
+    parser.add_argument("--queries", type=int, default=100, help="Single-text queries to time")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--batches", type=int, default=10)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_backend(args.backends[0], args.queries, args.batch_size, args.batches)))
+        return
+
+    print(f"{'backend':<22}{'load s':>8}{'p50 ms':>9}{'p95 ms':>9}{'batch txt/s':>13}{'peak MB':>10}")
+    for backend in args.backends:
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_embedding_backends", "--child",
+             "--backends", backend, "--queries", str(args.queries),
+             "--batch-size", str(args.batch_size), "--batches", str(args.batches)],
+            capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "unknown error"
+            print(f"{backend:<22}failed: {error}")
+            continue
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"{r['backend']:<22}{r['load_s']:>8}{r['query_p50_ms']:>9}{r['query_p95_ms']:>9}"
+              f"{r['batch_texts_per_s']:>13}{r['peak_rss_mb']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Compare request throughput of the development and production server modes.
+
+Starts the app with `server.py --dev` (auto-reload, asyncio loop, h11) and with
+the production settings (uvloop/httptools when installed, no reload, tuned
+keep-alive, optional extra workers), then drives each with concurrent keep-alive
+clients against a static route and an API route that does not call the LLM.
+
+Each server builds the full RAG system, so the embedding model must be available
+and startup takes a few seconds.
+
+Usage (from backend/):
+    uv run python -m benchmarks.bench_server
+    uv run python -m benchmarks.bench_server --duration 10 --concurrency 64 --workers 1 4
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from config import BACKEND_DIR
+
+ROUTES = ("/", "/api/courses")
+
+
+def start_server(port: int, dev: bool, workers: int) -> subprocess.Popen:
+    args = [sys.executable, os.path.join(BACKEND_DIR, "server.py"), "--port", str(port)]
+    args += ["--dev"] if dev else ["--workers", str(workers)]
+    return subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+
+
+def wait_until_ready(base_url: str, timeout: float = 300.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(base_url + "/api/courses", timeout=2.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Server at {base_url} did not become ready within {timeout:.0f}s")
+
+
+def stop_server(process: subprocess.Popen):
+    # The whole session, so reload supervisors and worker processes exit too
+    os.killpg(process.pid, signal.SIGINT)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+async def load(url: str, duration: float, concurrency: int):
+    """Requests per second and latencies (ms) of `concurrency` clients looping for `duration`"""
+    latencies = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30.0) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                t0 = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append((time.perf_counter() - t0) * 1000)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+    return len(latencies) / elapsed, sorted(latencies), errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds of load per route")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", nargs="+", type=int, default=[1], help="Production worker counts to try")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    modes = [("dev", True, 1)] + [(f"prod x{w}", False, w) for w in args.workers]
+    print(f"{'mode':<10}{'route':<14}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for name, dev, workers in modes:
+        process = start_server(args.port, dev, workers)
+        base_url = f"http://127.0.0.1:{args.port}"
+        try:
+            wait_until_ready(base_url)
+            for route in ROUTES:
+                asyncio.run(load(base_url + route, 1.0, args.concurrency))  # Warm up
+                rps, latencies, errors = asyncio.run(load(base_url + route, args.duration, args.concurrency))
+                p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+                print(f"{name:<10}{route:<14}{rps:>9.0f}{statistics.median(latencies):>9.1f}{p99:>9.1f}{errors:>8}")
+        finally:
+            stop_server(process)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark the NumPy vector index against ChromaDB for content search.
+
+Uses synthetic unit-norm 384-d embeddings (the all-MiniLM-L6-v2 dimension), so the
+timings cover the index only, not the embedding model. Each size is measured for
+unfiltered, course-filtered and course+lesson-filtered queries.
+
+Usage (from backend/):
+    uv run python -m benchmarks.bench_vector_index
+    uv run python -m benchmarks.bench_vector_index --sizes 10000 100000 --chroma-max 100000
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+
+import chromadb
+import numpy as np
+from chromadb.config import Settings
+
+from numpy_index import NumpyVectorIndex, normalize_rows
+
+DIM = 384
+CHUNKS_PER_LESSON = 20
+LESSONS_PER_COURSE = 10
+
+
+def synthetic_corpus(size: int, seed: int = 0):
+    """Grouped rows: courses of LESSONS_PER_COURSE lessons of CHUNKS_PER_LESSON chunks"""
+    rng = np.random.default_rng(seed)
+    embeddings = normalize_rows(rng.normal(size=(size, DIM)).astype(np.float32))
+    metadatas = []
+    for row in range(size):
+        lesson_global = row // CHUNKS_PER_LESSON
+        metadatas.append({
+            "course_title": f"Course {lesson_global // LESSONS_PER_COURSE}",
+            "lesson_number": lesson_global % LESSONS_PER_COURSE,
+            "chunk_index": row,
+        })
+    documents = [f"chunk {row}" for row in range(size)]
+    return documents, metadatas, embeddings
+
+
+def time_queries(search, queries, filters) -> float:
+    """Median latency in milliseconds over queries, cycling through filters"""
+    latencies = []
+    for i, query in enumerate(queries):
+        course, lesson = filters[i % len(filters)]
+        t0 = time.perf_counter()
+        search(query, course, lesson)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(latencies)
+
+
+def bench_numpy(documents, metadatas, embeddings, queries, filter_sets, limit):
+    with tempfile.TemporaryDirectory() as tmp:
+        index = NumpyVectorIndex(tmp)
+        t0 = time.perf_counter()
+        index.add(documents, metadatas, embeddings)
+        build_s = time.perf_counter() - t0
+        search = lambda q, c, l: index.search(q, course_title=c, lesson_number=l, limit=limit)
+        return build_s, {name: time_queries(search, queries, f) for name, f in filter_sets.items()}
+
+
+def bench_chroma(documents, metadatas, embeddings, queries, filter_sets, limit):
+    with tempfile.TemporaryDirectory() as tmp:
+        client = chromadb.PersistentClient(path=tmp, settings=Settings(anonymized_telemetry=False))
+        collection = client.get_or_create_collection("bench_content", embedding_function=None)
+        batch = client.get_max_batch_size()
+        t0 = time.perf_counter()
+        for start in range(0, len(documents), batch):
+            end = start + batch
+            collection.add(
+                ids=[str(i) for i in range(start, min(end, len(documents)))],
+                documents=documents[start:end],
+                metadatas=metadatas[start:end],
+                embeddings=embeddings[start:end],
+            )
+        build_s = time.perf_counter() - t0
+
+        def search(q, course, lesson):
+            clauses = [{"course_title": course}] if course is not None else []
+            if lesson is not None:
+                clauses.append({"lesson_number": lesson})
+            where = None if not clauses else clauses[0] if len(clauses) == 1 else {"$and": clauses}
+            return collection.query(query_embeddings=[q], n_results=limit, where=where)
+
+        return build_s, {name: time_queries(search, queries, f) for name, f in filter_sets.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--chroma-max", type=int, default=1_000_000,
+                        help="Skip ChromaDB for sizes above this (building HNSW at 1M takes a while)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    print(f"{'chunks':>10} {'backend':<8}{'build s':>9}{'all ms':>9}{'course ms':>11}{'lesson ms':>11}")
+    for size in args.sizes:
+        documents, metadatas, embeddings = synthetic_corpus(size)
+        queries = normalize_rows(rng.normal(size=(args.queries, DIM)).astype(np.float32))
+        courses = max(1, size // (CHUNKS_PER_LESSON * LESSONS_PER_COURSE))
+        picks = rng.integers(0, courses, size=args.queries)
+        filter_sets = {
+            "all": [(None, None)],
+            "course": [(f"Course {c}", None) for c in picks],
+            "lesson": [(f"Course {c}", int(c) % LESSONS_PER_COURSE) for c in picks],
+        }
+
+        backends = [("numpy", bench_numpy)]
+        if size <= args.chroma_max:
+            backends.append(("chroma", bench_chroma))
+        for name, bench in backends:
+            build_s, timings = bench(documents, metadatas, embeddings, list(queries), filter_sets, args.limit)
+            print(f"{size:>10} {name:<8}{build_s:>9.1f}{timings['all']:>9.2f}"
+                  f"{timings['course']:>11.2f}{timings['lesson']:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Course catalog kept as structured rows in SQLite.
+
+Chroma metadata values must be scalars, so lessons used to be stored as one JSON
+string per course that every lookup parsed in full. Here courses and lessons are
+tables, with lessons keyed by (course_title, lesson_number), so a lesson link is
+an index lookup and many (course, lesson) pairs resolve in one query. The Chroma
+catalog collection is still used for semantic course-name resolution.
+"""
+
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from models import Course
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS courses (
+    title        TEXT PRIMARY KEY,
+    course_link  TEXT,
+    instructor   TEXT,
+    lesson_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS lessons (
+    course_title  TEXT NOT NULL REFERENCES courses(title) ON DELETE CASCADE,
+    lesson_number INTEGER NOT NULL,
+    lesson_title  TEXT,
+    lesson_link   TEXT,
+    PRIMARY KEY (course_title, lesson_number)
+) WITHOUT ROWID;
+"""
+
+# (course, lesson) pairs per lookup query; two bound parameters each
+LOOKUP_BATCH = 400
+
+
+class CourseCatalog:
+    """Courses and their lessons, with batched lesson lookups"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30.0)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA foreign_keys = ON")  # Lessons are deleted with their course
+        self._conn.executescript(SCHEMA)
+
+    def upsert_course(self, course: Course):
+        """Add a course, replacing its previous entry and lessons"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM courses WHERE title = ?", (course.title,))
+            self._conn.execute(
+                "INSERT INTO courses (title, course_link, instructor, lesson_count) VALUES (?, ?, ?, ?)",
+                (course.title, course.course_link, course.instructor, len(course.lessons))
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO lessons (course_title, lesson_number, lesson_title, lesson_link) "
+                "VALUES (?, ?, ?, ?)",
+                [(course.title, l.lesson_number, l.title, l.lesson_link) for l in course.lessons]
+            )
+
+    def delete_course(self, title: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM courses WHERE title = ?", (title,))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM courses")
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM courses").fetchone()[0]
+
+    def get_titles(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT title FROM courses ORDER BY title")]
+
+    def get_courses(self, titles: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Courses with their lessons in lesson order, all of them or the given titles.
+        Unset fields are omitted, matching the catalog's Chroma metadata.
+        """
+        course_filter = lesson_filter = ""
+        params: Tuple = ()
+        if titles is not None:
+            if not titles:
+                return []
+            placeholders = ", ".join("?" * len(titles))
+            course_filter = f" WHERE title IN ({placeholders})"
+            lesson_filter = f" WHERE course_title IN ({placeholders})"
+            params = tuple(titles)
+        with self._lock:
+            courses = [
+                {key: row[key] for key in row.keys() if row[key] is not None}
+                for row in self._conn.execute(f"SELECT * FROM courses{course_filter} ORDER BY title", params)
+            ]
+            lessons_by_course: Dict[str, List[Dict[str, Any]]] = {c["title"]: [] for c in courses}
+            lesson_rows = self._conn.execute(
+                f"SELECT * FROM lessons{lesson_filter} ORDER BY course_title, lesson_number", params
+            )
+            for row in lesson_rows:
+                lessons_by_course[row["course_title"]].append({
+                    "lesson_number": row["lesson_number"],
+                    "lesson_title": row["lesson_title"],
+                    "lesson_link": row["lesson_link"],
+                })
+        for course in courses:
+            course["lessons"] = lessons_by_course[course["title"]]
+        return courses
+
+    def get_course(self, title: str) -> Optional[Dict[str, Any]]:
+        courses = self.get_courses([title])
+        return courses[0] if courses else None
+
+    def get_course_link(self, title: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT course_link FROM courses WHERE title = ?", (title,)).fetchone()
+        return row[0] if row else None
+
+    def get_lesson_links(self, pairs: Iterable[Tuple[str, int]]) -> Dict[Tuple[str, int], Optional[str]]:
+        """
+        Links for many (course_title, lesson_number) pairs in as few queries as possible.
+        Every requested pair is in the result; unknown lessons map to None.
+        """
+        wanted = list(dict.fromkeys(pairs))
+        links: Dict[Tuple[str, int], Optional[str]] = dict.fromkeys(wanted)
+        with self._lock:
+            for start in range(0, len(wanted), LOOKUP_BATCH):
+                batch = wanted[start:start + LOOKUP_BATCH]
+                values = ", ".join("(?, ?)" for _ in batch)
+                rows = self._conn.execute(
+                    f"WITH wanted(course_title, lesson_number) AS (VALUES {values}) "
+                    "SELECT l.course_title, l.lesson_number, l.lesson_link "
+                    "FROM wanted JOIN lessons l USING (course_title, lesson_number)",
+                    [value for pair in batch for value in pair]
+                )
+                for course_title, lesson_number, link in rows:
+                    links[(course_title, lesson_number)] = link
+        return links
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -5,24 +5,122 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+# Relative paths are resolved against this directory, so the app runs from any cwd
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def backend_path(path: str) -> str:
+    return os.path.normpath(os.path.join(BACKEND_DIR, path))
+
+
 @dataclass
 class Config:
     """Configuration settings for the RAG system"""
     # Anthropic API settings
     ANTHROPIC_API_KEY: str = os.getenv("ANTHROPIC_API_KEY", "")
     ANTHROPIC_MODEL: str = "claude-sonnet-4-20250514"
+    # Anthropic transport: pooled connections, timeouts, retries and circuit breaker
+    ANTHROPIC_MAX_CONNECTIONS: int = 20     # Pooled HTTP connections shared by all requests
+    ANTHROPIC_CONNECT_TIMEOUT: float = 5.0  # Seconds to establish a connection
+    ANTHROPIC_READ_TIMEOUT: float = 60.0    # Seconds to wait for a response
+    ANTHROPIC_MAX_CONCURRENCY: int = 8      # Calls in flight at once; the rest queue (0 = unlimited)
+    ANTHROPIC_QUEUE_TIMEOUT: float = 30.0   # Seconds a call waits for a slot before degrading
+    ANTHROPIC_MAX_RETRIES: int = 3          # Retries for 429/5xx/529, timeouts and connection errors
+    ANTHROPIC_BACKOFF_BASE: float = 0.5     # First retry waits up to this long (doubles per retry, jittered)
+    ANTHROPIC_BACKOFF_MAX: float = 8.0      # Longest single wait, incl. retry-after; longer waits give up
+    ANTHROPIC_BREAKER_THRESHOLD: int = 5    # Consecutive failed calls that open the circuit (0 disables)
+    ANTHROPIC_BREAKER_COOLDOWN: float = 30.0  # Seconds answers stay retrieval-only before a trial call
     
     # Embedding model settings
     EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
+    # Embedding backend: "sentence-transformers", "onnx" or "onnx-int8" (ONNX Runtime, CPU)
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "sentence-transformers")
+    EMBEDDING_BATCH_SIZE: int = 32          # Max texts coalesced into one embedding micro-batch
+    EMBEDDING_BATCH_WINDOW_MS: float = 5.0  # How long the embedding worker waits to fill a batch
     
     # Document processing settings
     CHUNK_SIZE: int = 800       # Size of text chunks for vector storage
     CHUNK_OVERLAP: int = 100     # Characters to overlap between chunks
     MAX_RESULTS: int = 5         # Maximum search results to return
+    # Relevance: drop hits farther than RELEVANCE_MAX_DISTANCE (squared L2, 0-4), or when that
+    # is 0, farther than this percentile of distances between chunks of different courses
+    # (calibrated from the index itself; 0 disables filtering). Both are off by default:
+    # query-to-chunk distances run larger than chunk-to-chunk ones, so validate a cutoff
+    # against the embedding model in use before enabling it.
+    RELEVANCE_MAX_DISTANCE: float = 0.0
+    RELEVANCE_PERCENTILE: float = 0.0
+    MMR_LAMBDA: float = 0.7      # Relevance vs. diversity when picking results (0 or 1 disables MMR)
+    MMR_FETCH_FACTOR: int = 3    # Candidates fetched per returned result for MMR
+    # Repeated searches against unchanged data are served from an LRU cache (0 disables).
+    # Writes in this process invalidate it; the TTL bounds staleness from other processes.
+    SEARCH_CACHE_SIZE: int = 1024
+    SEARCH_CACHE_TTL: float = 300.0  # Seconds
     MAX_HISTORY: int = 2         # Number of conversation messages to remember
+    # Tool rounds per answer (at least 1). The follow-up after the last allowed round forces an
+    # answer, and so does an earlier one once a stopping rule below is hit (0 disables a rule).
+    MAX_TOOL_ROUNDS: int = 2
+    EARLY_STOP_DISTANCE: float = 0.8      # A search hit this close (squared L2, 0-4) ends tool use
+    TOOL_LATENCY_BUDGET: float = 20.0     # Seconds into a request after which no new tool round starts
+    TOOL_TOKEN_BUDGET: int = 12000        # Input + output tokens after which no new tool round starts
+    TOOL_RESULT_COMPACT_CHARS: int = 1500 # Earlier rounds' tool results are cut to this before follow-ups
+    FAST_PATH_ROUTING: bool = True  # Answer outline/link/instructor questions from the catalog, no model call
+    # Search the raw question while the model decides whether to: "off", "speculative"
+    # (reuse the result if the model asks for a similar search) or "inject" (put the
+    # results in the first prompt so most questions need one model call)
+    PREFETCH_MODE: str = os.getenv("PREFETCH_MODE", "speculative")
+    PREFETCH_SIMILARITY: float = 0.5  # Word overlap (Jaccard) a tool query needs to reuse the prefetch
+    PREFETCH_WORKERS: int = 4         # Threads running prefetched searches
+    INGEST_BATCH_SIZE: int = 256 # Chunks buffered per vector store write during ingestion
+    EXTRACTION_WORKERS: int = 2  # Worker processes for PDF/DOCX text extraction
+    EXTRACTION_TIMEOUT: float = 60.0  # Seconds allowed to extract a single PDF/DOCX file
+
+    # Upload ingestion queue
+    INGESTION_QUEUE_PATH: str = backend_path("ingestion_queue")  # Job database and uploaded files
+    INGESTION_QUEUE_SIZE: int = 16       # Pending jobs before uploads are rejected with 429
+    INGESTION_BATCH_PAUSE: float = 0.05  # Seconds the worker sleeps between write batches
+    MAX_UPLOAD_MB: int = 50              # Largest accepted upload
+
+    # Docs folder watching: re-index added, modified and removed files while running
+    WATCH_DOCS: bool = os.getenv("WATCH_DOCS", "false").lower() == "true"
+    DOCS_MANIFEST_PATH: str = backend_path("docs_manifest.json")  # Which file produced which course
+    WATCH_DEBOUNCE: float = 2.0       # Seconds of quiet before a burst of changes is synced
+    WATCH_POLL_INTERVAL: float = 1.0  # Scan interval when watchfiles is unavailable
     
+    # Content served by the app
+    DOCS_PATH: str = os.getenv("DOCS_PATH", backend_path("../docs"))
+    FRONTEND_PATH: str = backend_path("../frontend")
+    STATIC_BUILD_PATH: str = backend_path("static_build")  # Hashed, precompressed frontend (production)
+    DEV_MODE: bool = os.getenv("DEV_MODE", "false").lower() == "true"  # Set by server.py --dev
+    GZIP_MIN_SIZE: int = 1000  # Smallest API response worth compressing, in bytes
+
+    # Web server (server.py)
+    HOST: str = os.getenv("HOST", "127.0.0.1")
+    PORT: int = int(os.getenv("PORT", "8000"))
+    # Worker processes; with more than one, sessions are per process and only one
+    # worker ingests, so serve a prebuilt index (see index_snapshot.py). The other
+    # workers check every INDEX_REFRESH_INTERVAL seconds whether the index changed and
+    # reload their NumPy index and caches (0 disables). Chroma does not support several
+    # processes writing and reading one directory; with the chroma backend, restart the
+    # workers after ingesting.
+    WORKERS: int = int(os.getenv("WEB_CONCURRENCY", "1"))
+    INDEX_REFRESH_INTERVAL: float = 5.0
+    KEEPALIVE_TIMEOUT: int = 15          # Seconds an idle keep-alive connection is held open
+    GRACEFUL_SHUTDOWN_TIMEOUT: int = 30  # Seconds in-flight requests get to finish on shutdown
+    REQUEST_TIMEOUT: float = 120.0       # API requests still running after this get a 504 (0 disables)
+    LIMIT_CONCURRENCY: int = 0           # Concurrent connections before new ones get a 503 (0 = unlimited)
+    BACKLOG: int = 2048                  # Pending connections queued by the socket
+    ACCESS_LOG: bool = os.getenv("ACCESS_LOG", "false").lower() == "true"
+
     # Database paths
-    CHROMA_PATH: str = "./chroma_db"  # ChromaDB storage location
+    CHROMA_PATH: str = backend_path("chroma_db")  # ChromaDB storage location
+    EMBEDDING_STORE_PATH: str = backend_path("embedding_store")  # Precomputed chunk embeddings ("" to disable)
+    # Prebuilt index archive (see index_snapshot.py) restored on start when no index exists yet
+    INDEX_SNAPSHOT_PATH: str = os.getenv("INDEX_SNAPSHOT_PATH", "")
+
+    # Content index backend: "chroma" or "numpy" (flat in-memory index, memory-mapped from disk)
+    VECTOR_BACKEND: str = os.getenv("VECTOR_BACKEND", "chroma")
+    NUMPY_INDEX_PATH: str = backend_path("numpy_index")
+    PARTITION_CACHE_SIZE: int = 64  # Courses kept as flat partitions for filtered Chroma search (0 disables)
 
 config = Config()
 
@@ -0,0 +1,193 @@
+import bisect
+import multiprocessing
+import os
+import threading
+import xml.etree.ElementTree as ET
+import zipfile
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class ExtractedDocument:
+    """
+    Plain text lines extracted from a binary document, with where each part came from.
+
+    `locations` marks position changes as (first line index, page number, section
+    title), sorted by line index; every line belongs to the last location at or
+    before it.
+    """
+    lines: List[str]
+    locations: List[Tuple[int, Optional[int], Optional[str]]] = field(default_factory=list)
+
+    def locate(self, line_index: int) -> Tuple[Optional[int], Optional[str]]:
+        """Page number and section title of a line"""
+        position = bisect.bisect_right(self.locations, line_index, key=lambda location: location[0])
+        if position == 0:
+            return None, None
+        _, page, section = self.locations[position - 1]
+        return page, section
+
+
+def extract_pdf(file_path: str) -> ExtractedDocument:
+    """Extract text page by page with pypdf (pure Python, optional dependency)"""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise ValueError("PDF ingestion requires pypdf; install with `uv sync --extra documents`")
+
+    lines: List[str] = []
+    locations = []
+    for page_number, page in enumerate(PdfReader(file_path).pages, start=1):
+        locations.append((len(lines), page_number, None))
+        lines.extend((page.extract_text() or "").splitlines())
+    return ExtractedDocument(lines=lines, locations=locations)
+
+
+WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+def _docx_paragraph_text(paragraph: ET.Element) -> str:
+    """Concatenate the runs of a w:p element, honouring tabs and line breaks"""
+    parts = []
+    for node in paragraph.iter():
+        if node.tag == WORD_NS + "t":
+            parts.append(node.text or "")
+        elif node.tag == WORD_NS + "tab":
+            parts.append("\t")
+        elif node.tag in (WORD_NS + "br", WORD_NS + "cr"):
+            parts.append("\n")
+    return "".join(parts)
+
+
+def extract_docx(file_path: str) -> ExtractedDocument:
+    """
+    Extract paragraphs from word/document.xml using only the standard library.
+
+    Paragraphs styled as headings (or Title) start a new section. DOCX files do
+    not store page numbers reliably, so pages are left unset.
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        root = ET.fromstring(archive.read("word/document.xml"))
+
+    body = root.find(WORD_NS + "body")
+    lines: List[str] = []
+    locations = []
+    for paragraph in (body.iter(WORD_NS + "p") if body is not None else []):
+        text = _docx_paragraph_text(paragraph)
+        style = paragraph.find(f"{WORD_NS}pPr/{WORD_NS}pStyle")
+        style_name = style.get(WORD_NS + "val", "") if style is not None else ""
+        if text.strip() and (style_name.lower().startswith("heading") or style_name == "Title"):
+            locations.append((len(lines), None, text.strip()))
+        lines.extend(text.split("\n"))
+    return ExtractedDocument(lines=lines, locations=locations)
+
+
+# Binary formats that need an extractor; anything else is read as UTF-8 text
+EXTRACTORS: Dict[str, Callable[[str], ExtractedDocument]] = {
+    ".pdf": extract_pdf,
+    ".docx": extract_docx,
+}
+
+SUPPORTED_EXTENSIONS = (".txt", *EXTRACTORS)
+
+
+def needs_extraction(file_path: str) -> bool:
+    """Whether a file must go through an extractor rather than being streamed as text"""
+    return os.path.splitext(file_path)[1].lower() in EXTRACTORS
+
+
+def extract_document(file_path: str) -> ExtractedDocument:
+    """Dispatch to the extractor for the file's extension"""
+    extension = os.path.splitext(file_path)[1].lower()
+    extractor = EXTRACTORS.get(extension)
+    if extractor is None:
+        raise ValueError(f"No extractor for '{extension}' files: {file_path}")
+    return extractor(file_path)
+
+
+class ExtractorPool:
+    """
+    Runs document extractors in worker processes with a per-file timeout.
+
+    PDF parsing is CPU-bound and some files make pure-Python parsers spin for a
+    very long time, so extraction happens outside the server process. A file that
+    exceeds the timeout gets the pool terminated (the only way to stop a running
+    worker) and a fresh pool is started. Other files that were in flight on the
+    terminated pool are resubmitted to the fresh one with a new timeout.
+    """
+
+    def __init__(self, max_workers: int = 2, timeout: float = 60.0,
+                 extractor: Callable[[str], ExtractedDocument] = extract_document):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        # Must be a module-level function so worker processes can import it
+        self.extractor = extractor
+        self._pool = None
+        self._waiters: set = set()  # Wake-up events of files in flight on the current pool
+        self._lock = threading.Lock()
+        # Spawned (not forked) workers: the parent has model and database threads running
+        self._context = multiprocessing.get_context("spawn")
+
+    def _submit(self, file_path: str):
+        """Start extracting on the current pool; returns (pool, event set when done or abandoned, outcome)"""
+        done = threading.Event()
+        outcome: List[Tuple[bool, object]] = []
+
+        def finish(ok: bool, value):
+            outcome.append((ok, value))
+            done.set()
+
+        with self._lock:
+            if self._pool is None:
+                self._pool = self._context.Pool(processes=self.max_workers)
+                self._waiters = set()
+            self._waiters.add(done)
+            self._pool.apply_async(
+                self.extractor, (file_path,),
+                callback=lambda value: finish(True, value),
+                error_callback=lambda error: finish(False, error),
+            )
+            return self._pool, done, outcome
+
+    def _terminate(self, pool):
+        """Replace a pool whose worker is stuck; files in flight on it are woken to resubmit"""
+        with self._lock:
+            if self._pool is not pool:
+                return  # Already replaced; its waiters were woken then
+            self._pool, waiters = None, self._waiters
+            self._waiters = set()
+        pool.terminate()
+        for done in waiters:
+            done.set()
+
+    def extract(self, file_path: str) -> ExtractedDocument:
+        """
+        Extract a document in a worker process.
+
+        Raises:
+            TimeoutError: If extraction takes longer than the timeout
+            ValueError: If the format is unsupported or its extractor is unavailable
+        """
+        while True:
+            pool, done, outcome = self._submit(file_path)
+            finished = done.wait(self.timeout)
+            with self._lock:
+                self._waiters.discard(done)
+            if outcome:
+                ok, value = outcome[0]
+                if ok:
+                    return value
+                raise value
+            if not finished:
+                self._terminate(pool)
+                raise TimeoutError(f"Extracting {file_path} took longer than {self.timeout}s")
+            # Another file's timeout terminated the pool under this one; run it again
+
+    def close(self):
+        """Stop the worker processes"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.terminate()
+            pool.join()
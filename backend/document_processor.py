@@ -1,7 +1,28 @@
+import bisect
+import itertools
 import os
 import re
-from typing import List, Tuple
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
 from models import Course, Lesson, CourseChunk
+from document_extractors import ExtractedDocument
+
+# Maps a source line index to (page number, section title)
+Locator = Callable[[int], Tuple[Optional[int], Optional[str]]]
+
+# Transcript format, matched against stripped lines
+COURSE_TITLE = re.compile(r'^Course Title:\s*(.+)$', re.IGNORECASE)
+COURSE_LINK = re.compile(r'^Course Link:\s*(.+)$', re.IGNORECASE)
+COURSE_INSTRUCTOR = re.compile(r'^Course Instructor:\s*(.+)$', re.IGNORECASE)
+LESSON_MARKER = re.compile(r'^Lesson\s+(\d+):\s*(.+)$', re.IGNORECASE)
+LESSON_LINK = re.compile(r'^Lesson Link:\s*(.+)$', re.IGNORECASE)
+
+WHITESPACE_RUN = re.compile(r'\s{2,}')
+
+# Sentence boundaries: whitespace after ., ! or ? followed by a capital letter,
+# ignoring common abbreviations (e.g. "e.g. Foo", "Mr. Smith"). The match starts at
+# the punctuation so the regex engine can scan for it instead of trying the
+# lookbehinds at every position; the boundary itself is the whitespace after it.
+SENTENCE_BOUNDARY = re.compile(r'[.!?](?<!\w\.\w.)(?<![A-Z][a-z]\.)\s+(?=[A-Z])')
 
 class DocumentProcessor:
     """Processes course documents and extracts structured information"""
@@ -24,76 +45,115 @@ class DocumentProcessor:
 
     def chunk_text(self, text: str) -> List[str]:
         """Split text into sentence-based chunks with overlap using config settings"""
-        
+        return [chunk for chunk, _, _ in self.chunk_text_with_offsets(text)]
+
+    def chunk_text_with_offsets(self, text: str) -> List[Tuple[str, int, int]]:
+        """
+        Split text into sentence-based chunks with overlap, keeping character offsets.
+
+        Chunks are packed greedily from sentence boundaries: each chunk takes as many
+        whole sentences as fit in chunk_size, and the next chunk starts at the earliest
+        sentence of the previous one that fits in chunk_overlap. Sentence start/end
+        offsets make every chunk length and overlap a subtraction, so the window is
+        moved with two pointers in O(n) and chunk text is a single slice. Sentences
+        longer than chunk_size are split at word boundaries (or hard-cut) first.
+
+        Returns:
+            List of (chunk_text, start_char, end_char). Chunk text has whitespace
+            normalized to single spaces; the offsets index into `text` itself, so
+            `text[start_char:end_char]` is the chunk before normalization.
+        """
         # Clean up the text
-        text = re.sub(r'\s+', ' ', text.strip())  # Normalize whitespace
-        
-        # Better sentence splitting that handles abbreviations
-        # This regex looks for periods followed by whitespace and capital letters
-        # but ignores common abbreviations
-        sentence_endings = re.compile(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\!|\?)\s+(?=[A-Z])')
-        sentences = sentence_endings.split(text)
-        
-        # Clean sentences
-        sentences = [s.strip() for s in sentences if s.strip()]
-        
+        stripped = text.strip()
+        normalized = ' '.join(stripped.split())  # Normalize whitespace
+        if not normalized:
+            return []
+
+        starts, ends = self._sentence_spans(normalized)
+        to_original = self._offset_mapper(text, stripped, normalized)
+        overlap = self.chunk_overlap
+
         chunks = []
+        count = len(starts)
         i = 0
-        
-        while i < len(sentences):
-            current_chunk = []
-            current_size = 0
-            
-            # Build chunk starting from sentence i
-            for j in range(i, len(sentences)):
-                sentence = sentences[j]
-                
-                # Calculate size with space
-                space_size = 1 if current_chunk else 0
-                total_addition = len(sentence) + space_size
-                
-                # Check if adding this sentence would exceed chunk size
-                if current_size + total_addition > self.chunk_size and current_chunk:
-                    break
-                
-                current_chunk.append(sentence)
-                current_size += total_addition
-            
-            # Add chunk if we have content
-            if current_chunk:
-                chunks.append(' '.join(current_chunk))
-                
-                # Calculate overlap for next chunk
-                if hasattr(self, 'chunk_overlap') and self.chunk_overlap > 0:
-                    # Find how many sentences to overlap
-                    overlap_size = 0
-                    overlap_sentences = 0
-                    
-                    # Count backwards from end of current chunk
-                    for k in range(len(current_chunk) - 1, -1, -1):
-                        sentence_len = len(current_chunk[k]) + (1 if k < len(current_chunk) - 1 else 0)
-                        if overlap_size + sentence_len <= self.chunk_overlap:
-                            overlap_size += sentence_len
-                            overlap_sentences += 1
-                        else:
-                            break
-                    
-                    # Move start position considering overlap
-                    next_start = i + len(current_chunk) - overlap_sentences
-                    i = max(next_start, i + 1)  # Ensure we make progress
-                else:
-                    # No overlap - move to next sentence after current chunk
-                    i += len(current_chunk)
+        stop = 0     # One past the last sentence of the current chunk
+        resume = 0   # Earliest sentence of the current chunk inside the overlap
+        while i < count:
+            # Extend the window while the chunk still fits (always take sentence i)
+            stop = max(stop, i + 1)
+            while stop < count and ends[stop] - starts[i] <= self.chunk_size:
+                stop += 1
+
+            chunk_start, chunk_end = starts[i], ends[stop - 1]
+            chunks.append((normalized[chunk_start:chunk_end],
+                           to_original(chunk_start), to_original(chunk_end - 1) + 1))
+
+            if overlap > 0:
+                # Trailing sentences that fit in the overlap are repeated in the next chunk
+                resume = max(resume, i)
+                while resume < stop and chunk_end - starts[resume] > overlap:
+                    resume += 1
+                i = max(resume, i + 1)  # Ensure we make progress
             else:
-                # No sentences fit, move to next
-                i += 1
-        
+                # No overlap - move to next sentence after current chunk
+                i = stop
+
         return chunks
 
+    def _sentence_spans(self, text: str) -> Tuple[List[int], List[int]]:
+        """Start and end offsets of each sentence, with oversized sentences split to fit chunk_size"""
+        boundaries = [match.span() for match in SENTENCE_BOUNDARY.finditer(text)]
+        starts = [0] + [end for _, end in boundaries]
+        ends = [start + 1 for start, _ in boundaries] + [len(text)]
+        if all(end - start <= self.chunk_size for start, end in zip(starts, ends)):
+            return starts, ends
+
+        split_starts, split_ends = [], []
+        for position, sentence_end in zip(starts, ends):
+            while sentence_end - position > self.chunk_size:
+                # Cut at the last space that keeps the piece within chunk_size
+                cut = text.rfind(' ', position + 1, position + self.chunk_size + 1)
+                split_starts.append(position)
+                if cut == -1:
+                    split_ends.append(position + self.chunk_size)
+                    position += self.chunk_size
+                else:
+                    split_ends.append(cut)
+                    position = cut + 1
+            split_starts.append(position)
+            split_ends.append(sentence_end)
+        return split_starts, split_ends
 
+    @staticmethod
+    def _offset_mapper(text: str, stripped: str, normalized: str) -> Callable[[int], int]:
+        """Map a character position in the whitespace-normalized text back to `text`"""
+        leading = len(text) - len(text.lstrip())
+        if len(stripped) == len(normalized):
+            # No whitespace runs were collapsed
+            return lambda position: position + leading
 
+        # Only runs of two or more whitespace characters shift later positions
+        run_positions, run_shifts = [], []
+        removed = 0
+        for start, end in (match.span() for match in WHITESPACE_RUN.finditer(stripped)):
+            run_positions.append(start - removed)
+            removed += end - start - 1
+            run_shifts.append(removed)
+
+        def to_original(position: int) -> int:
+            runs_before = bisect.bisect_left(run_positions, position)
+            shift = run_shifts[runs_before - 1] if runs_before else 0
+            return position + shift + leading
+
+        return to_original
+
+    def iter_lines(self, file_path: str) -> Iterator[str]:
+        """Yield lines of a UTF-8 text file lazily, without trailing newlines"""
+        # Undecodable bytes are dropped, matching read_file's fallback
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
+            for line in file:
+                yield line.rstrip('\n')
 
-    
     def process_course_document(self, file_path: str) -> Tuple[Course, List[CourseChunk]]:
         """
         Process a course document with expected format:
@@ -102,158 +162,215 @@ class DocumentProcessor:
         Line 3: Course Instructor: [instructor]
         Following lines: Lesson markers and content
         """
-        content = self.read_file(file_path)
-        filename = os.path.basename(file_path)
-        
-        lines = content.strip().split('\n')
-        
-        # Extract course metadata from first three lines
+        course, chunks = self.stream_course_document(file_path)
+        return course, list(chunks)
+
+    def stream_course_document(self, file_path: str) -> Tuple[Course, Iterator[CourseChunk]]:
+        """
+        Parse a course document incrementally.
+
+        The header (title, link, instructor) is read eagerly so callers can decide
+        whether to ingest the course before touching the rest of the file. The
+        returned iterator then reads the file line by line and yields each lesson's
+        chunks as soon as the lesson closes, appending the Lesson to `course.lessons`.
+        Peak memory is bounded by one lesson rather than the whole file.
+
+        Returns:
+            Tuple of (Course, iterator of CourseChunk). `course.lessons` is complete
+            once the iterator is exhausted.
+        """
+        return self.stream_course_lines(self.iter_lines(file_path), os.path.basename(file_path))
+
+    def stream_extracted_document(self, document: ExtractedDocument,
+                                  file_path: str) -> Tuple[Course, Iterator[CourseChunk]]:
+        """Parse text extracted from a PDF/DOCX, tagging chunks with their page and section"""
+        return self.stream_course_lines(iter(document.lines), os.path.basename(file_path),
+                                        locate=document.locate)
+
+    def stream_course_lines(self, lines: Iterator[str], filename: str,
+                            locate: Optional[Locator] = None) -> Tuple[Course, Iterator[CourseChunk]]:
+        """
+        Parse course lines in the transcript format (see stream_course_document).
+
+        Args:
+            lines: Document lines without trailing newlines
+            filename: Used as the course title when the document has none
+            locate: Optional map from line index to (page number, section title)
+        """
+        # Read the first four lines (after any leading blank lines) for course metadata
+        header = []
+        skipped = 0
+        for line in lines:
+            if not header and not line.strip():
+                skipped += 1
+                continue
+            header.append(line)
+            if len(header) == 4:
+                break
+        else:
+            # Whole document fits in the header; drop trailing blank lines like str.strip()
+            while header and not header[-1].strip():
+                header.pop()
+
+        course = self._parse_course_header(header, filename)
+
+        # Start processing from line 4 (after metadata)
+        start_index = 3
+        if len(header) > 3 and not header[3].strip():
+            start_index = 4  # Skip empty line after instructor
+
+        body = itertools.chain(header[start_index:], lines)
+        return course, self._iter_course_chunks(course, body, has_body=len(header) > 2,
+                                                first_line=skipped + start_index, locate=locate)
+
+    def _parse_course_header(self, header: List[str], filename: str) -> Course:
+        """Build the Course from the title, link and instructor lines"""
         course_title = filename  # Default fallback
         course_link = None
-        instructor_name = "Unknown"
-        
+        instructor_name = None
+
         # Parse course title from first line
-        if len(lines) >= 1 and lines[0].strip():
-            title_match = re.match(r'^Course Title:\s*(.+)$', lines[0].strip(), re.IGNORECASE)
-            if title_match:
-                course_title = title_match.group(1).strip()
-            else:
-                course_title = lines[0].strip()
-        
+        if header and header[0].strip():
+            title_line = header[0].strip()
+            title_match = COURSE_TITLE.match(title_line)
+            course_title = title_match.group(1).strip() if title_match else title_line
+
         # Parse remaining lines for course metadata
-        for i in range(1, min(len(lines), 4)):  # Check first 4 lines for metadata
-            line = lines[i].strip()
-            if not line:
-                continue
-                
-            # Try to match course link
-            link_match = re.match(r'^Course Link:\s*(.+)$', line, re.IGNORECASE)
+        for line in header[1:4]:
+            line = line.strip()
+            link_match = COURSE_LINK.match(line)
             if link_match:
                 course_link = link_match.group(1).strip()
                 continue
-                
-            # Try to match instructor
-            instructor_match = re.match(r'^Course Instructor:\s*(.+)$', line, re.IGNORECASE)
+            instructor_match = COURSE_INSTRUCTOR.match(line)
             if instructor_match:
                 instructor_name = instructor_match.group(1).strip()
-                continue
-        
+
         # Create course object with title as ID
-        course = Course(
+        return Course(
             title=course_title,
             course_link=course_link,
             instructor=instructor_name if instructor_name != "Unknown" else None
         )
-        
-        # Process lessons and create chunks
-        course_chunks = []
-        current_lesson = None
+
+    def _chunk_locations(self, lines: List[str], first_line: int, chunks: List[Tuple[str, int, int]],
+                         locate: Optional[Locator]) -> List[Tuple[Optional[int], Optional[str]]]:
+        """Page and section of each chunk's first character, for text joined from `lines`"""
+        if locate is None:
+            return [(None, None)] * len(chunks)
+
+        # Offsets are relative to the stripped text; map them back to source lines
+        joined = '\n'.join(lines)
+        leading = len(joined) - len(joined.lstrip())
+        line_starts = list(itertools.accumulate((len(line) + 1 for line in lines[:-1]), initial=0))
+        return [locate(first_line + bisect.bisect_right(line_starts, start_char + leading) - 1)
+                for _, start_char, _ in chunks]
+
+    def _lesson_chunks(self, course: Course, lesson_number: int, lesson_title: str,
+                       lesson_link: Optional[str], lesson_lines: List[str],
+                       chunk_counter: int, first_line: int = 0,
+                       locate: Optional[Locator] = None) -> List[CourseChunk]:
+        """Close a lesson: register it on the course and chunk its content"""
+        lesson_text = '\n'.join(lesson_lines).strip()
+        if not lesson_text:
+            return []
+
+        course.lessons.append(Lesson(
+            lesson_number=lesson_number,
+            title=lesson_title,
+            lesson_link=lesson_link
+        ))
+
+        # Every chunk carries its course and lesson so it stands alone in search results
+        context = f"Course {course.title} Lesson {lesson_number} content: "
+        chunks = self.chunk_text_with_offsets(lesson_text)
+        locations = self._chunk_locations(lesson_lines, first_line, chunks, locate)
+        return [
+            CourseChunk(
+                content=context + chunk,
+                course_title=course.title,
+                lesson_number=lesson_number,
+                chunk_index=chunk_counter + idx,
+                start_char=start_char,
+                end_char=end_char,
+                page_number=page_number,
+                section=section
+            )
+            for idx, ((chunk, start_char, end_char), (page_number, section)) in enumerate(zip(chunks, locations))
+        ]
+
+    def _iter_course_chunks(self, course: Course, body: Iterable[str], has_body: bool,
+                            first_line: int = 0, locate: Optional[Locator] = None) -> Iterator[CourseChunk]:
+        """
+        Single pass over the document body, yielding each lesson's chunks as it closes.
+
+        Each line is either a lesson marker ("Lesson 0: Introduction"), the lesson
+        link directly after a marker, or lesson content. A marker or the end of the
+        document closes the open lesson.
+        """
+        lesson_number = None
         lesson_title = None
         lesson_link = None
-        lesson_content = []
+        lesson_lines: List[str] = []
+        lesson_first_line = 0
         chunk_counter = 0
-        
-        # Start processing from line 4 (after metadata)
-        start_index = 3
-        if len(lines) > 3 and not lines[3].strip():
-            start_index = 4  # Skip empty line after instructor
-        
-        i = start_index
-        while i < len(lines):
-            line = lines[i]
-            
-            # Check for lesson markers (e.g., "Lesson 0: Introduction")
-            lesson_match = re.match(r'^Lesson\s+(\d+):\s*(.+)$', line.strip(), re.IGNORECASE)
-            
+        expecting_link = False
+
+        # Body lines are retained only until the first chunk is produced, for documents
+        # without lesson markers (treated as one document at the end)
+        fallback_lines: Optional[List[str]] = []
+
+        # None marks the end of the document
+        for line_index, line in enumerate(itertools.chain(body, (None,)), start=first_line):
+            lesson_match = None
+            if line is not None:
+                if fallback_lines is not None:
+                    fallback_lines.append(line)
+                stripped = line.strip()
+
+                if expecting_link:
+                    expecting_link = False
+                    link_match = LESSON_LINK.match(stripped)
+                    if link_match:
+                        lesson_link = link_match.group(1).strip()
+                        continue  # Skip the link line so it's not added to content
+
+                lesson_match = LESSON_MARKER.match(stripped)
+                if not lesson_match:
+                    if lesson_number is not None:
+                        if not lesson_lines:
+                            lesson_first_line = line_index
+                        lesson_lines.append(line)
+                    continue
+
+            if lesson_number is not None and lesson_lines:
+                chunks = self._lesson_chunks(course, lesson_number, lesson_title, lesson_link,
+                                             lesson_lines, chunk_counter, lesson_first_line, locate)
+                if chunks:
+                    fallback_lines = None
+                    chunk_counter += len(chunks)
+                    yield from chunks
+
             if lesson_match:
-                # Process previous lesson if it exists
-                if current_lesson is not None and lesson_content:
-                    lesson_text = '\n'.join(lesson_content).strip()
-                    if lesson_text:
-                        # Add lesson to course
-                        lesson = Lesson(
-                            lesson_number=current_lesson,
-                            title=lesson_title,
-                            lesson_link=lesson_link
-                        )
-                        course.lessons.append(lesson)
-                        
-                        # Create chunks for this lesson
-                        chunks = self.chunk_text(lesson_text)
-                        for idx, chunk in enumerate(chunks):
-                            # For the first chunk of each lesson, add lesson context
-                            if idx == 0:
-                                chunk_with_context = f"Lesson {current_lesson} content: {chunk}"
-                            else:
-                                chunk_with_context = chunk
-                            
-                            course_chunk = CourseChunk(
-                                content=chunk_with_context,
-                                course_title=course.title,
-                                lesson_number=current_lesson,
-                                chunk_index=chunk_counter
-                            )
-                            course_chunks.append(course_chunk)
-                            chunk_counter += 1
-                
-                # Start new lesson
-                current_lesson = int(lesson_match.group(1))
+                lesson_number = int(lesson_match.group(1))
                 lesson_title = lesson_match.group(2).strip()
                 lesson_link = None
-                
-                # Check if next line is a lesson link
-                if i + 1 < len(lines):
-                    next_line = lines[i + 1].strip()
-                    link_match = re.match(r'^Lesson Link:\s*(.+)$', next_line, re.IGNORECASE)
-                    if link_match:
-                        lesson_link = link_match.group(1).strip()
-                        i += 1  # Skip the link line so it's not added to content
-                
-                lesson_content = []
-            else:
-                # Add line to current lesson content
-                lesson_content.append(line)
-                
-            i += 1
-        
-        # Process the last lesson
-        if current_lesson is not None and lesson_content:
-            lesson_text = '\n'.join(lesson_content).strip()
-            if lesson_text:
-                lesson = Lesson(
-                    lesson_number=current_lesson,
-                    title=lesson_title,
-                    lesson_link=lesson_link
-                )
-                course.lessons.append(lesson)
-                
-                chunks = self.chunk_text(lesson_text)
-                for idx, chunk in enumerate(chunks):
-                    # For any chunk of each lesson, add lesson context & course title
-                  
-                    chunk_with_context = f"Course {course_title} Lesson {current_lesson} content: {chunk}"
-                    
-                    course_chunk = CourseChunk(
-                        content=chunk_with_context,
-                        course_title=course.title,
-                        lesson_number=current_lesson,
-                        chunk_index=chunk_counter
-                    )
-                    course_chunks.append(course_chunk)
-                    chunk_counter += 1
-        
+                lesson_lines = []
+                expecting_link = True
+
         # If no lessons found, treat entire content as one document
-        if not course_chunks and len(lines) > 2:
-            remaining_content = '\n'.join(lines[start_index:]).strip()
-            if remaining_content:
-                chunks = self.chunk_text(remaining_content)
-                for chunk in chunks:
-                    course_chunk = CourseChunk(
-                        content=chunk,
-                        course_title=course.title,
-                        chunk_index=chunk_counter
-                    )
-                    course_chunks.append(course_chunk)
-                    chunk_counter += 1
-        
-        return course, course_chunks
+        if fallback_lines is not None and has_body:
+            remaining_content = '\n'.join(fallback_lines).strip()
+            chunks = self.chunk_text_with_offsets(remaining_content)
+            locations = self._chunk_locations(fallback_lines, first_line, chunks, locate)
+            for (chunk, start_char, end_char), (page_number, section) in zip(chunks, locations):
+                yield CourseChunk(
+                    content=chunk,
+                    course_title=course.title,
+                    chunk_index=chunk_counter,
+                    start_char=start_char,
+                    end_char=end_char,
+                    page_number=page_number,
+                    section=section
+                )
+                chunk_counter += 1
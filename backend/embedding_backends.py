@@ -0,0 +1,130 @@
+import os
+from typing import Any, List, Optional
+
+import numpy as np
+from chromadb.api.types import Documents, Embeddings
+from chromadb.utils.embedding_functions import (
+    ONNXMiniLM_L6_V2,
+    SentenceTransformerEmbeddingFunction,
+)
+
+# Backend names accepted by Config.EMBEDDING_BACKEND
+SENTENCE_TRANSFORMERS = "sentence-transformers"
+ONNX = "onnx"
+ONNX_INT8 = "onnx-int8"
+
+EMBEDDING_BACKENDS = (SENTENCE_TRANSFORMERS, ONNX, ONNX_INT8)
+
+
+class OnnxMiniLMEmbeddingFunction(ONNXMiniLM_L6_V2):
+    """
+    ONNX Runtime variant of all-MiniLM-L6-v2 for CPU serving.
+
+    Reuses ChromaDB's model download and verification, but pads each batch only to
+    its longest sequence instead of a fixed 256 tokens, and can run a dynamically
+    int8-quantized copy of the model.
+    """
+
+    QUANTIZED_MODEL_FILENAME = "model_int8.onnx"
+    MAX_SEQ_LENGTH = 256  # Matches sentence-transformers' max_seq_length for this model
+
+    def __init__(self, quantized: bool = False, preferred_providers: Optional[List[str]] = None):
+        super().__init__(preferred_providers=preferred_providers or ["CPUExecutionProvider"])
+        self.quantized = quantized
+
+    @property
+    def _model_dir(self) -> str:
+        return os.path.join(self.DOWNLOAD_PATH, self.EXTRACTED_FOLDER_NAME)
+
+    def _model_path(self) -> str:
+        """Path of the ONNX graph to load, quantizing the fp32 model on first use"""
+        fp32_path = os.path.join(self._model_dir, "model.onnx")
+        if not self.quantized:
+            return fp32_path
+
+        int8_path = os.path.join(self._model_dir, self.QUANTIZED_MODEL_FILENAME)
+        if not os.path.exists(int8_path):
+            try:
+                from onnxruntime.quantization import QuantType, quantize_dynamic
+            except ImportError:
+                raise ValueError(
+                    "The onnx-int8 embedding backend needs the onnx package to quantize the model. "
+                    "Install it with `uv sync --extra quantization`"
+                )
+            tmp_path = int8_path + ".tmp"
+            quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+            os.replace(tmp_path, int8_path)
+        return int8_path
+
+    @property
+    def tokenizer(self) -> Any:
+        if not hasattr(self, "_tokenizer"):
+            tokenizer = self.Tokenizer.from_file(os.path.join(self._model_dir, "tokenizer.json"))
+            tokenizer.enable_truncation(max_length=self.MAX_SEQ_LENGTH)
+            tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")  # Pad to longest in batch
+            self._tokenizer = tokenizer
+        return self._tokenizer
+
+    @property
+    def model(self) -> Any:
+        if not hasattr(self, "_session"):
+            options = self.ort.SessionOptions()
+            options.log_severity_level = 3
+            options.graph_optimization_level = self.ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            self._session = self.ort.InferenceSession(
+                self._model_path(),
+                providers=self._preferred_providers,
+                sess_options=options
+            )
+        return self._session
+
+    def _forward(self, documents: List[str], batch_size: int = 32) -> np.ndarray:
+        """Mean-pooled, L2-normalized embeddings with per-batch dynamic padding"""
+        all_embeddings = []
+        for i in range(0, len(documents), batch_size):
+            encoded = self.tokenizer.encode_batch(documents[i:i + batch_size])
+            input_ids = np.array([e.ids for e in encoded], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
+
+            last_hidden_state = self.model.run(None, {
+                "input_ids": input_ids,
+                "attention_mask": attention_mask,
+                "token_type_ids": np.zeros_like(input_ids),
+            })[0]
+
+            mask = attention_mask[..., np.newaxis].astype(np.float32)
+            embeddings = (last_hidden_state * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            all_embeddings.append(self._normalize(embeddings).astype(np.float32))
+
+        return np.concatenate(all_embeddings)
+
+    def __call__(self, input: Documents) -> Embeddings:
+        self._download_model_if_not_exists()
+        return [embedding for embedding in self._forward(list(input))]
+
+
+def create_embedding_function(backend: str, model_name: str):
+    """
+    Build the embedding function for the configured backend.
+
+    Args:
+        backend: One of EMBEDDING_BACKENDS
+        model_name: Sentence-transformers model name (Config.EMBEDDING_MODEL)
+
+    Returns:
+        Callable mapping a list of texts to a list of embedding vectors
+    """
+    if backend == SENTENCE_TRANSFORMERS:
+        return SentenceTransformerEmbeddingFunction(model_name=model_name)
+
+    if backend in (ONNX, ONNX_INT8):
+        if model_name.split("/")[-1] != OnnxMiniLMEmbeddingFunction.MODEL_NAME:
+            raise ValueError(
+                f"The {backend} embedding backend only supports "
+                f"{OnnxMiniLMEmbeddingFunction.MODEL_NAME}, not '{model_name}'"
+            )
+        return OnnxMiniLMEmbeddingFunction(quantized=(backend == ONNX_INT8))
+
+    raise ValueError(
+        f"Unknown embedding backend '{backend}'. Expected one of: {', '.join(EMBEDDING_BACKENDS)}"
+    )
@@ -0,0 +1,184 @@
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+class EmbeddingService:
+    """
+    In-process embedding worker that coalesces concurrent requests into micro-batches.
+
+    Callers submit lists of texts and receive a Future. A single background thread
+    drains the request queue, waits up to ``max_wait_ms`` for more requests to
+    arrive (or until ``max_batch_size`` texts are pending), runs one forward pass
+    over the combined batch and resolves each caller's future with its slice.
+
+    Background requests (bulk ingestion) are split into slices of at most
+    ``max_batch_size`` texts and only dequeued when no foreground request is
+    waiting, so a query never waits behind more than one slice's forward pass.
+    """
+
+    # Queue priorities: lower runs first; stop is processed after pending work
+    FOREGROUND = 0
+    BACKGROUND = 1
+    _STOP_PRIORITY = 2
+    _STOP = object()
+
+    def __init__(self,
+                 encode: Callable[[List[str]], Sequence[Any]],
+                 max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0):
+        self.encode = encode
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        # Entries are (priority, sequence, item); the sequence keeps FIFO order within a priority
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "background_requests": 0,
+            "texts": 0,
+            "batches": 0,
+            "max_batch_size": 0,
+            "max_queue_depth": 0,
+            "errors": 0,
+        }
+
+        self._worker = threading.Thread(target=self._run, name="embedding-service", daemon=True)
+        self._worker.start()
+
+    def _put(self, priority: int, item):
+        self._queue.put((priority, next(self._sequence), item))
+
+    def submit(self, texts: List[str], background: bool = False) -> Future:
+        """
+        Queue texts for embedding and return a Future resolving to their embeddings.
+
+        Args:
+            texts: Texts to embed
+            background: Low-priority bulk work, yielded to foreground requests between slices
+        """
+        future: Future = Future()
+        if not texts:
+            future.set_result([])
+            return future
+
+        texts = list(texts)
+        if background:
+            self._submit_background(texts, future)
+        else:
+            self._put(self.FOREGROUND, (texts, future))
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["background_requests"] += int(background)
+            self._stats["texts"] += len(texts)
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self._queue.qsize())
+        return future
+
+    def _submit_background(self, texts: List[str], future: Future):
+        """Queue texts as max_batch_size slices that resolve `future` once all are embedded"""
+        slices = [texts[start:start + self.max_batch_size]
+                  for start in range(0, len(texts), self.max_batch_size)]
+        results: List[Optional[List[Any]]] = [None] * len(slices)
+        remaining = [len(slices)]
+        lock = threading.Lock()
+
+        def slice_done(index: int, slice_future: Future):
+            error = slice_future.exception()
+            with lock:
+                if future.done():
+                    return
+                if error is not None:
+                    future.set_exception(error)
+                    return
+                results[index] = slice_future.result()
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            future.set_result([embedding for part in results for embedding in part])
+
+        for index, texts_slice in enumerate(slices):
+            slice_future: Future = Future()
+            slice_future.add_done_callback(lambda f, index=index: slice_done(index, f))
+            self._put(self.BACKGROUND, (texts_slice, slice_future))
+
+    def embed(self, texts: List[str], timeout: Optional[float] = None, background: bool = False) -> List[Any]:
+        """Embed texts, blocking until the batch containing them has been processed"""
+        return self.submit(texts, background=background).result(timeout=timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return queue-depth and batch-size metrics for monitoring"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["avg_batch_size"] = (
+            round(stats["texts"] / stats["batches"], 2) if stats["batches"] else 0.0
+        )
+        return stats
+
+    def close(self, timeout: Optional[float] = None):
+        """Stop the worker after pending requests have been processed"""
+        if self._worker.is_alive():
+            self._put(self._STOP_PRIORITY, self._STOP)
+            self._worker.join(timeout)
+
+    def _collect_batch(self, first) -> tuple:
+        """Gather requests arriving within the batching window, starting from `first`"""
+        batch = [first]
+        pending = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+
+        while pending < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            item = entry[2]
+            if item is self._STOP:
+                return batch, True
+            if pending + len(item[0]) > self.max_batch_size:
+                # Leave it for the next pass so one forward pass stays within max_batch_size
+                self._queue.put(entry)
+                break
+            batch.append(item)
+            pending += len(item[0])
+
+        return batch, False
+
+    def _run(self):
+        """Worker loop: block for a request, coalesce a micro-batch, encode, dispatch"""
+        while True:
+            _, _, first = self._queue.get()
+            if first is self._STOP:
+                return
+
+            batch, stop = self._collect_batch(first)
+            self._process(batch)
+            if stop:
+                return
+
+    def _process(self, batch: List[tuple]):
+        """Run one forward pass over a micro-batch and resolve each request's future"""
+        texts = [text for request_texts, _ in batch for text in request_texts]
+        try:
+            embeddings = list(self.encode(texts))
+        except Exception as e:
+            with self._lock:
+                self._stats["errors"] += 1
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["max_batch_size"] = max(self._stats["max_batch_size"], len(texts))
+
+        offset = 0
+        for request_texts, future in batch:
+            future.set_result(embeddings[offset:offset + len(request_texts)])
+            offset += len(request_texts)
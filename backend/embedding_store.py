@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+class EmbeddingStore:
+    """
+    Content-addressed store of precomputed embeddings, persisted as memory-mapped NumPy files.
+
+    Vectors are keyed by a hash of the chunk text and namespaced by embedding model,
+    so rebuilding the index (after clear_all_data, a chunker experiment or a
+    collection migration) only runs the model for text it has never seen.
+
+    On-disk layout under ``<path>/<model>/``:
+        vectors.npy  float32 matrix (capacity x dim), memory-mapped
+        keys.npy     16-byte text digests (capacity,), memory-mapped
+        meta.json    model name, dimension and number of valid rows
+    """
+
+    INITIAL_CAPACITY = 1024
+    KEY_DTYPE = "V16"  # Raw bytes; "S16" would strip trailing NULs from digests
+
+    def __init__(self, path: str, model_name: str):
+        self.model_name = model_name
+        self.path = os.path.join(path, self._model_dir_name(model_name))
+        os.makedirs(self.path, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._vectors: Optional[np.ndarray] = None
+        self._keys: Optional[np.ndarray] = None
+        self._rows: Dict[bytes, int] = {}
+        self._count = 0
+        self._dim: Optional[int] = None
+        self._stats = {"hits": 0, "misses": 0}
+        self._load()
+
+    @staticmethod
+    def _model_dir_name(model_name: str) -> str:
+        """Filesystem-safe directory name for a model, e.g. 'sentence-transformers/x' -> 'sentence-transformers__x'"""
+        return re.sub(r"[^A-Za-z0-9._-]+", "__", model_name)
+
+    @staticmethod
+    def text_key(text: str) -> bytes:
+        """Content address of a chunk text"""
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.path, "meta.json")
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.path, "vectors.npy")
+
+    @property
+    def _keys_path(self) -> str:
+        return os.path.join(self.path, "keys.npy")
+
+    def _load(self):
+        """Open existing memory-mapped files, if any"""
+        if not os.path.exists(self._meta_path):
+            return
+        try:
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            self._dim = meta["dim"]
+            self._count = meta["count"]
+            self._vectors = np.load(self._vectors_path, mmap_mode="r+")
+            self._keys = np.load(self._keys_path, mmap_mode="r+")
+            self._rows = {bytes(key): row for row, key in enumerate(self._keys[:self._count])}
+        except Exception as e:
+            print(f"Error loading embedding store at {self.path}, starting empty: {e}")
+            self._vectors = self._keys = None
+            self._rows = {}
+            self._count = 0
+            self._dim = None
+
+    def _allocate(self, capacity: int):
+        """(Re)allocate the memory-mapped files with room for `capacity` rows"""
+        vectors_tmp = self._vectors_path + ".tmp.npy"
+        keys_tmp = self._keys_path + ".tmp.npy"
+        vectors = np.lib.format.open_memmap(vectors_tmp, mode="w+", dtype=np.float32, shape=(capacity, self._dim))
+        keys = np.lib.format.open_memmap(keys_tmp, mode="w+", dtype=self.KEY_DTYPE, shape=(capacity,))
+        if self._count:
+            vectors[:self._count] = self._vectors[:self._count]
+            keys[:self._count] = self._keys[:self._count]
+        vectors.flush()
+        keys.flush()
+        del vectors, keys
+        self._vectors = self._keys = None
+
+        os.replace(vectors_tmp, self._vectors_path)
+        os.replace(keys_tmp, self._keys_path)
+        self._vectors = np.load(self._vectors_path, mmap_mode="r+")
+        self._keys = np.load(self._keys_path, mmap_mode="r+")
+
+    def _write_meta(self):
+        tmp_path = self._meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"model": self.model_name, "dim": self._dim, "count": self._count}, f)
+        os.replace(tmp_path, self._meta_path)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Look up stored vectors for texts; None where the text has not been embedded yet"""
+        with self._lock:
+            results = []
+            for text in texts:
+                row = self._rows.get(self.text_key(text))
+                results.append(None if row is None else np.array(self._vectors[row]))
+            return results
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Any]):
+        """Store vectors for texts, skipping any already present"""
+        if not texts:
+            return
+        with self._lock:
+            matrix = np.asarray(vectors, dtype=np.float32)
+            if self._dim is None:
+                self._dim = matrix.shape[1]
+            elif matrix.shape[1] != self._dim:
+                raise ValueError(f"Embedding dimension {matrix.shape[1]} does not match store dimension {self._dim}")
+
+            new_rows = []
+            for i, text in enumerate(texts):
+                key = self.text_key(text)
+                if key not in self._rows:
+                    self._rows[key] = self._count + len(new_rows)
+                    new_rows.append((key, i))
+            if not new_rows:
+                return
+
+            needed = self._count + len(new_rows)
+            capacity = 0 if self._vectors is None else self._vectors.shape[0]
+            if needed > capacity:
+                while capacity < needed:
+                    capacity = max(capacity * 2, self.INITIAL_CAPACITY)
+                self._allocate(capacity)
+
+            for offset, (key, i) in enumerate(new_rows):
+                self._keys[self._count + offset] = key
+                self._vectors[self._count + offset] = matrix[i]
+            self._count = needed
+
+            self._vectors.flush()
+            self._keys.flush()
+            self._write_meta()
+
+    def embed(self, texts: Sequence[str], embed_fn: Callable[[List[str]], Sequence[Any]]) -> List[np.ndarray]:
+        """
+        Return embeddings for texts, running `embed_fn` only on texts not already stored.
+
+        Args:
+            texts: Texts to embed
+            embed_fn: Model call used for cache misses
+
+        Returns:
+            One float32 vector per input text, in order
+        """
+        cached = self.get_many(texts)
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+
+        with self._lock:
+            self._stats["hits"] += len(texts) - len(missing)
+            self._stats["misses"] += len(missing)
+
+        if missing:
+            # Embed each distinct missing text once
+            unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+            computed = dict(zip(unique_texts, (np.asarray(v, dtype=np.float32) for v in embed_fn(unique_texts))))
+            self.put_many(unique_texts, [computed[t] for t in unique_texts])
+            for i in missing:
+                cached[i] = computed[texts[i]]
+
+        return cached
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return size and hit/miss counters"""
+        with self._lock:
+            return {"model": self.model_name, "vectors": self._count, **self._stats}
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+# (size in bytes, modification time in ns) of a file
+Fingerprint = Tuple[int, int]
+
+
+def scan_folder(folder_path: str, extensions: Sequence[str]) -> Dict[str, Fingerprint]:
+    """Fingerprint every file with a matching extension directly inside folder_path"""
+    snapshot = {}
+    try:
+        entries = list(os.scandir(folder_path))
+    except FileNotFoundError:
+        return snapshot
+    for entry in entries:
+        if entry.is_file() and entry.name.lower().endswith(tuple(extensions)):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue  # Deleted between listing and stat
+            snapshot[os.path.abspath(entry.path)] = (stat.st_size, stat.st_mtime_ns)
+    return snapshot
+
+
+def file_digest(file_path: str) -> str:
+    """Content hash used to tell real edits from timestamp-only changes"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestionManifest:
+    """
+    Record of which file produced which course, persisted as JSON.
+
+    Entries are keyed by absolute file path and hold the size, mtime and content
+    digest seen at ingestion plus the resulting course title, so a later sync can
+    tell new, modified and removed files apart without re-reading unchanged ones.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except Exception as e:
+                print(f"Error loading ingestion manifest {path}, starting empty: {e}")
+
+    def get(self, file_path: str) -> Optional[Dict]:
+        return self.entries.get(file_path)
+
+    def record(self, file_path: str, fingerprint: Fingerprint, digest: str, course_title: str):
+        size, mtime_ns = fingerprint
+        self.entries[file_path] = {
+            "size": size, "mtime_ns": mtime_ns, "digest": digest, "course_title": course_title
+        }
+
+    def remove(self, file_path: str):
+        self.entries.pop(file_path, None)
+
+    def files_in(self, folder_path: str):
+        """Recorded files that live directly inside folder_path"""
+        folder = os.path.abspath(folder_path)
+        return [path for path in self.entries if os.path.dirname(path) == folder]
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+
+class FolderWatcher:
+    """
+    Calls `on_change` after files in a folder settle following a burst of changes.
+
+    Uses watchfiles (inotify and friends) when it is installed and falls back to
+    polling the folder's file fingerprints otherwise. Either way the callback only
+    learns that something changed; it is expected to diff the folder itself, which
+    keeps missed or coalesced events harmless.
+    """
+
+    def __init__(self, folder_path: str, on_change: Callable[[], None], extensions: Sequence[str],
+                 debounce: float = 2.0, poll_interval: float = 1.0, use_watchfiles: bool = True):
+        """
+        Args:
+            folder_path: Folder to watch (not recursive)
+            on_change: Called from the watcher thread once changes have settled
+            extensions: File extensions that matter; other files are ignored
+            debounce: Seconds without further changes before on_change runs
+            poll_interval: Seconds between scans in polling mode
+            use_watchfiles: Use watchfiles if importable; False forces polling
+        """
+        self.folder_path = folder_path
+        self.on_change = on_change
+        self.extensions = tuple(extensions)
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.use_watchfiles = use_watchfiles
+        self.mode: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._baseline: Dict[str, Fingerprint] = {}
+
+    def _notify(self):
+        try:
+            self.on_change()
+        except Exception as e:
+            print(f"Error handling changes in {self.folder_path}: {e}")
+
+    def _watch_events(self, watchfiles):
+        extensions = self.extensions
+        watch_filter = lambda change, path: path.lower().endswith(extensions)
+        for _ in watchfiles.watch(self.folder_path, watch_filter=watch_filter,
+                                  debounce=int(self.debounce * 1000), stop_event=self._stop,
+                                  recursive=False, raise_interrupt=False):
+            self._notify()
+
+    def _poll(self):
+        last = self._baseline
+        while not self._stop.wait(self.poll_interval):
+            current = scan_folder(self.folder_path, self.extensions)
+            if current == last:
+                continue
+            # Wait for the burst to settle: no change across a full debounce window
+            settled_at = time.monotonic()
+            while not self._stop.wait(min(self.poll_interval, self.debounce)):
+                latest = scan_folder(self.folder_path, self.extensions)
+                if latest != current:
+                    current, settled_at = latest, time.monotonic()
+                elif time.monotonic() - settled_at >= self.debounce:
+                    break
+            if self._stop.is_set():
+                return
+            last = current
+            self._notify()
+
+    def _run(self):
+        watchfiles = None
+        if self.use_watchfiles:
+            try:
+                import watchfiles
+            except ImportError:
+                pass
+        self.mode = "events" if watchfiles is not None else "polling"
+        if watchfiles is not None:
+            self._watch_events(watchfiles)
+        else:
+            self._poll()
+
+    def start(self):
+        """Start watching in a background thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            # Taken before returning, so any change made after start() is noticed
+            self._baseline = scan_folder(self.folder_path, self.extensions)
+            self._thread = threading.Thread(target=self._run, name="folder-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop watching; an in-progress on_change call is allowed to finish"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,294 @@
+"""
+Snapshot and restore the built index as a single archive.
+
+A snapshot holds everything needed to serve without re-embedding the corpus:
+the ChromaDB directory, the NumPy content index (numpy backend), the precomputed
+embedding store and the docs ingestion manifest. It is an uncompressed tar
+(embeddings barely compress) whose last member, ``snapshot.json``, records the
+format version, the embedding model and vector backend it was built with, and
+the size and digest of every file. Restores check the model and backend against
+the running configuration and verify every file before swapping anything in.
+
+Usage (from backend/):
+    uv run python -m index_snapshot create index.tar --docs ../docs
+    uv run python -m index_snapshot verify index.tar
+    uv run python -m index_snapshot restore index.tar [--force]
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+SNAPSHOT_FORMAT = 1
+MANIFEST_NAME = "snapshot.json"
+_READ_SIZE = 1 << 20
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot is corrupt or does not match the running configuration"""
+
+
+def _components(config, include_embedding_store: bool = True) -> Dict[str, str]:
+    """Archive prefix -> local path for every part of the index state"""
+    components = {"chroma": config.CHROMA_PATH, "docs_manifest.json": config.DOCS_MANIFEST_PATH}
+    if config.VECTOR_BACKEND == "numpy":
+        components["numpy_index"] = config.NUMPY_INDEX_PATH
+    if include_embedding_store and config.EMBEDDING_STORE_PATH:
+        components["embedding_store"] = config.EMBEDDING_STORE_PATH
+    return components
+
+
+def _component_files(components: Dict[str, str]) -> List[Tuple[str, str]]:
+    """(archive name, local path) for every file to snapshot, in a stable order"""
+    files = []
+    for prefix, path in sorted(components.items()):
+        if os.path.isfile(path):
+            files.append((prefix, path))
+            continue
+        for root, dirs, names in os.walk(path):
+            dirs.sort()
+            for name in sorted(names):
+                local = os.path.join(root, name)
+                rel = os.path.relpath(local, path).replace(os.sep, "/")
+                files.append((f"{prefix}/{rel}", local))
+    return files
+
+
+def index_exists(config) -> bool:
+    """Whether a ChromaDB index has already been built at the configured path"""
+    return os.path.exists(os.path.join(config.CHROMA_PATH, "chroma.sqlite3"))
+
+
+def create_snapshot(config, archive_path: str, vector_store=None,
+                    include_embedding_store: bool = True) -> Dict:
+    """
+    Write the current index state to `archive_path`.
+
+    Args:
+        config: Configuration whose paths, model and backend are snapshotted
+        archive_path: Tar file to create (written to a temporary name, then renamed)
+        vector_store: Live VectorStore, if any; its write lock is held while files are read
+        include_embedding_store: Also ship the precomputed embedding store
+
+    Returns:
+        The snapshot manifest
+    """
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "created_at": time.time(),
+        "embedding_model": config.EMBEDDING_MODEL,
+        "vector_backend": config.VECTOR_BACKEND,
+        "files": {}
+    }
+    tmp_path = archive_path + ".tmp"
+    lock = vector_store._write_lock if vector_store is not None else contextlib.nullcontext()
+
+    with lock, tarfile.open(tmp_path, "w") as tar:
+        for name, local in _component_files(_components(config, include_embedding_store)):
+            digest = hashlib.blake2b()
+            info = tar.gettarinfo(local, arcname=name)
+            with open(local, "rb") as f:
+                tar.addfile(info, _HashingReader(f, digest))
+            manifest["files"][name] = {"size": info.size, "blake2b": digest.hexdigest()}
+
+        data = json.dumps(manifest, indent=1).encode("utf-8")
+        info = tarfile.TarInfo(MANIFEST_NAME)
+        info.size, info.mtime = len(data), int(manifest["created_at"])
+        tar.addfile(info, io.BytesIO(data))
+
+    os.replace(tmp_path, archive_path)
+    return manifest
+
+
+class _HashingReader:
+    """File wrapper that hashes bytes as tarfile reads them"""
+
+    def __init__(self, f, digest):
+        self.f = f
+        self.digest = digest
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.f.read(size)
+        self.digest.update(data)
+        return data
+
+
+def read_manifest(archive_path: str) -> Dict:
+    """Read a snapshot's manifest without extracting it"""
+    try:
+        with tarfile.open(archive_path, "r") as tar:
+            f = tar.extractfile(MANIFEST_NAME)
+            manifest = json.load(f)
+    except (KeyError, tarfile.TarError, ValueError, OSError) as e:
+        raise SnapshotError(f"{archive_path} is not a valid index snapshot: {e}")
+    if manifest.get("format", 0) > SNAPSHOT_FORMAT:
+        raise SnapshotError(f"Snapshot format {manifest['format']} is newer than supported ({SNAPSHOT_FORMAT})")
+    return manifest
+
+
+def _verify_members(archive_path: str, manifest: Dict, target_dir: Optional[str] = None):
+    """
+    Check every archived file against the manifest, optionally extracting into target_dir.
+
+    Files are streamed through the hash once; nothing outside target_dir is written.
+    """
+    expected = manifest["files"]
+    seen = set()
+    try:
+        _verify_stream(archive_path, expected, seen, target_dir)
+    except (tarfile.TarError, EOFError) as e:
+        raise SnapshotError(f"{archive_path} is truncated or corrupt: {e}")
+
+    missing = set(expected) - seen
+    if missing:
+        raise SnapshotError(f"Snapshot is missing {len(missing)} files, e.g. {sorted(missing)[0]}")
+
+
+def _verify_stream(archive_path: str, expected: Dict, seen: set, target_dir: Optional[str]):
+    with tarfile.open(archive_path, "r") as tar:
+        for member in tar:
+            if member.name == MANIFEST_NAME:
+                continue
+            entry = expected.get(member.name)
+            parts = member.name.split("/")
+            if entry is None or not member.isfile() or member.name.startswith("/") or ".." in parts:
+                raise SnapshotError(f"Unexpected archive member: {member.name}")
+            digest = hashlib.blake2b()
+            source = tar.extractfile(member)
+            out = None
+            if target_dir is not None:
+                local = os.path.join(target_dir, *parts)
+                os.makedirs(os.path.dirname(local), exist_ok=True)
+                out = open(local, "wb")
+            try:
+                for block in iter(lambda: source.read(_READ_SIZE), b""):
+                    digest.update(block)
+                    if out is not None:
+                        out.write(block)
+            finally:
+                if out is not None:
+                    out.close()
+            if member.size != entry["size"] or digest.hexdigest() != entry["blake2b"]:
+                raise SnapshotError(f"Checksum mismatch for {member.name}")
+            seen.add(member.name)
+
+
+def verify_snapshot(archive_path: str) -> Dict:
+    """Check a snapshot's integrity; returns its manifest or raises SnapshotError"""
+    manifest = read_manifest(archive_path)
+    _verify_members(archive_path, manifest)
+    return manifest
+
+
+def restore_snapshot(config, archive_path: str, force: bool = False) -> Dict:
+    """
+    Replace the local index state with a snapshot's contents.
+
+    The archive is verified while it is extracted into a staging directory next to
+    the Chroma path, and components are only swapped in once every file checks out,
+    so a corrupt archive leaves the existing index untouched. Must run before a
+    VectorStore opens the paths (e.g. at process start).
+
+    Args:
+        config: Configuration providing the target paths, model and backend
+        archive_path: Snapshot created by create_snapshot
+        force: Overwrite an existing index
+
+    Returns:
+        The snapshot manifest
+
+    Raises:
+        SnapshotError: If the snapshot is corrupt, was built for another embedding
+            model or vector backend, or an index exists and force is False
+    """
+    manifest = read_manifest(archive_path)
+    if manifest["embedding_model"] != config.EMBEDDING_MODEL:
+        raise SnapshotError(f"Snapshot was embedded with {manifest['embedding_model']}, "
+                            f"but the configured model is {config.EMBEDDING_MODEL}")
+    if manifest["vector_backend"] != config.VECTOR_BACKEND:
+        raise SnapshotError(f"Snapshot was built for the {manifest['vector_backend']} backend, "
+                            f"but the configured backend is {config.VECTOR_BACKEND}")
+    if index_exists(config) and not force:
+        raise SnapshotError(f"An index already exists at {config.CHROMA_PATH}; use force to replace it")
+
+    components = _components(config)
+    archived = {name.split("/", 1)[0] for name in manifest["files"]}
+    staging_parent = os.path.dirname(os.path.abspath(config.CHROMA_PATH))
+    os.makedirs(staging_parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".snapshot-", dir=staging_parent)
+    try:
+        _verify_members(archive_path, manifest, staging)
+        for prefix, target in sorted(components.items()):
+            if prefix not in archived and prefix == "embedding_store":
+                continue  # A cache keyed by content and model; keep what is there
+            if os.path.isdir(target):
+                shutil.rmtree(target)
+            elif os.path.exists(target):
+                os.remove(target)
+            if prefix in archived:
+                os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+                shutil.move(os.path.join(staging, prefix), target)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return manifest
+
+
+def _describe(manifest: Dict) -> str:
+    size = sum(entry["size"] for entry in manifest["files"].values())
+    return (f"{len(manifest['files'])} files, {size / 1e6:.1f} MB, "
+            f"model {manifest['embedding_model']}, backend {manifest['vector_backend']}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    create = commands.add_parser("create", help="Snapshot the configured index")
+    create.add_argument("archive")
+    create.add_argument("--docs", help="Ingest this folder before snapshotting")
+    create.add_argument("--no-embedding-store", action="store_true",
+                        help="Leave out precomputed embeddings (not needed to serve)")
+    verify = commands.add_parser("verify", help="Check a snapshot's integrity")
+    verify.add_argument("archive")
+    restore = commands.add_parser("restore", help="Replace the configured index with a snapshot")
+    restore.add_argument("archive")
+    restore.add_argument("--force", action="store_true", help="Overwrite an existing index")
+    args = parser.parse_args(argv)
+
+    from config import config
+
+    try:
+        if args.command == "create":
+            vector_store = None
+            if args.docs:
+                from rag_system import RAGSystem
+
+                rag_system = RAGSystem(config)
+                # Syncing (rather than add_course_folder) also writes the docs manifest
+                summary = rag_system.sync_course_folder(args.docs)
+                print(f"Indexed {summary['added'] + summary['updated']} courses ({summary['chunks']} chunks)")
+                vector_store = rag_system.vector_store
+            manifest = create_snapshot(config, args.archive, vector_store,
+                                       include_embedding_store=not args.no_embedding_store)
+            print(f"Wrote {args.archive}: {_describe(manifest)}")
+        elif args.command == "verify":
+            print(f"{args.archive} OK: {_describe(verify_snapshot(args.archive))}")
+        else:
+            t0 = time.perf_counter()
+            manifest = restore_snapshot(config, args.archive, force=args.force)
+            print(f"Restored {args.archive} in {time.perf_counter() - t0:.1f}s: {_describe(manifest)}")
+    except SnapshotError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from typing import Callable, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from models import Course
+
+# Job lifecycle
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class IngestionJob(BaseModel):
+    """An uploaded document waiting for, or finished with, ingestion"""
+    id: str
+    filename: str
+    status: str
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    course_title: Optional[str] = None
+    chunks: int = 0
+    error: Optional[str] = None
+
+
+class QueueFullError(Exception):
+    """Raised when the queue already holds its maximum number of pending jobs"""
+
+
+class IngestionQueue:
+    """
+    Bounded, persistent queue of document ingestion jobs with one background worker.
+
+    Jobs live in a SQLite database and uploaded files are kept under ``uploads/``,
+    so pending work survives a restart (jobs interrupted mid-run are re-queued by start).
+    The worker thread lowers its own OS scheduling priority and calls `ingest`
+    with background=True, which makes embedding and writes yield to queries.
+
+    Layout under ``path``:
+        jobs.db               job records
+        uploads/<job id>/     the uploaded file for each job, removed when the job finishes
+    """
+
+    _FIELDS = ("id", "filename", "status", "created_at", "started_at", "finished_at",
+               "course_title", "chunks", "error")
+    _COLUMNS = ", ".join(_FIELDS)
+
+    def __init__(self, path: str, ingest: Callable[..., Tuple[Optional[Course], int]],
+                 max_pending: int = 16, worker_nice: int = 10):
+        """
+        Args:
+            path: Directory for the job database and uploaded files
+            ingest: Called as ingest(file_path, background=True) and returns (course, chunks);
+                an exception's message is recorded as the job's error
+            max_pending: Queued plus running jobs allowed before submit raises QueueFullError
+            worker_nice: Niceness added to the worker thread (Linux only)
+        """
+        self.path = path
+        self.ingest = ingest
+        self.max_pending = max_pending
+        self.worker_nice = worker_nice
+        self.uploads_path = os.path.join(path, "uploads")
+        os.makedirs(self.uploads_path, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+        self._db = sqlite3.connect(os.path.join(path, "jobs.db"), check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, filename TEXT NOT NULL, status TEXT NOT NULL,"
+                " created_at REAL NOT NULL, started_at REAL, finished_at REAL,"
+                " course_title TEXT, chunks INTEGER NOT NULL DEFAULT 0, error TEXT)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+
+    def requeue_interrupted(self) -> int:
+        """
+        Queue jobs left running by a stopped process again; returns how many.
+
+        Called by start(), i.e. only by the process that owns the worker, so other
+        web workers opening the same queue never reset a job that is in progress.
+        """
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?", (QUEUED, RUNNING)
+            )
+        return cursor.rowcount
+
+    def _row_to_job(self, row) -> IngestionJob:
+        return IngestionJob(**dict(zip(self._FIELDS, row)))
+
+    def _file_path(self, job_id: str, filename: str) -> str:
+        return os.path.join(self.uploads_path, job_id, filename)
+
+    def pending_count(self) -> int:
+        """Number of queued and running jobs"""
+        with self._lock:
+            (count,) = self._db.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+            ).fetchone()
+        return count
+
+    def submit(self, filename: str, data: bytes) -> IngestionJob:
+        """
+        Store an uploaded file and queue it for ingestion.
+
+        Raises:
+            QueueFullError: If max_pending jobs are already queued or running
+        """
+        filename = os.path.basename(filename)
+        job = IngestionJob(id=uuid.uuid4().hex, filename=filename, status=QUEUED, created_at=time.time())
+
+        with self._lock:
+            (pending,) = self._db.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+            ).fetchone()
+            if pending >= self.max_pending:
+                raise QueueFullError(f"Ingestion queue is full ({pending} pending jobs)")
+
+            file_path = self._file_path(job.id, filename)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, "wb") as f:
+                f.write(data)
+            with self._db:
+                self._db.execute(
+                    "INSERT INTO jobs (id, filename, status, created_at) VALUES (?, ?, ?, ?)",
+                    (job.id, job.filename, job.status, job.created_at)
+                )
+
+        self._wake.set()
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        """Look up a job by ID"""
+        with self._lock:
+            row = self._db.execute(f"SELECT {self._COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def list_jobs(self, limit: int = 50) -> List[IngestionJob]:
+        """Most recent jobs first"""
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {self._COLUMNS} FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def get_stats(self) -> dict:
+        """Job counts by status"""
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED)}
+        counts.update(dict(rows))
+        return {**counts, "max_pending": self.max_pending}
+
+    def _claim_next(self) -> Optional[IngestionJob]:
+        """Mark the oldest queued job as running and return it"""
+        with self._lock, self._db:
+            row = self._db.execute(
+                f"SELECT {self._COLUMNS} FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+            job = self._row_to_job(row)
+            job.status, job.started_at = RUNNING, time.time()
+            self._db.execute("UPDATE jobs SET status = ?, started_at = ? WHERE id = ?",
+                             (job.status, job.started_at, job.id))
+        return job
+
+    def _finish(self, job: IngestionJob, course: Optional[Course], chunks: int, error: Optional[str]):
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, course_title = ?, chunks = ?, error = ? WHERE id = ?",
+                (FAILED if error else DONE, time.time(), course.title if course else None, chunks, error, job.id)
+            )
+
+    def run_next(self) -> Optional[IngestionJob]:
+        """Process the oldest queued job, if any; returns it with its final status"""
+        job = self._claim_next()
+        if job is None:
+            return None
+        file_path = self._file_path(job.id, job.filename)
+        try:
+            course, chunks = self.ingest(file_path, background=True)
+            error = None if course is not None else "Document could not be parsed"
+        except Exception as e:
+            course, chunks, error = None, 0, str(e)
+        self._finish(job, course, chunks, error)
+        # The file is only kept while the job may still run (interrupted jobs are re-queued)
+        shutil.rmtree(os.path.dirname(file_path), ignore_errors=True)
+        print(f"Ingestion job {job.id} ({job.filename}): {error or f'{chunks} chunks'}")
+        return self.get(job.id)
+
+    def _run(self):
+        # nice() only lowers the calling thread on Linux; elsewhere it would
+        # deprioritise the whole server, so rely on batch pauses there
+        if sys.platform.startswith("linux"):
+            try:
+                os.nice(self.worker_nice)
+            except OSError:
+                pass
+
+        while not self._stop.is_set():
+            if self.run_next() is None:
+                self._wake.wait(timeout=1.0)
+                self._wake.clear()
+
+    def start(self):
+        """Start the background worker"""
+        if self._worker is None or not self._worker.is_alive():
+            self.requeue_interrupted()
+            self._stop.clear()
+            self._worker = threading.Thread(target=self._run, name="ingestion-worker", daemon=True)
+            self._worker.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the worker after its current job"""
+        self._stop.set()
+        self._wake.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
@@ -0,0 +1,267 @@
+"""
+Transport policy for calls to the Anthropic API.
+
+The SDK client is built on one shared httpx connection pool with explicit
+connect/read timeouts and with the SDK's own retries turned off. LLMTransport
+then wraps each call with:
+- a concurrency limit, so bursts queue here (and show up in the metrics) instead
+  of piling onto the API and tripping rate limits;
+- retries for 429, 5xx/529 overloads, timeouts and connection errors, waiting
+  for `retry-after` when the API sends it and exponential backoff with full
+  jitter otherwise;
+- a circuit breaker: after several consecutive failed calls, calls fail fast
+  with LLMUnavailableError for a cooldown period, then one trial call decides
+  whether to close it again.
+
+Callers catch LLMUnavailableError to serve a degraded answer.
+"""
+
+import email.utils
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import anthropic
+import httpx
+
+# HTTP statuses worth retrying: rate limited, and server errors incl. 529 "overloaded"
+RETRYABLE_STATUSES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+class LLMUnavailableError(Exception):
+    """The API could not be reached in time (circuit open, queue timeout or retries exhausted)"""
+
+
+def build_anthropic_client(api_key: str,
+                           max_connections: int = 20,
+                           connect_timeout: float = 5.0,
+                           read_timeout: float = 60.0) -> anthropic.Anthropic:
+    """Anthropic client on a pooled HTTP connection, with retries left to LLMTransport"""
+    timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+    http_client = httpx.Client(
+        timeout=timeout,
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+    )
+    return anthropic.Anthropic(api_key=api_key, http_client=http_client, timeout=timeout, max_retries=0)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Delay requested by the API's retry-after-ms / retry-after headers, if any"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+    except ValueError:
+        pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, anthropic.APIConnectionError):  # Includes timeouts
+        return True
+    if isinstance(error, anthropic.APIStatusError):
+        return error.status_code in RETRYABLE_STATUSES
+    return False
+
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures; lets one trial call through after `cooldown` seconds"""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self.state = self.CLOSED
+        self.times_opened = 0
+
+    def allow(self) -> bool:
+        """Whether a call may go out now"""
+        if self.threshold <= 0:
+            return True
+        with self._lock:
+            if self.state == self.OPEN and self._clock() - self._opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def abandon(self):
+        """The allowed call never reached the API; let another trial through"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._trial_running = False
+            self.state = self.CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self.state == self.HALF_OPEN or (self.threshold > 0 and self._failures >= self.threshold):
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                self.state = self.OPEN
+                self._opened_at = self._clock()
+
+
+class LLMTransport:
+    """Concurrency limit, retries with backoff and a circuit breaker around API calls"""
+
+    def __init__(self,
+                 max_concurrency: int = 8,
+                 queue_timeout: float = 30.0,
+                 max_retries: int = 3,
+                 backoff_base: float = 0.5,
+                 backoff_max: float = 8.0,
+                 breaker_threshold: int = 5,
+                 breaker_cooldown: float = 30.0,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_cooldown)
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency > 0 else None
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._stats = {
+            "calls": 0,
+            "retries": 0,
+            "failures": 0,
+            "rejected": 0,        # Failed fast while the circuit was open
+            "queue_timeouts": 0,  # Gave up waiting for a concurrency slot
+            "in_flight": 0,
+            "waiting": 0,
+            "max_waiting": 0,
+            "slot_waits": 0,
+            "total_wait_ms": 0.0,
+            "max_wait_ms": 0.0,
+        }
+
+    def backoff(self, attempt: int, error: Exception) -> float:
+        """Seconds to wait before retry number `attempt` (1-based)"""
+        requested = retry_after_seconds(error)
+        if requested is not None:
+            return requested
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    def call(self, fn: Callable[..., Any], **kwargs) -> Any:
+        """
+        Call fn(**kwargs) under the transport policy.
+
+        Raises:
+            LLMUnavailableError: the circuit is open, no slot freed up within
+                queue_timeout, or a retryable error persisted through all retries
+            Other API errors (e.g. 400, 401) are raised unchanged
+        """
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise LLMUnavailableError("Anthropic API unavailable (circuit open)")
+
+        try:
+            self._acquire_slot()
+        except LLMUnavailableError:
+            self.breaker.abandon()
+            raise
+        try:
+            return self._call_with_retries(fn, kwargs)
+        finally:
+            self._release_slot()
+
+    def _call_with_retries(self, fn: Callable[..., Any], kwargs: Dict[str, Any]) -> Any:
+        attempt = 0
+        while True:
+            self._count("calls")
+            try:
+                result = fn(**kwargs)
+            except Exception as e:
+                if not is_retryable(e):
+                    if isinstance(e, anthropic.APIStatusError):
+                        # The API answered; the request itself was bad
+                        self.breaker.record_success()
+                    else:
+                        self.breaker.abandon()
+                    raise
+                attempt += 1
+                delay = self.backoff(attempt, e)
+                # A retry-after beyond our budget means waiting would only add tail latency
+                if attempt > self.max_retries or delay > self.backoff_max:
+                    self._count("failures")
+                    self.breaker.record_failure()
+                    raise LLMUnavailableError(f"Anthropic API unavailable: {e}") from e
+                self._count("retries")
+                self._sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+    def _acquire_slot(self):
+        if self._slots is None:
+            return
+        start = time.perf_counter()
+        with self._lock:
+            self._stats["waiting"] += 1
+            self._stats["max_waiting"] = max(self._stats["max_waiting"], self._stats["waiting"])
+        acquired = self._slots.acquire(timeout=self.queue_timeout if self.queue_timeout > 0 else None)
+        wait_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._stats["waiting"] -= 1
+            self._stats["slot_waits"] += 1
+            self._stats["total_wait_ms"] += wait_ms
+            self._stats["max_wait_ms"] = max(self._stats["max_wait_ms"], wait_ms)
+            if acquired:
+                self._stats["in_flight"] += 1
+            else:
+                self._stats["queue_timeouts"] += 1
+        if not acquired:
+            raise LLMUnavailableError(f"No Anthropic API slot free after {self.queue_timeout:g}s")
+
+    def _release_slot(self):
+        if self._slots is None:
+            return
+        with self._lock:
+            self._stats["in_flight"] -= 1
+        self._slots.release()
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Snapshot of call, retry and queueing counters plus the breaker state"""
+        with self._lock:
+            stats = dict(self._stats)
+        waits = stats.pop("slot_waits")
+        stats["avg_wait_ms"] = round(stats.pop("total_wait_ms") / waits, 2) if waits else 0.0
+        stats["max_wait_ms"] = round(stats["max_wait_ms"], 2)
+        stats["max_concurrency"] = self.max_concurrency
+        stats["circuit"] = self.breaker.state
+        stats["circuit_opened"] = self.breaker.times_opened
+        return stats
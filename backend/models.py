@@ -1,3 +1,5 @@
+import sys
+from dataclasses import dataclass
 from typing import List, Dict, Optional
 from pydantic import BaseModel
 
@@ -14,9 +16,26 @@ class Course(BaseModel):
     instructor: Optional[str] = None  # Course instructor name (optional metadata)
     lessons: List[Lesson] = [] # List of lessons in this course
 
-class CourseChunk(BaseModel):
-    """Represents a text chunk from a course for vector storage"""
+@dataclass(slots=True, kw_only=True)
+class CourseChunk:
+    """
+    Represents a text chunk from a course for vector storage.
+
+    A slotted dataclass rather than a Pydantic model: chunks are only built by
+    DocumentProcessor from already-parsed values, and ingestion creates one per
+    ~800 characters of text, so per-object validation and __dict__ add up.
+    Course titles and section names are interned so a course's chunks share one string.
+    """
     content: str                        # The actual text content
     course_title: str                   # Which course this chunk belongs to
     lesson_number: Optional[int] = None # Which lesson this chunk is from
-    chunk_index: int                    # Position of this chunk in the document
\ No newline at end of file
+    chunk_index: int                    # Position of this chunk in the document
+    start_char: Optional[int] = None    # Offset of the chunk within its lesson text
+    end_char: Optional[int] = None      # End offset (exclusive) within its lesson text
+    page_number: Optional[int] = None   # Source page, for documents extracted from PDF
+    section: Optional[str] = None       # Source section heading, for documents extracted from DOCX
+
+    def __post_init__(self):
+        self.course_title = sys.intern(self.course_title)
+        if self.section is not None:
+            self.section = sys.intern(self.section)
@@ -0,0 +1,497 @@
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# Metadata values shared by many chunks; one string object per distinct value is kept in memory
+INTERNED_KEYS = ("course_title", "section")
+
+
+def top_k(similarities: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest similarities, best first (argpartition + sort of the top k)"""
+    if k <= 0 or similarities.size == 0:
+        return np.empty(0, dtype=np.int64)
+    if k >= similarities.size:
+        return np.argsort(-similarities, kind="stable")
+    candidates = np.argpartition(-similarities, k - 1)[:k]
+    return candidates[np.argsort(-similarities[candidates], kind="stable")]
+
+
+def normalize_rows(vectors: Any) -> np.ndarray:
+    """L2-normalize embeddings into a contiguous float32 matrix"""
+    matrix = np.ascontiguousarray(np.asarray(vectors, dtype=np.float32))
+    if matrix.ndim == 1:
+        matrix = matrix[np.newaxis, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def compact_metadata(meta: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a chunk's metadata with repeated strings (course title, section) interned"""
+    compact = dict(meta)
+    for key in INTERNED_KEYS:
+        if isinstance(compact.get(key), str):
+            compact[key] = sys.intern(compact[key])
+    return compact
+
+
+def mmr_select(query: Any, candidates: Any, k: int, lambda_mult: float = 0.7) -> List[int]:
+    """
+    Maximal marginal relevance: pick k candidate indices, each time taking the one that
+    best trades similarity to the query (weight lambda_mult) against similarity to the
+    candidates already picked, so near-duplicate chunks are not all returned.
+    """
+    matrix = normalize_rows(candidates)
+    if k <= 0 or matrix.shape[0] == 0:
+        return []
+    relevance = matrix @ normalize_rows(query)[0]
+    selected = [int(np.argmax(relevance))]
+    # Highest similarity of each candidate to anything selected so far
+    redundancy = matrix @ matrix[selected[0]]
+    while len(selected) < min(k, matrix.shape[0]):
+        scores = lambda_mult * relevance - (1.0 - lambda_mult) * redundancy
+        scores[selected] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        redundancy = np.maximum(redundancy, matrix @ matrix[best])
+    return selected
+
+
+def relevance_cutoff(samples: Dict[str, Any], percentile: float) -> Optional[float]:
+    """
+    Calibrate a distance cutoff from sampled chunk embeddings grouped by course:
+    the given percentile of squared L2 distances between chunks of different
+    courses, i.e. how close an unrelated chunk typically is. None with fewer than
+    two courses to compare.
+    """
+    groups = [normalize_rows(vectors) for vectors in samples.values() if len(vectors)]
+    distances = [
+        (2.0 - 2.0 * (groups[i] @ groups[j].T)).ravel()
+        for i in range(len(groups)) for j in range(i + 1, len(groups))
+    ]
+    if not distances:
+        return None
+    return float(np.percentile(np.concatenate(distances).clip(min=0.0), percentile))
+
+
+class NumpyVectorIndex:
+    """
+    Exact (flat) vector index over normalized chunk embeddings held in one float32 matrix.
+
+    Rows are kept grouped by course and ordered by lesson within a course, so every
+    course and every (course, lesson) pair maps to a contiguous row range. A filtered
+    search is a dot product over that slice plus argpartition, with no metadata
+    filtering at query time.
+
+    Distances are squared L2 between unit vectors (2 - 2 * cosine), the same scale
+    ChromaDB reports for its default "l2" space.
+
+    When ``path`` is given the matrix is persisted as raw float32 rows in
+    ``embeddings.f32`` (appended per batch) and searched memory-mapped;
+    documents and metadata live in ``chunks.jsonl``.
+    """
+
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self, path: Optional[str] = None, embedding_model: Optional[str] = None):
+        self.path = path
+        self.embedding_model = embedding_model
+        self._lock = threading.RLock()
+
+        self._matrix: Optional[np.ndarray] = None  # first _count rows are valid
+        self._count = 0
+        self._dim: Optional[int] = None
+        self.documents: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self.course_ranges: Dict[str, Tuple[int, int]] = {}
+        self.lesson_ranges: Dict[Tuple[str, Optional[int]], Tuple[int, int]] = {}
+
+        if path:
+            os.makedirs(path, exist_ok=True)
+            self._load()
+
+    # ── Persistence ────────────────────────────────────────────────
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.path, "meta.json")
+
+    @property
+    def _matrix_path(self) -> str:
+        return os.path.join(self.path, "embeddings.f32")
+
+    @property
+    def _chunks_path(self) -> str:
+        return os.path.join(self.path, "chunks.jsonl")
+
+    def _load(self):
+        if not os.path.exists(self._meta_path):
+            # Rows from an append interrupted before the first meta.json would misalign later ones
+            self._truncate_files(0, 0)
+            return
+        try:
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            self.embedding_model = meta.get("embedding_model") or self.embedding_model
+            self._count = meta["count"]
+            self._dim = meta["dim"]
+            chunks_size = 0
+            with open(self._chunks_path, "rb") as f:
+                for _, line in zip(range(self._count), f):
+                    chunks_size += len(line)
+                    record = json.loads(line)
+                    self.documents.append(record["document"])
+                    self.metadatas.append(compact_metadata(record["metadata"]))
+            if len(self.documents) != self._count:
+                raise ValueError(f"chunks.jsonl has {len(self.documents)} of {self._count} rows")
+            # meta.json is written last, so rows past its count are from an interrupted append
+            self._truncate_files(self._count * self._dim * 4, chunks_size)
+            self._map_matrix()
+            self._rebuild_ranges()
+        except Exception as e:
+            print(f"Error loading vector index at {self.path}, starting empty: {e}")
+            self._truncate_files(0, 0)  # So new rows are not appended after unreadable ones
+            self._matrix = None
+            self._count = 0
+            self._dim = None
+            self.documents, self.metadatas = [], []
+            self.course_ranges, self.lesson_ranges = {}, {}
+
+    def _map_matrix(self):
+        """Memory-map the first _count rows of the on-disk matrix"""
+        self._matrix = (
+            np.memmap(self._matrix_path, dtype=np.float32, mode="r", shape=(self._count, self._dim))
+            if self._count else None
+        )
+
+    def _truncate_files(self, matrix_size: int, chunks_size: int):
+        """Cut the matrix and chunk files to the given byte sizes if they are longer"""
+        for file_path, size in ((self._matrix_path, matrix_size), (self._chunks_path, chunks_size)):
+            if os.path.exists(file_path) and os.path.getsize(file_path) > size:
+                os.truncate(file_path, size)
+
+    def _write_meta(self):
+        tmp_meta = self._meta_path + ".tmp"
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump({"count": self._count, "dim": self._dim, "embedding_model": self.embedding_model}, f)
+        os.replace(tmp_meta, self._meta_path)
+
+    def _append_rows(self, vectors: np.ndarray, documents: Sequence[str], metadatas: Sequence[Dict[str, Any]]):
+        """Append rows to the matrix; on disk this is an O(batch) file append plus a re-map"""
+        if self.path:
+            sizes = [os.path.getsize(p) if os.path.exists(p) else 0 for p in (self._matrix_path, self._chunks_path)]
+            try:
+                with open(self._matrix_path, "ab") as f:
+                    f.write(vectors.tobytes())
+                with open(self._chunks_path, "a", encoding="utf-8") as f:
+                    for doc, meta in zip(documents, metadatas):
+                        f.write(json.dumps({"document": doc, "metadata": meta}) + "\n")
+            except Exception:
+                self._truncate_files(*sizes)
+                raise
+            self._count += len(vectors)
+            self._write_meta()
+            self._map_matrix()
+            return
+
+        capacity = 0 if self._matrix is None else self._matrix.shape[0]
+        needed = self._count + len(vectors)
+        if needed > capacity:
+            grown = np.empty((max(needed, capacity * 2, self.INITIAL_CAPACITY), self._dim), dtype=np.float32)
+            if self._count:
+                grown[:self._count] = self._matrix[:self._count]
+            self._matrix = grown
+        self._matrix[self._count:needed] = vectors
+        self._count = needed
+
+    def _replace_all(self, matrix: Optional[np.ndarray]):
+        """Replace the whole matrix (after regrouping, deletion or re-embedding) and rewrite the files"""
+        self._count = len(self.documents)
+        if not self.path:
+            self._matrix = matrix
+            return
+
+        tmp_matrix = self._matrix_path + ".tmp"
+        with open(tmp_matrix, "wb") as f:
+            if matrix is not None:
+                f.write(np.ascontiguousarray(matrix, dtype=np.float32).tobytes())
+        tmp_chunks = self._chunks_path + ".tmp"
+        with open(tmp_chunks, "w", encoding="utf-8") as f:
+            for doc, meta in zip(self.documents, self.metadatas):
+                f.write(json.dumps({"document": doc, "metadata": meta}) + "\n")
+
+        self._matrix = None
+        os.replace(tmp_matrix, self._matrix_path)
+        os.replace(tmp_chunks, self._chunks_path)
+        self._write_meta()
+        self._map_matrix()
+
+    # ── Row-range bookkeeping ──────────────────────────────────────
+
+    @staticmethod
+    def _lesson_sort_key(meta: Dict[str, Any]) -> int:
+        lesson = meta.get("lesson_number")
+        return -1 if lesson is None else lesson
+
+    def _rebuild_ranges(self, start_row: int = 0):
+        """Recompute course and lesson row ranges from (already grouped) metadata, from start_row on"""
+        if start_row == 0:
+            self.course_ranges = {}
+            self.lesson_ranges = {}
+        for row in range(start_row, len(self.metadatas)):
+            meta = self.metadatas[row]
+            course = meta.get("course_title")
+            start, _ = self.course_ranges.get(course, (row, row))
+            self.course_ranges[course] = (start, row + 1)
+            key = (course, meta.get("lesson_number"))
+            start, _ = self.lesson_ranges.get(key, (row, row))
+            self.lesson_ranges[key] = (start, row + 1)
+
+    def _extends_grouping(self, first_new: int) -> bool:
+        """True if rows appended from first_new keep every course and lesson contiguous"""
+        seen_courses = set(self.course_ranges)
+        seen_lessons = set(self.lesson_ranges)
+        if first_new:
+            previous = self.metadatas[first_new - 1]
+            previous_course = previous.get("course_title")
+            previous_lesson = (previous_course, previous.get("lesson_number"))
+        else:
+            previous_course = previous_lesson = object()
+
+        for meta in self.metadatas[first_new:]:
+            course = meta.get("course_title")
+            lesson = (course, meta.get("lesson_number"))
+            if course != previous_course:
+                if course in seen_courses:
+                    return False
+                seen_courses.add(course)
+            if lesson != previous_lesson:
+                if lesson in seen_lessons:
+                    return False
+                seen_lessons.add(lesson)
+            previous_course, previous_lesson = course, lesson
+        return True
+
+    def _regroup(self):
+        """Stable-sort rows by (course first-seen order, lesson number) to restore contiguity"""
+        course_order: Dict[str, int] = {}
+        for meta in self.metadatas:
+            course_order.setdefault(meta.get("course_title"), len(course_order))
+        order = sorted(
+            range(self._count),
+            key=lambda row: (course_order[self.metadatas[row].get("course_title")],
+                             self._lesson_sort_key(self.metadatas[row]))
+        )
+        matrix = np.asarray(self._matrix[:self._count])[order]
+        self.documents = [self.documents[row] for row in order]
+        self.metadatas = [self.metadatas[row] for row in order]
+        self._replace_all(matrix)
+
+    # ── Public API ─────────────────────────────────────────────────
+
+    def count(self) -> int:
+        return self._count
+
+    def add(self, documents: Sequence[str], metadatas: Sequence[Dict[str, Any]], embeddings: Any):
+        """Append chunks, keeping each course's and lesson's rows contiguous"""
+        if not documents:
+            return
+        with self._lock:
+            vectors = normalize_rows(embeddings)
+            if self._dim is None:
+                self._dim = vectors.shape[1]
+            elif vectors.shape[1] != self._dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match index dimension {self._dim}")
+
+            first_new = self._count
+            metadatas = [compact_metadata(meta) for meta in metadatas]
+            self.documents.extend(documents)
+            self.metadatas.extend(metadatas)
+            self._append_rows(vectors, documents, metadatas)
+
+            if self._extends_grouping(first_new):
+                self._rebuild_ranges(first_new)
+            else:
+                self._regroup()
+                self._rebuild_ranges()
+
+    def delete_course(self, course_title: str) -> int:
+        """Remove all rows of a course; returns the number of rows removed"""
+        with self._lock:
+            if course_title not in self.course_ranges:
+                return 0
+            start, end = self.course_ranges[course_title]
+            keep = np.r_[0:start, end:self._count]
+            matrix = np.asarray(self._matrix[:self._count])[keep]
+            # New lists rather than in-place deletes, so in-flight searches keep a consistent snapshot
+            self.documents = self.documents[:start] + self.documents[end:]
+            self.metadatas = self.metadatas[:start] + self.metadatas[end:]
+            self._replace_all(matrix if len(keep) else None)
+            self._rebuild_ranges()
+            return end - start
+
+    def clear(self):
+        """Remove all rows"""
+        with self._lock:
+            self._matrix = None
+            self._count = 0
+            self._dim = None
+            self.documents, self.metadatas = [], []
+            self.course_ranges, self.lesson_ranges = {}, {}
+            if self.path:
+                for file_path in (self._matrix_path, self._chunks_path, self._meta_path):
+                    if os.path.exists(file_path):
+                        os.remove(file_path)
+
+    def reembed(self, embed_fn: Callable[[List[str]], Sequence[Any]], embedding_model: str, batch_size: int = 1000):
+        """
+        Recompute every row's embedding with a new model, keeping row order.
+
+        Embedding runs without the lock so searches keep being served from the old
+        matrix; only the swap is locked. Rows written meanwhile start it over.
+        """
+        while True:
+            with self._lock:
+                documents, count = self.documents, self._count
+            blocks = [
+                normalize_rows(embed_fn(documents[i:i + batch_size]))
+                for i in range(0, count, batch_size)
+            ]
+            with self._lock:
+                if self.documents is not documents or self._count != count:
+                    continue
+                self.embedding_model = embedding_model
+                if blocks:
+                    self._dim = blocks[0].shape[1]
+                self._replace_all(np.concatenate(blocks) if blocks else None)
+                return
+
+    def _candidate_rows(self, course_title: Optional[str],
+                        lesson_number: Optional[int]) -> Union[None, Tuple[int, int], np.ndarray]:
+        """Rows matching the filter: None (all rows), a contiguous (start, end) range, or an index array"""
+        if course_title is None and lesson_number is None:
+            return None
+        if course_title is not None:
+            if lesson_number is None:
+                return self.course_ranges.get(course_title, (0, 0))
+            return self.lesson_ranges.get((course_title, lesson_number), (0, 0))
+        # Lesson filter without a course: gather that lesson's range from every course
+        ranges = [r for (_, lesson), r in self.lesson_ranges.items() if lesson == lesson_number]
+        if not ranges:
+            return (0, 0)
+        return np.concatenate([np.arange(start, end) for start, end in ranges])
+
+    def search(self, query_embedding: Any, course_title: Optional[str] = None,
+               lesson_number: Optional[int] = None,
+               limit: int = 5, with_embeddings: bool = False) -> Tuple:
+        """
+        Exact nearest-neighbour search within an optional course / lesson filter.
+
+        Returns:
+            Parallel lists of documents, metadata and distances, nearest first,
+            plus the hits' (normalized) embeddings when with_embeddings is set
+        """
+        # Snapshot under the lock; the dot product itself runs without it (NumPy releases the GIL)
+        with self._lock:
+            if not self._count:
+                return ([], [], [], np.empty((0, 0), dtype=np.float32)) if with_embeddings else ([], [], [])
+            matrix, count = self._matrix, self._count
+            documents, metadatas = self.documents, self.metadatas
+            rows = self._candidate_rows(course_title, lesson_number)
+
+        query = normalize_rows(query_embedding)[0]
+        if rows is None:
+            similarities = matrix[:count] @ query
+            best = top_k(similarities, limit)
+            hits = best
+        elif isinstance(rows, tuple):
+            start, end = rows
+            similarities = matrix[start:end] @ query
+            best = top_k(similarities, limit)
+            hits = best + start
+        else:
+            similarities = matrix[rows] @ query
+            best = top_k(similarities, limit)
+            hits = rows[best]
+
+        distances = (2.0 - 2.0 * similarities[best]).clip(min=0.0)
+        results = (
+            [documents[row] for row in hits],
+            [metadatas[row] for row in hits],
+            [float(d) for d in distances]
+        )
+        return results + (np.array(matrix[hits]),) if with_embeddings else results
+
+    def sample_course_embeddings(self, per_course: int) -> Dict[str, np.ndarray]:
+        """Up to per_course embeddings from each course, spread evenly over its rows"""
+        with self._lock:
+            matrix, ranges = self._matrix, dict(self.course_ranges)
+        samples = {}
+        for title, (start, end) in ranges.items():
+            if end > start:
+                rows = np.unique(np.linspace(start, end - 1, num=min(per_course, end - start)).astype(np.int64))
+                samples[title] = np.array(matrix[rows])
+        return samples
+
+
+class CoursePartitionCache:
+    """
+    Per-course flat partitions used to answer course-filtered queries exactly.
+
+    Each partition is an in-memory NumpyVectorIndex holding one course's chunks,
+    grouped by lesson so lesson filters are a row-range slice. Partitions are
+    loaded on first use through `loader` and evicted least-recently-used.
+    """
+
+    def __init__(self, loader: Callable[[str], Tuple[List[str], List[Dict[str, Any]], Any]],
+                 max_partitions: int = 64):
+        self.loader = loader
+        self.max_partitions = max_partitions
+        self._partitions: "OrderedDict[str, NumpyVectorIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0  # Bumped on invalidation so in-flight loads are not cached
+        self._stats = {"hits": 0, "loads": 0, "evictions": 0}
+
+    def get(self, course_title: str) -> NumpyVectorIndex:
+        """Return the course's partition, loading it if needed"""
+        with self._lock:
+            partition = self._partitions.get(course_title)
+            if partition is not None:
+                self._partitions.move_to_end(course_title)
+                self._stats["hits"] += 1
+                return partition
+            generation = self._generation
+
+        documents, metadatas, embeddings = self.loader(course_title)
+        partition = NumpyVectorIndex()
+        partition.add(documents, metadatas, embeddings)
+
+        with self._lock:
+            self._stats["loads"] += 1
+            if generation != self._generation:
+                return partition
+            self._partitions[course_title] = partition
+            self._partitions.move_to_end(course_title)
+            while len(self._partitions) > self.max_partitions:
+                self._partitions.popitem(last=False)
+                self._stats["evictions"] += 1
+        return partition
+
+    def invalidate(self, course_titles: Optional[Sequence[str]] = None):
+        """Drop cached partitions for the given courses (all courses if None)"""
+        with self._lock:
+            self._generation += 1
+            if course_titles is None:
+                self._partitions.clear()
+                return
+            for title in course_titles:
+                self._partitions.pop(title, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"partitions": len(self._partitions), **self._stats}
@@ -0,0 +1,150 @@
+"""
+Answer structural questions about the catalog without calling the model.
+
+Questions like "list the lessons of the MCP course", "link to lesson 2 of the
+Chroma course" or "who teaches Prompt Compression?" only need course metadata.
+QueryRouter recognises them with a few conservative rules and answers straight
+from the course catalog. Anything it is not sure about (no structural keyword,
+an explanatory question, no course named, or two courses equally likely) falls
+through to the normal tool-calling path.
+"""
+
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from search_tools import format_course_outline
+
+# Intent rules, checked in order
+LESSON_NUMBER = re.compile(r"\blesson\s+(\d+)\b", re.IGNORECASE)
+INTENT_PATTERNS = (
+    ("instructor", re.compile(
+        r"\b(instructor|teacher|who (teaches|taught|is teaching)|taught by)\b", re.I)),
+    # "link"/"url" alone is too common in content questions ("the link between ...", "a URL shortener")
+    ("lesson", re.compile(  # Only with a lesson number
+        r"\b((link|url) (to|for|of)|lesson \d+('s)? (link|url)|title|called|named)\b", re.I)),
+    ("course_link", re.compile(
+        r"\b((link|url|website) (to|for|of)|course('s)? (link|url|website)|its (link|url|website))\b", re.I)),
+    ("outline", re.compile(
+        r"\b(outline|syllabus|table of contents|(list|show) (me )?(all )?(of )?(the )?lessons"
+        r"|all (of )?(the )?lessons|how many lessons|lesson list)\b", re.I)),
+)
+# Questions about the material itself need the model even if they mention an outline or a link
+CONTENT_QUESTION = re.compile(
+    r"\b(explain|why|how (does|do|to|can)|compare|difference|summari[sz]e|what is .+ about"
+    r"|cover(s|ed)?|discuss(es|ed)?|mention(s|ed)?)\b", re.I)
+
+# Words too common in course titles to identify one
+STOPWORDS = {
+    "a", "an", "and", "the", "of", "for", "to", "in", "on", "with", "by", "from", "how", "use",
+    "course", "courses", "lesson", "lessons", "build", "building", "intro", "introduction",
+}
+WORD = re.compile(r"[a-z0-9]+")
+
+
+def classify(query: str) -> Optional[str]:
+    """The structural intent of a query, or None if it needs the model"""
+    if CONTENT_QUESTION.search(query):
+        return None
+    has_lesson = LESSON_NUMBER.search(query) is not None
+    for intent, pattern in INTENT_PATTERNS:
+        if intent == "lesson" and not has_lesson:
+            continue
+        if intent == "outline" and has_lesson:
+            continue  # "lessons in lesson 3" is a content question
+        if pattern.search(query):
+            return intent
+    return None
+
+
+def _title_words(title: str) -> set:
+    return {w for w in WORD.findall(title.lower()) if len(w) > 1 and w not in STOPWORDS}
+
+
+def match_course(query: str, titles: List[str]) -> Optional[str]:
+    """
+    The course a query names, by its full title or by words only its title contains.
+    Returns None when no course, or more than one, fits equally well.
+    """
+    lowered = query.lower()
+    named = [t for t in titles if t.lower() in lowered]
+    if len(named) == 1:
+        return named[0]
+
+    words_by_title = {t: _title_words(t) for t in titles}
+    counts: Dict[str, int] = {}
+    for words in words_by_title.values():
+        for word in words:
+            counts[word] = counts.get(word, 0) + 1
+    query_words = set(WORD.findall(lowered))
+
+    scores = {
+        title: sum(1 for w in words if counts[w] == 1 and w in query_words)
+        for title, words in words_by_title.items()
+    }
+    best = max(scores.values(), default=0)
+    winners = [t for t, score in scores.items() if score == best]
+    return winners[0] if best > 0 and len(winners) == 1 else None
+
+
+class QueryRouter:
+    """Rule-based fast path for catalog questions"""
+
+    def __init__(self, vector_store):
+        self.store = vector_store
+        self._lock = threading.Lock()
+        self._stats = {"routed": 0, "fallthrough": 0, "by_intent": {}}
+
+    def route(self, query: str) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Answer a structural query from the catalog.
+
+        Returns:
+            (answer, sources) or None when the query should go to the model
+        """
+        intent = classify(query)
+        answer = self._answer(intent, query) if intent else None
+        with self._lock:
+            if answer is None:
+                self._stats["fallthrough"] += 1
+            else:
+                self._stats["routed"] += 1
+                self._stats["by_intent"][intent] = self._stats["by_intent"].get(intent, 0) + 1
+        return answer
+
+    def _answer(self, intent: str, query: str) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        courses = {meta["title"]: meta for meta in self.store.get_all_courses_metadata() if "title" in meta}
+        title = match_course(query, list(courses))
+        if title is None:
+            return None
+        course = courses[title]
+        course_link = course.get("course_link")
+        sources = [{"text": title, "link": course_link}]
+
+        if intent == "outline":
+            return format_course_outline(title, course_link, course.get("lessons", [])), sources
+
+        if intent == "course_link":
+            if not course_link:
+                return f"No link is available for **{title}**.", sources
+            return f"**{title}**: {course_link}", sources
+
+        if intent == "instructor":
+            if not course.get("instructor"):
+                return None  # Let the model look for it in the course text
+            return f"**{title}** is taught by {course['instructor']}.", sources
+
+        # intent == "lesson"
+        number = int(LESSON_NUMBER.search(query).group(1))
+        lesson = next((l for l in course.get("lessons", []) if l.get("lesson_number") == number), None)
+        if lesson is None:
+            return f"**{title}** has no lesson {number}.", sources
+        answer = f"Lesson {number} of **{title}**: {lesson.get('lesson_title', 'Untitled')}"
+        if lesson.get("lesson_link"):
+            answer += f"\n{lesson['lesson_link']}"
+        return answer, [{"text": f"{title} - Lesson {number}", "link": lesson.get("lesson_link")}]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Routed vs. fallthrough counts, by intent"""
+        with self._lock:
+            return {**self._stats, "by_intent": dict(self._stats["by_intent"])}
@@ -1,9 +1,16 @@
-from typing import List, Tuple, Optional, Dict
+from typing import Callable, List, Tuple, Optional, Dict, Iterable
+from concurrent.futures import ThreadPoolExecutor
 import os
+import threading
+import time
 from document_processor import DocumentProcessor
+from document_extractors import ExtractorPool, SUPPORTED_EXTENSIONS, needs_extraction
+from folder_watcher import FolderWatcher, IngestionManifest, file_digest, scan_folder
 from vector_store import VectorStore
 from ai_generator import AIGenerator
+from llm_transport import LLMTransport, LLMUnavailableError
 from session_manager import SessionManager
+from query_router import QueryRouter
 from search_tools import ToolManager, CourseSearchTool, CourseOutlineTool
 from models import Course, Lesson, CourseChunk
 
@@ -15,48 +22,149 @@ class RAGSystem:
         
         # Initialize core components
         self.document_processor = DocumentProcessor(config.CHUNK_SIZE, config.CHUNK_OVERLAP)
-        self.vector_store = VectorStore(config.CHROMA_PATH, config.EMBEDDING_MODEL, config.MAX_RESULTS)
-        self.ai_generator = AIGenerator(config.ANTHROPIC_API_KEY, config.ANTHROPIC_MODEL)
+        self.extractor_pool = ExtractorPool(config.EXTRACTION_WORKERS, config.EXTRACTION_TIMEOUT)
+        self.vector_store = VectorStore(
+            config.CHROMA_PATH,
+            config.EMBEDDING_MODEL,
+            config.MAX_RESULTS,
+            embedding_batch_size=config.EMBEDDING_BATCH_SIZE,
+            embedding_batch_window_ms=config.EMBEDDING_BATCH_WINDOW_MS,
+            embedding_backend=config.EMBEDDING_BACKEND,
+            embedding_store_path=config.EMBEDDING_STORE_PATH or None,
+            vector_backend=config.VECTOR_BACKEND,
+            numpy_index_path=config.NUMPY_INDEX_PATH,
+            partition_cache_size=config.PARTITION_CACHE_SIZE,
+            max_distance=config.RELEVANCE_MAX_DISTANCE,
+            relevance_percentile=config.RELEVANCE_PERCENTILE,
+            mmr_lambda=config.MMR_LAMBDA,
+            mmr_fetch_factor=config.MMR_FETCH_FACTOR,
+            search_cache_size=config.SEARCH_CACHE_SIZE,
+            search_cache_ttl=config.SEARCH_CACHE_TTL,
+            refresh_interval=config.INDEX_REFRESH_INTERVAL
+        )
+        self.ai_generator = AIGenerator(
+            config.ANTHROPIC_API_KEY,
+            config.ANTHROPIC_MODEL,
+            max_connections=config.ANTHROPIC_MAX_CONNECTIONS,
+            connect_timeout=config.ANTHROPIC_CONNECT_TIMEOUT,
+            read_timeout=config.ANTHROPIC_READ_TIMEOUT,
+            transport=LLMTransport(
+                max_concurrency=config.ANTHROPIC_MAX_CONCURRENCY,
+                queue_timeout=config.ANTHROPIC_QUEUE_TIMEOUT,
+                max_retries=config.ANTHROPIC_MAX_RETRIES,
+                backoff_base=config.ANTHROPIC_BACKOFF_BASE,
+                backoff_max=config.ANTHROPIC_BACKOFF_MAX,
+                breaker_threshold=config.ANTHROPIC_BREAKER_THRESHOLD,
+                breaker_cooldown=config.ANTHROPIC_BREAKER_COOLDOWN
+            ),
+            max_tool_rounds=config.MAX_TOOL_ROUNDS,
+            early_stop_distance=config.EARLY_STOP_DISTANCE,
+            latency_budget=config.TOOL_LATENCY_BUDGET,
+            token_budget=config.TOOL_TOKEN_BUDGET,
+            compact_chars=config.TOOL_RESULT_COMPACT_CHARS
+        )
         self.session_manager = SessionManager(config.MAX_HISTORY)
         
         # Initialize search tools
         self.tool_manager = ToolManager()
-        self.search_tool = CourseSearchTool(self.vector_store)
+        self.search_tool = CourseSearchTool(self.vector_store, prefetch_similarity=config.PREFETCH_SIMILARITY)
         self.tool_manager.register_tool(self.search_tool)
         self.tool_manager.register_tool(CourseOutlineTool(self.vector_store))
+
+        # Catalog questions answered without a model call
+        self.query_router = QueryRouter(self.vector_store) if config.FAST_PATH_ROUTING else None
+
+        # Searches on the raw question run here while the first model call is in flight
+        self.prefetch_mode = config.PREFETCH_MODE
+        self._prefetch_pool = (
+            ThreadPoolExecutor(max_workers=config.PREFETCH_WORKERS, thread_name_prefix="prefetch")
+            if self.prefetch_mode in ("speculative", "inject") else None
+        )
+
+        # Docs folder watching (see add_course_folder(watch=True))
+        self._sync_lock = threading.Lock()
+        self._manifest: Optional[IngestionManifest] = None
+        self.folder_watcher: Optional[FolderWatcher] = None
     
-    def add_course_document(self, file_path: str) -> Tuple[Course, int]:
+    def add_course_document(self, file_path: str, background: bool = False,
+                            raise_errors: bool = False) -> Tuple[Course, int]:
         """
-        Add a single course document to the knowledge base.
+        Add a single course document to the knowledge base, replacing the course if it is already indexed.
         
         Args:
             file_path: Path to the course document
+            background: Yield to query traffic (low-priority embeddings, pauses between batches)
+            raise_errors: Raise parsing and indexing errors instead of returning (None, 0)
             
         Returns:
             Tuple of (Course object, number of chunks created)
         """
         try:
-            # Process the document
-            course, course_chunks = self.document_processor.process_course_document(file_path)
-            
-            # Add course metadata to vector store for semantic search
-            self.vector_store.add_course_metadata(course)
-            
-            # Add course content chunks to vector store
-            self.vector_store.add_course_content(course_chunks)
-            
-            return course, len(course_chunks)
+            # Parse the document incrementally and write chunks as lessons close
+            course, course_chunks = self._open_course_document(file_path)
+            return course, self._ingest_course(course, course_chunks, background)
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Error processing course document {file_path}: {e}")
             return None, 0
+
+    def _open_course_document(self, file_path: str) -> Tuple[Course, Iterable[CourseChunk]]:
+        """
+        Parse a course document of any supported format.
+
+        Text files are streamed in-process. PDF and DOCX files are extracted in the
+        worker pool first, so a slow or malformed file times out instead of stalling
+        ingestion.
+        """
+        if needs_extraction(file_path):
+            document = self.extractor_pool.extract(file_path)
+            return self.document_processor.stream_extracted_document(document, file_path)
+        return self.document_processor.stream_course_document(file_path)
+
+    def _ingest_course(self, course: Course, course_chunks: Iterable[CourseChunk],
+                       background: bool = False) -> int:
+        """
+        Write a course's chunks to the vector store in batches as they are produced.
+
+        Any chunks and catalog entry the course already has are deleted first, so
+        re-ingesting a course replaces it: no stale tail chunks if the document
+        shrank (Chroma upserts by chunk index) and no duplicated rows (the NumPy
+        index only appends). The catalog entry is written last, because the
+        course's lesson list is only complete once the chunk stream has been consumed.
+
+        Returns:
+            Number of chunks written
+        """
+        self.vector_store.delete_course(course.title)
+        total = 0
+        batch = []
+        for chunk in course_chunks:
+            batch.append(chunk)
+            if len(batch) >= self.config.INGEST_BATCH_SIZE:
+                self.vector_store.add_course_content(batch, background=background)
+                total += len(batch)
+                batch = []
+                if background:
+                    # Give query threads the GIL and the database between batches
+                    time.sleep(self.config.INGESTION_BATCH_PAUSE)
+        if batch:
+            self.vector_store.add_course_content(batch, background=background)
+            total += len(batch)
+
+        self.vector_store.add_course_metadata(course)
+        return total
     
-    def add_course_folder(self, folder_path: str, clear_existing: bool = False) -> Tuple[int, int]:
+    def add_course_folder(self, folder_path: str, clear_existing: bool = False,
+                          watch: bool = False) -> Tuple[int, int]:
         """
         Add all course documents from a folder.
         
         Args:
             folder_path: Path to folder containing course documents
             clear_existing: Whether to clear existing data first
+            watch: Keep the folder in sync afterwards, re-indexing added, modified
+                and removed files in the background (see sync_course_folder)
             
         Returns:
             Tuple of (total courses added, total chunks created)
@@ -72,6 +180,11 @@ class RAGSystem:
         if not os.path.exists(folder_path):
             print(f"Folder {folder_path} does not exist")
             return 0, 0
+
+        if watch:
+            summary = self.sync_course_folder(folder_path)
+            self.watch_course_folder(folder_path)
+            return summary["added"] + summary["updated"], summary["chunks"]
         
         # Get existing course titles to avoid re-processing
         existing_course_titles = set(self.vector_store.get_existing_course_titles())
@@ -79,19 +192,17 @@ class RAGSystem:
         # Process each file in the folder
         for file_name in os.listdir(folder_path):
             file_path = os.path.join(folder_path, file_name)
-            if os.path.isfile(file_path) and file_name.lower().endswith(('.pdf', '.docx', '.txt')):
+            if os.path.isfile(file_path) and file_name.lower().endswith(SUPPORTED_EXTENSIONS):
                 try:
-                    # Check if this course might already exist
-                    # We'll process the document to get the course ID, but only add if new
-                    course, course_chunks = self.document_processor.process_course_document(file_path)
+                    # Only the header is parsed up front; the body is streamed if the course is new
+                    course, course_chunks = self._open_course_document(file_path)
                     
                     if course and course.title not in existing_course_titles:
                         # This is a new course - add it to the vector store
-                        self.vector_store.add_course_metadata(course)
-                        self.vector_store.add_course_content(course_chunks)
+                        chunk_count = self._ingest_course(course, course_chunks)
                         total_courses += 1
-                        total_chunks += len(course_chunks)
-                        print(f"Added new course: {course.title} ({len(course_chunks)} chunks)")
+                        total_chunks += chunk_count
+                        print(f"Added new course: {course.title} ({chunk_count} chunks)")
                         existing_course_titles.add(course.title)
                     elif course:
                         print(f"Course already exists: {course.title} - skipping")
@@ -100,17 +211,201 @@ class RAGSystem:
         
         return total_courses, total_chunks
     
-    def query(self, query: str, session_id: Optional[str] = None) -> Tuple[str, List[str]]:
+    def add_course_files(self, file_paths: List[str], workers: int = 1, skip_existing: bool = True,
+                         on_progress: Optional[Callable[..., None]] = None) -> Tuple[int, int]:
+        """
+        Ingest several course documents, optionally in parallel.
+
+        Files are parsed and written by a thread pool. Their embedding requests land
+        in the shared micro-batching service concurrently and are coalesced into
+        fuller model batches, so workers > 1 helps even though writes are serialized.
+
+        Args:
+            file_paths: Course documents to ingest
+            workers: Files processed at once
+            skip_existing: Skip documents whose course title is already indexed
+            on_progress: Called after each file as
+                on_progress(done, total, file_path, course, chunk_count, error)
+
+        Returns:
+            Tuple of (total courses added, total chunks created)
+        """
+        existing_course_titles = set(self.vector_store.get_existing_course_titles())
+        claimed = set(existing_course_titles) if skip_existing else set()
+        claim_lock = threading.Lock()
+        progress_lock = threading.Lock()
+        done = 0
+        totals = [0, 0]
+
+        def ingest(file_path: str):
+            nonlocal done
+            course, chunk_count, error = None, 0, None
+            try:
+                course, course_chunks = self._open_course_document(file_path)
+                if not course:
+                    error = "could not be parsed"
+                else:
+                    with claim_lock:
+                        duplicate = skip_existing and course.title in claimed
+                        claimed.add(course.title)
+                    if duplicate:
+                        error = "course already exists"
+                    else:
+                        chunk_count = self._ingest_course(course, course_chunks)
+            except Exception as e:
+                error = str(e)
+            with progress_lock:
+                done += 1
+                if error is None:
+                    totals[0] += 1
+                    totals[1] += chunk_count
+                if on_progress is not None:
+                    on_progress(done, len(file_paths), file_path, course, chunk_count, error)
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            list(pool.map(ingest, file_paths))
+        return totals[0], totals[1]
+
+    def _get_manifest(self) -> IngestionManifest:
+        if self._manifest is None:
+            self._manifest = IngestionManifest(self.config.DOCS_MANIFEST_PATH)
+        return self._manifest
+
+    def sync_course_folder(self, folder_path: str) -> Dict[str, int]:
+        """
+        Bring the index in line with the files currently in a folder.
+
+        Files are compared against the ingestion manifest by size and mtime, then by
+        content digest, so only new or edited files are parsed. An edited file's old
+        course is deleted before it is re-ingested (its title or chunk count may have
+        changed), and courses whose file was removed are deleted. Courses already
+        indexed before the manifest existed are adopted without re-ingestion. Writes
+        run with background=True so a sync does not stall queries.
+
+        A file that fails to ingest keeps its previous manifest entry and is retried
+        on the next sync.
+
+        Returns:
+            Counts of added, updated, removed and unchanged files, and chunks written
+        """
+        summary = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0, "chunks": 0}
+        with self._sync_lock:
+            manifest = self._get_manifest()
+            current = scan_folder(folder_path, SUPPORTED_EXTENSIONS)
+            existing_course_titles = set(self.vector_store.get_existing_course_titles())
+
+            for file_path in manifest.files_in(folder_path):
+                if file_path in current:
+                    continue
+                title = manifest.get(file_path)["course_title"]
+                manifest.remove(file_path)
+                # Another file may still provide a course with the same title
+                if all(entry["course_title"] != title for entry in manifest.entries.values()):
+                    try:
+                        self.vector_store.delete_course(title)
+                        existing_course_titles.discard(title)
+                        summary["removed"] += 1
+                        print(f"Removed course: {title}")
+                    except Exception as e:
+                        print(f"Error removing course {title}: {e}")
+
+            for file_path, fingerprint in sorted(current.items()):
+                entry = manifest.get(file_path)
+                indexed = entry is not None and entry["course_title"] in existing_course_titles
+                if indexed and (entry["size"], entry["mtime_ns"]) == fingerprint:
+                    summary["unchanged"] += 1
+                    continue
+                try:
+                    digest = file_digest(file_path)
+                    if indexed and entry["digest"] == digest:
+                        # Touched but not edited
+                        manifest.record(file_path, fingerprint, digest, entry["course_title"])
+                        summary["unchanged"] += 1
+                        continue
+
+                    course, course_chunks = self._open_course_document(file_path)
+                    if not course:
+                        print(f"Could not parse {file_path} - skipping")
+                        continue
+                    if entry is None and course.title in existing_course_titles:
+                        # Indexed before the manifest tracked this file
+                        manifest.record(file_path, fingerprint, digest, course.title)
+                        summary["unchanged"] += 1
+                        continue
+
+                    if entry is not None and entry["course_title"] != course.title:
+                        # Renamed: the old course goes (_ingest_course replaces the new title)
+                        self.vector_store.delete_course(entry["course_title"])
+                        existing_course_titles.discard(entry["course_title"])
+                    chunk_count = self._ingest_course(course, course_chunks, background=True)
+                    manifest.record(file_path, fingerprint, digest, course.title)
+                    existing_course_titles.add(course.title)
+                    summary["updated" if entry is not None else "added"] += 1
+                    summary["chunks"] += chunk_count
+                    print(f"{'Re-indexed' if entry is not None else 'Added new'} course: "
+                          f"{course.title} ({chunk_count} chunks)")
+                except Exception as e:
+                    print(f"Error processing {file_path}: {e}")
+
+            try:
+                manifest.save()
+            except Exception as e:
+                print(f"Error saving ingestion manifest: {e}")
+        return summary
+
+    def watch_course_folder(self, folder_path: str):
+        """Start re-syncing a folder in the background whenever its files change"""
+        self.stop_watching()
+        self.folder_watcher = FolderWatcher(
+            folder_path,
+            lambda: self.sync_course_folder(folder_path),
+            SUPPORTED_EXTENSIONS,
+            debounce=self.config.WATCH_DEBOUNCE,
+            poll_interval=self.config.WATCH_POLL_INTERVAL
+        )
+        self.folder_watcher.start()
+        print(f"Watching {folder_path} for course document changes")
+
+    def stop_watching(self, timeout: Optional[float] = None):
+        """Stop the folder watcher, if one is running"""
+        if self.folder_watcher is not None:
+            self.folder_watcher.stop(timeout)
+            self.folder_watcher = None
+    
+    def query(self, query: str, session_id: Optional[str] = None,
+              retrieval_only: bool = False) -> Tuple[str, List[str]]:
         """
         Process a user query using the RAG system with tool-based search.
+
+        Structural questions about the catalog (outlines, links, instructors) are
+        answered directly by the query router without calling the model. Otherwise
+        the question is searched concurrently with the first model call (see
+        CourseSearchTool.prefetch); in "inject" mode the results are added to the
+        prompt so most questions need a single model call.
         
         Args:
             query: User's question
             session_id: Optional session ID for conversation context
+            retrieval_only: Return the matching course excerpts without generating an answer
             
         Returns:
             Tuple of (response, sources list - empty for tool-based approach)
         """
+        if retrieval_only:
+            self.tool_manager.reset_sources()
+            response = self._retrieval_answer(query)
+            sources = self.tool_manager.get_last_sources()
+            self.tool_manager.reset_sources()
+            return response, sources
+
+        if self.query_router is not None:
+            routed = self.query_router.route(query)
+            if routed is not None:
+                response, sources = routed
+                if session_id:
+                    self.session_manager.add_exchange(session_id, query, response)
+                return response, sources
+
         # Create prompt for the AI with clear instructions
         prompt = f"""Answer this question about course materials: {query}"""
         
@@ -119,13 +414,27 @@ class RAGSystem:
         if session_id:
             history = self.session_manager.get_conversation_history(session_id)
         
+        if self._prefetch_pool is not None:
+            self.search_tool.prefetch(query, self._prefetch_pool)
+
         # Generate response using AI with tools
-        response = self.ai_generator.generate_response(
-            query=prompt,
-            conversation_history=history,
-            tools=self.tool_manager.get_tool_definitions(),
-            tool_manager=self.tool_manager
-        )
+        degraded = False
+        try:
+            if self.prefetch_mode == "inject":
+                prompt = self._with_course_excerpts(prompt, query)
+            response = self.ai_generator.generate_response(
+                query=prompt,
+                conversation_history=history,
+                tools=self.tool_manager.get_tool_definitions(),
+                tool_manager=self.tool_manager
+            )
+        except LLMUnavailableError as e:
+            print(f"Answering from retrieval only: {e}")
+            self.tool_manager.reset_sources()
+            response = self._retrieval_answer(query, notice="The AI assistant is temporarily unavailable.")
+            degraded = True
+        finally:
+            self.search_tool.clear_prefetch()
         
         # Get sources from the search tool
         sources = self.tool_manager.get_last_sources()
@@ -133,16 +442,55 @@ class RAGSystem:
         # Reset sources after retrieving them
         self.tool_manager.reset_sources()
         
-        # Update conversation history
-        if session_id:
+        # Update conversation history (outage notices are not worth remembering)
+        if session_id and not degraded:
             self.session_manager.add_exchange(session_id, query, response)
         
         # Return response with sources from tool searches
         return response, sources
     
+    def _with_course_excerpts(self, prompt: str, query: str) -> str:
+        """Add the prefetched search results to the prompt, if there are any"""
+        try:
+            excerpts = self.search_tool.execute(query=query)
+        except Exception as e:
+            print(f"Prefetched search failed: {e}")
+            return prompt
+        if not self.search_tool.last_sources:
+            return prompt
+        return (f"{prompt}\n\nCourse excerpts found for this question "
+                f"(search again only if they do not answer it):\n\n{excerpts}")
+
+    def _retrieval_answer(self, query: str, notice: Optional[str] = None) -> str:
+        """
+        The most relevant course excerpts, without generation. Used for retrieval-only
+        requests and, with a notice, as the degraded answer while the AI is unavailable.
+        """
+        try:
+            results = self.search_tool.execute(query=query)
+        except Exception as e:
+            print(f"Retrieval-only search failed: {e}")
+            results = "Search is unavailable right now."
+            return f"{notice} Please try again shortly." if notice else results
+        if not notice:
+            return results
+        if not self.search_tool.last_sources:
+            return f"{notice} {results}"
+        return f"{notice} These course excerpts look most relevant to your question:\n\n{results}"
+
     def get_course_analytics(self) -> Dict:
         """Get analytics about the course catalog"""
         return {
             "total_courses": self.vector_store.get_course_count(),
             "course_titles": self.vector_store.get_existing_course_titles()
-        }
\ No newline at end of file
+        }
+
+    def get_metrics(self) -> Dict:
+        """Get runtime metrics from the system's components"""
+        return {
+            "embedding": self.vector_store.get_embedding_stats(),
+            "search": self.vector_store.get_search_stats(),
+            "llm": self.ai_generator.get_stats(),
+            "router": self.query_router.get_stats() if self.query_router is not None else None,
+            "prefetch": {"mode": self.prefetch_mode, **self.search_tool.get_prefetch_stats()}
+        }
@@ -0,0 +1,235 @@
+"""
+Command-line access to the RAG system without starting the web server.
+
+Subcommands share configuration with config.Config; any field can be overridden
+with -c FIELD=VALUE (e.g. -c CHROMA_PATH=/data/chroma -c VECTOR_BACKEND=numpy).
+
+Usage (from backend/):
+    uv run python -m ragchat ingest ../docs --workers 4
+    uv run python -m ragchat search "what is MCP" --course MCP --repeat 20
+    uv run python -m ragchat query "What does lesson 2 of the MCP course cover?"
+    uv run python -m ragchat stats
+    uv run python -m ragchat bench --iterations 5 --concurrency 8
+"""
+
+import argparse
+import dataclasses
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from config import Config
+from document_extractors import SUPPORTED_EXTENSIONS
+
+
+def build_config(overrides: List[str]) -> Config:
+    """The default configuration with FIELD=VALUE overrides applied"""
+    config = Config()
+    fields = {field.name: field for field in dataclasses.fields(Config)}
+    for override in overrides:
+        name, sep, value = override.partition("=")
+        if not sep or name not in fields:
+            raise SystemExit(f"Invalid config override '{override}'; expected FIELD=VALUE with a Config field")
+        field_type = type(getattr(config, name))
+        if field_type is bool:
+            setattr(config, name, value.lower() in ("1", "true", "yes"))
+        else:
+            setattr(config, name, field_type(value))
+    return config
+
+
+def positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def expand_paths(paths: List[str]) -> List[str]:
+    """Supported course documents in the given files and folders, in a stable order"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.lower().endswith(SUPPORTED_EXTENSIONS) and os.path.isfile(os.path.join(path, name))
+            )
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            print(f"Skipping {path}: not found", file=sys.stderr)
+    return files
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def cmd_ingest(rag_system, args):
+    files = expand_paths(args.paths)
+    if not files:
+        print("No course documents found")
+        return
+    if args.clear:
+        rag_system.vector_store.clear_all_data()
+
+    def progress(done, total, file_path, course, chunk_count, error):
+        name = os.path.basename(file_path)
+        outcome = f"skipped ({error})" if error else f"{course.title} ({chunk_count} chunks)"
+        print(f"[{done}/{total}] {name}: {outcome}", flush=True)
+
+    t0 = time.perf_counter()
+    courses, chunks = rag_system.add_course_files(
+        files, workers=args.workers, skip_existing=not args.force, on_progress=progress
+    )
+    elapsed = time.perf_counter() - t0
+    print(f"Added {courses} courses, {chunks} chunks in {elapsed:.1f}s "
+          f"({chunks / elapsed if elapsed else 0:.0f} chunks/s)")
+
+
+def cmd_search(rag_system, args):
+    timings = []
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        results = rag_system.vector_store.search(args.query, course_name=args.course,
+                                                 lesson_number=args.lesson, limit=args.limit)
+        timings.append((time.perf_counter() - t0) * 1000)
+
+    if results.error:
+        print(results.error)
+    for document, meta, distance in zip(results.documents, results.metadata, results.distances):
+        location = meta.get("course_title", "?")
+        if meta.get("lesson_number") is not None:
+            location += f" / lesson {meta['lesson_number']}"
+        print(f"{distance:.4f}  {location}\n        {document[:160]}")
+
+    if len(timings) == 1:
+        print(f"\nsearch: {timings[0]:.1f} ms")
+    else:
+        # The first call includes model and index warm-up
+        print(f"\nsearch: first {timings[0]:.1f} ms, median {statistics.median(timings[1:]):.1f} ms, "
+              f"min {min(timings[1:]):.1f} ms over {len(timings) - 1} repeats")
+
+
+def cmd_query(rag_system, args):
+    t0 = time.perf_counter()
+    answer, sources = rag_system.query(args.question, args.session_id, retrieval_only=args.retrieval_only)
+    elapsed = time.perf_counter() - t0
+    print(answer)
+    if sources:
+        print("\nSources:")
+        for source in sources:
+            if isinstance(source, dict):
+                link = f" <{source['link']}>" if source.get("link") else ""
+                print(f"  - {source.get('text')}{link}")
+            else:
+                print(f"  - {source}")
+    print(f"\nquery: {elapsed:.2f}s")
+
+
+def cmd_stats(rag_system, args):
+    stats = {"courses": rag_system.get_course_analytics(), "metrics": rag_system.get_metrics()}
+    print(json.dumps(stats, indent=2, default=str))
+
+
+def bench_queries(rag_system, queries_file: Optional[str]) -> List[str]:
+    """Queries from a file (one per line), or one per lesson title in the catalog"""
+    if queries_file:
+        with open(queries_file, "r", encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip()]
+    queries = []
+    for course in rag_system.vector_store.get_all_courses_metadata():
+        queries.extend(lesson["lesson_title"] for lesson in course.get("lessons", []))
+        queries.append(course["title"])
+    return queries
+
+
+def cmd_bench(rag_system, args):
+    queries = bench_queries(rag_system, args.queries)
+    if not queries:
+        print("No queries: index some courses or pass --queries")
+        return
+    search = rag_system.vector_store.search
+    search(queries[0], limit=args.limit)  # Warm up the model and index
+
+    def timed(query):
+        t0 = time.perf_counter()
+        search(query, limit=args.limit)
+        return (time.perf_counter() - t0) * 1000
+
+    workload = queries * args.iterations
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        latencies = sorted(pool.map(timed, workload))
+    elapsed = time.perf_counter() - t0
+
+    print(f"{len(workload)} searches ({len(queries)} distinct) at concurrency {args.concurrency}")
+    print(f"throughput: {len(workload) / elapsed:.1f} searches/s")
+    print(f"latency ms: p50 {percentile(latencies, 50):.1f}  p95 {percentile(latencies, 95):.1f}  "
+          f"p99 {percentile(latencies, 99):.1f}  max {latencies[-1]:.1f}")
+    embedding = rag_system.get_metrics()["embedding"]
+    print(f"embedding batches: {embedding.get('batches')}, avg batch size {embedding.get('avg_batch_size', 0):.1f}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="ragchat", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-c", "--config", action="append", default=[], metavar="FIELD=VALUE",
+                        help="Override a Config field (repeatable)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="Add course documents to the index")
+    ingest.add_argument("paths", nargs="+", help="Course documents or folders of them")
+    ingest.add_argument("--workers", type=positive_int, default=4, help="Files processed in parallel")
+    ingest.add_argument("--force", action="store_true", help="Re-ingest courses that already exist")
+    ingest.add_argument("--clear", action="store_true", help="Clear the index first")
+    ingest.set_defaults(handler=cmd_ingest)
+
+    search = commands.add_parser("search", help="Run a raw vector search")
+    search.add_argument("query")
+    search.add_argument("--course", help="Course name filter (fuzzy, as the search tool uses it)")
+    search.add_argument("--lesson", type=int, help="Lesson number filter")
+    search.add_argument("--limit", type=int, help="Results to return (default: MAX_RESULTS)")
+    search.add_argument("--repeat", type=positive_int, default=1, help="Run the search this many times for timing")
+    search.set_defaults(handler=cmd_search)
+
+    query = commands.add_parser("query", help="Answer a question with the full RAG pipeline")
+    query.add_argument("question")
+    query.add_argument("--session-id", help="Continue a conversation (in-process only)")
+    query.add_argument("--retrieval-only", action="store_true", help="Print matching excerpts, no generation")
+    query.set_defaults(handler=cmd_query)
+
+    stats = commands.add_parser("stats", help="Print catalog and runtime metrics as JSON")
+    stats.set_defaults(handler=cmd_stats)
+
+    bench = commands.add_parser("bench", help="Measure search latency and throughput on the index")
+    bench.add_argument("--queries", help="File with one query per line (default: lesson titles)")
+    bench.add_argument("--iterations", type=positive_int, default=3, help="Passes over the query set")
+    bench.add_argument("--concurrency", type=positive_int, default=4, help="Concurrent searches")
+    bench.add_argument("--limit", type=int, help="Results per search (default: MAX_RESULTS)")
+    bench.set_defaults(handler=cmd_bench)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+    args = build_parser().parse_args(argv)
+    config = build_config(args.config)
+
+    from rag_system import RAGSystem
+
+    rag_system = RAGSystem(config)
+    try:
+        args.handler(rag_system, args)
+    finally:
+        rag_system.extractor_pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,25 @@
 from typing import Dict, Any, Optional, Protocol
 from abc import ABC, abstractmethod
+from concurrent.futures import Executor, Future
+import re
+import threading
 from vector_store import VectorStore, SearchResults
 
+# Words ignored when comparing a tool call's query with the user's question
+QUERY_STOPWORDS = {
+    "a", "an", "and", "are", "about", "the", "of", "for", "to", "in", "on", "is", "it", "what",
+    "how", "does", "do", "me", "tell", "explain", "with", "course", "lesson",
+}
+
+
+def query_similarity(a: str, b: str) -> float:
+    """Jaccard similarity of the content words of two search queries"""
+    words_a = set(re.findall(r"[a-z0-9]+", a.lower())) - QUERY_STOPWORDS
+    words_b = set(re.findall(r"[a-z0-9]+", b.lower())) - QUERY_STOPWORDS
+    if not words_a or not words_b:
+        return 1.0 if a.strip().lower() == b.strip().lower() else 0.0
+    return len(words_a & words_b) / len(words_a | words_b)
+
 
 class Tool(ABC):
     """Abstract base class for all tools"""
@@ -20,10 +38,78 @@ class Tool(ABC):
 class CourseSearchTool(Tool):
     """Tool for searching course content with semantic course name matching"""
     
-    def __init__(self, vector_store: VectorStore):
+    def __init__(self, vector_store: VectorStore, prefetch_similarity: float = 0.5):
         self.store = vector_store
-        self.last_sources = []  # Track sources from last search
+        # Speculative search on the user's question, per request thread (see prefetch)
+        self.prefetch_similarity = prefetch_similarity
+        self._prefetch = threading.local()
+        self._stats_lock = threading.Lock()
+        self._prefetch_stats = {"prefetched": 0, "hits": 0, "misses": 0}
+        # Sources and closest distance (None when nothing matched) of this thread's last
+        # search, so concurrent requests never see each other's results
+        self._last = threading.local()
+
+    @property
+    def last_sources(self) -> list:
+        """Sources of this thread's last search, for the UI"""
+        return getattr(self._last, "sources", [])
+
+    @last_sources.setter
+    def last_sources(self, sources: list):
+        self._last.sources = sources
     
+    def prefetch(self, query: str, executor: Executor) -> Future:
+        """
+        Start searching for `query` on `executor` while the model is thinking.
+
+        A later unfiltered execute() on this thread whose query is similar enough
+        (query_similarity >= prefetch_similarity) uses this result instead of
+        searching again. Call clear_prefetch() when the request is done.
+        """
+        future = executor.submit(self.store.search, query=query)
+        self._prefetch.query = query
+        self._prefetch.future = future
+        with self._stats_lock:
+            self._prefetch_stats["prefetched"] += 1
+        return future
+
+    def clear_prefetch(self):
+        future = getattr(self._prefetch, "future", None)
+        if future is not None:
+            future.cancel()
+        self._prefetch.future = None
+        self._prefetch.query = None
+
+    def _prefetched_results(self, query: str, course_name: Optional[str],
+                            lesson_number: Optional[int]) -> Optional[SearchResults]:
+        future = getattr(self._prefetch, "future", None)
+        if future is None:
+            return None
+        if course_name or lesson_number is not None or \
+                query_similarity(query, self._prefetch.query) < self.prefetch_similarity:
+            with self._stats_lock:
+                self._prefetch_stats["misses"] += 1
+            return None
+        try:
+            results = future.result()
+        except Exception as e:
+            print(f"Prefetched search failed: {e}")
+            return None
+        with self._stats_lock:
+            self._prefetch_stats["hits"] += 1
+        return results
+
+    def get_best_distance(self) -> Optional[float]:
+        """Distance of the closest chunk found by this thread's last search"""
+        return getattr(self._last, "best_distance", None)
+
+    def clear_best_distance(self):
+        self._last.best_distance = None
+
+    def get_prefetch_stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self._prefetch_stats)
+
     def get_tool_definition(self) -> Dict[str, Any]:
         """Return Anthropic tool definition for this tool"""
         return {
@@ -62,11 +148,16 @@ class CourseSearchTool(Tool):
             Formatted search results or error message
         """
         
-        # Use the vector store's unified search interface
-        results = self.store.search(
-            query=query,
-            course_name=course_name,
-            lesson_number=lesson_number
+        # Use the speculative search if it matches, else the vector store's unified search interface
+        results = self._prefetched_results(query, course_name, lesson_number)
+        if results is None:
+            results = self.store.search(
+                query=query,
+                course_name=course_name,
+                lesson_number=lesson_number
+            )
+        self._last.best_distance = (
+            min(results.distances) if results.distances and not results.error else None
         )
         
         # Handle errors
@@ -88,9 +179,16 @@ class CourseSearchTool(Tool):
     def _format_results(self, results: SearchResults) -> str:
         """Format search results with course and lesson context"""
         formatted = []
-        sources = []  # Track sources for the UI
-        
-        for doc, meta in zip(results.documents, results.metadata):
+        sources: Dict[str, Dict[str, Any]] = {}  # Track sources for the UI, one per course/lesson
+
+        # Resolve the links of all lessons in the result set with one catalog read
+        lesson_links = self.store.get_lesson_links([
+            (meta.get('course_title', 'unknown'), meta['lesson_number'])
+            for meta in results.metadata if meta.get('lesson_number') is not None
+        ])
+
+        distances = results.distances if len(results.distances) == len(results.documents) else []
+        for i, (doc, meta) in enumerate(zip(results.documents, results.metadata)):
             course_title = meta.get('course_title', 'unknown')
             lesson_num = meta.get('lesson_number')
             
@@ -104,15 +202,17 @@ class CourseSearchTool(Tool):
             source_text = course_title
             if lesson_num is not None:
                 source_text += f" - Lesson {lesson_num}"
-            link = None
-            if lesson_num is not None:
-                link = self.store.get_lesson_link(course_title, lesson_num)
-            sources.append({"text": source_text, "link": link})
+            link = lesson_links.get((course_title, lesson_num)) if lesson_num is not None else None
+            # Cosine similarity of the chunk to the query (distances are squared L2 of unit vectors)
+            score = round(1.0 - distances[i] / 2.0, 3) if distances else None
+            source = sources.setdefault(source_text, {"text": source_text, "link": link, "score": score})
+            if score is not None and source["score"] is not None and score > source["score"]:
+                source["score"] = score  # Several chunks of one lesson: keep the best match
             
             formatted.append(f"{header}\n{doc}")
         
         # Store sources for retrieval
-        self.last_sources = sources
+        self.last_sources = list(sources.values())
         
         return "\n\n".join(formatted)
 
@@ -139,44 +239,36 @@ class CourseOutlineTool(Tool):
         }
 
     def execute(self, course_name: str) -> str:
-        import json
-
         # Resolve partial name to full course title
         resolved_title = self.store._resolve_course_name(course_name)
         if not resolved_title:
             return f"No course found matching '{course_name}'."
 
-        # Fetch course metadata from catalog
-        try:
-            results = self.store.course_catalog.get(ids=[resolved_title])
-        except Exception as e:
-            return f"Error retrieving course: {e}"
-
-        if not results or not results['metadatas'] or not results['metadatas'][0]:
+        # Fetch course metadata and lessons from the catalog
+        metadata = self.store.get_course_metadata(resolved_title)
+        if not metadata:
             return f"No metadata found for course '{resolved_title}'."
 
-        metadata = results['metadatas'][0]
-        course_link = metadata.get('course_link', '')
-        lessons_json = metadata.get('lessons_json', '[]')
+        return format_course_outline(resolved_title, metadata.get('course_link', ''), metadata.get('lessons', []))
 
-        lessons = json.loads(lessons_json)
 
-        # Format the outline
-        lines = [f"**{resolved_title}**"]
-        if course_link:
-            lines.append(f"Course link: {course_link}")
-        lines.append("")
+def format_course_outline(course_title: str, course_link: Optional[str], lessons: list) -> str:
+    """Format a course outline (shared by CourseOutlineTool and the query router)"""
+    lines = [f"**{course_title}**"]
+    if course_link:
+        lines.append(f"Course link: {course_link}")
+    lines.append("")
 
-        if lessons:
-            lines.append("Lessons:")
-            for lesson in lessons:
-                num = lesson.get('lesson_number', '?')
-                title = lesson.get('lesson_title', 'Untitled')
-                lines.append(f"  Lesson {num}: {title}")
-        else:
-            lines.append("No lessons found for this course.")
+    if lessons:
+        lines.append("Lessons:")
+        for lesson in lessons:
+            num = lesson.get('lesson_number', '?')
+            title = lesson.get('lesson_title', 'Untitled')
+            lines.append(f"  Lesson {num}: {title}")
+    else:
+        lines.append("No lessons found for this course.")
 
-        return "\n".join(lines)
+    return "\n".join(lines)
 
 
 class ToolManager:
@@ -213,8 +305,18 @@ class ToolManager:
                 return tool.last_sources
         return []
 
+    def get_best_distance(self) -> Optional[float]:
+        """Closest distance found by the last search of any tool that reports one"""
+        distances = [
+            tool.get_best_distance() for tool in self.tools.values() if hasattr(tool, 'get_best_distance')
+        ]
+        distances = [d for d in distances if d is not None]
+        return min(distances) if distances else None
+
     def reset_sources(self):
         """Reset sources from all tools that track sources"""
         for tool in self.tools.values():
             if hasattr(tool, 'last_sources'):
-                tool.last_sources = []
\ No newline at end of file
+                tool.last_sources = []
+            if hasattr(tool, 'clear_best_distance'):
+                tool.clear_best_distance()
\ No newline at end of file
@@ -0,0 +1,200 @@
+"""
+Launch the web app for development or production.
+
+Production mode runs uvicorn without reload, with the worker count, keep-alive,
+graceful shutdown, backlog and concurrency limit taken from Config, and uses
+uvloop and httptools when they are installed. Development mode is the previous
+`uvicorn app:app --reload`. Paths are resolved against backend/, so either mode
+can be started from any directory.
+
+Usage:
+    uv run python backend/server.py            # production
+    uv run python backend/server.py --dev      # auto-reload on code changes
+    uv run python backend/server.py --workers 4 --port 8080
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib.util
+import os
+from typing import Any, Dict, List, Optional
+
+from starlette.responses import JSONResponse
+
+from config import BACKEND_DIR, Config
+from index_snapshot import SnapshotError, index_exists, restore_snapshot
+
+# Held open for the life of the process once this worker owns background writes
+_writer_lock_file = None
+
+
+def _first_available(*modules: str) -> str:
+    """The first of the given uvicorn implementation names whose module is importable"""
+    for module in modules[:-1]:
+        if importlib.util.find_spec(module) is not None:
+            return module
+    return modules[-1]
+
+
+def server_options(config: Config, dev: bool = False) -> Dict[str, Any]:
+    """Keyword arguments for uvicorn.run"""
+    options = {
+        "host": config.HOST,
+        "port": config.PORT,
+        "app_dir": BACKEND_DIR,
+        "timeout_keep_alive": config.KEEPALIVE_TIMEOUT,
+        "timeout_graceful_shutdown": config.GRACEFUL_SHUTDOWN_TIMEOUT,
+        "backlog": config.BACKLOG,
+        "limit_concurrency": config.LIMIT_CONCURRENCY or None,
+        "proxy_headers": True,
+    }
+    if dev:
+        options.update(reload=True, reload_dirs=[BACKEND_DIR])
+    else:
+        options.update(
+            workers=config.WORKERS,
+            loop=_first_available("uvloop", "asyncio"),
+            http=_first_available("httptools", "h11"),
+            access_log=config.ACCESS_LOG,
+        )
+    return options
+
+
+def claim_writer_lock(lock_path: str) -> bool:
+    """
+    Whether this process should run background writers (docs loading and watching,
+    the ingestion worker).
+
+    With several workers, each imports the app; exactly one wins this file lock, so
+    only that one writes to the index while the others serve queries. Uploads from
+    any worker still land in the shared ingestion queue database. Platforms without
+    fcntl run a single worker, which always writes.
+    """
+    global _writer_lock_file
+    if _writer_lock_file is not None:
+        return True
+    try:
+        import fcntl
+    except ImportError:
+        return True
+
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    f = open(lock_path, "a")
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return False
+    _writer_lock_file = f
+    return True
+
+
+@contextlib.contextmanager
+def _exclusive_file_lock(lock_path: str):
+    """Block until this process holds an exclusive lock on lock_path (no-op without fcntl)"""
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    with open(lock_path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def restore_index_snapshot(config: Config) -> bool:
+    """
+    Seed a new node from config.INDEX_SNAPSHOT_PATH if no index exists yet.
+
+    main() calls this once before uvicorn spawns workers. The app also calls it at
+    import for other launchers; a file lock next to the Chroma path makes workers
+    wait for the first restore and then find the index in place, so only one
+    process ever swaps files in.
+
+    Returns:
+        Whether a snapshot was restored
+    """
+    if not config.INDEX_SNAPSHOT_PATH or index_exists(config):
+        return False
+    with _exclusive_file_lock(os.path.abspath(config.CHROMA_PATH) + ".restore.lock"):
+        if index_exists(config):
+            return False
+        try:
+            restore_snapshot(config, config.INDEX_SNAPSHOT_PATH)
+        except SnapshotError as e:
+            print(f"Error restoring index snapshot, building from documents instead: {e}")
+            return False
+    print(f"Restored index from {config.INDEX_SNAPSHOT_PATH}")
+    return True
+
+
+class RequestTimeoutMiddleware:
+    """
+    Answer API requests that run longer than `timeout` seconds with a 504.
+
+    The timeout frees the client and the connection. Work already handed to the
+    threadpool (e.g. an in-flight model call) still runs to completion in the
+    background. Requests whose response has already started are not cut off.
+    """
+
+    def __init__(self, app, timeout: float, path_prefix: str = "/api/"):
+        self.app = app
+        self.timeout = timeout
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.timeout or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await asyncio.wait_for(self.app(scope, receive, send_wrapper), self.timeout)
+        except asyncio.TimeoutError:
+            if response_started:
+                raise
+            response = JSONResponse({"detail": f"Request timed out after {self.timeout:g}s"}, status_code=504)
+            await response(scope, receive, send)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dev", action="store_true", help="Single process with auto-reload")
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args(argv)
+
+    config = Config()
+    for name in ("host", "port", "workers"):
+        if getattr(args, name) is not None:
+            setattr(config, name.upper(), getattr(args, name))
+
+    import uvicorn
+
+    if args.dev:
+        # Serve frontend/ directly with caching disabled (inherited by the reloaded process)
+        os.environ["DEV_MODE"] = "true"
+    # Before any worker imports the app and opens the index
+    restore_index_snapshot(config)
+    options = server_options(config, dev=args.dev)
+    if not args.dev:
+        print(f"Starting {config.WORKERS} worker(s) on {config.HOST}:{config.PORT} "
+              f"(loop={options['loop']}, http={options['http']})")
+    uvicorn.run("app:app", **options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Build and serve the frontend for production.
+
+build_static_assets copies frontend/ into a build directory where:
+- stylesheets and scripts get content-hashed names (style.3f2a9c1b7d4e.css) and
+  the HTML pages are rewritten to reference them, so they can be cached forever;
+- every compressible file gets precompressed .gz (and .br, if the brotli module
+  is installed) siblings, so nothing is compressed per request.
+
+AssetStaticFiles serves that directory: it picks the best precompressed variant
+the client accepts, marks hashed assets immutable and makes everything else
+revalidate via ETag (304 Not Modified comes from StaticFiles).
+
+Usage (from backend/):
+    uv run python -m static_assets ../frontend ./static_build
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import sys
+from typing import Dict, Iterable, Optional, Set
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Files worth hashing into their names (referenced from HTML pages)
+HASHED_EXTENSIONS = (".css", ".js")
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".json", ".svg", ".txt", ".map", ".xml")
+MIN_COMPRESS_SIZE = 256
+# Tooling files in frontend/ that are not part of the site
+EXCLUDED_FILES = {"package.json", "package-lock.json", "eslint.config.js"}
+
+# src="..." / href="..." pointing at a local file, ignoring any ?v= cache buster
+ASSET_REFERENCE = re.compile(r'''(?P<attr>\b(?:src|href)=["'])(?P<path>[^"'?#:]+)(?:\?[^"'#]*)?(?=["'#])''')
+HASHED_NAME = re.compile(r"\.[0-9a-f]{12}\.[^./]+$")
+
+# Content-Encoding -> file suffix, in order of preference
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+
+def _write_if_changed(path: str, data: bytes):
+    """Write atomically, skipping identical content (several workers may build at once)"""
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return
+    except FileNotFoundError:
+        pass
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _hashed_name(rel_path: str, data: bytes) -> str:
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}.{hashlib.blake2b(data, digest_size=6).hexdigest()}{ext}"
+
+
+def _site_files(source_dir: str) -> Iterable[str]:
+    """Relative paths of the files to publish, with '/' separators"""
+    for root, dirs, names in os.walk(source_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith(".") and d != "node_modules")
+        for name in sorted(names):
+            if name.startswith(".") or name in EXCLUDED_FILES:
+                continue
+            yield os.path.relpath(os.path.join(root, name), source_dir).replace(os.sep, "/")
+
+
+def _compressed_variants(data: bytes) -> Dict[str, bytes]:
+    variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data, quality=11)
+    # A variant that does not save space is not worth the extra file
+    return {suffix: blob for suffix, blob in variants.items() if len(blob) < len(data)}
+
+
+def build_static_assets(source_dir: str, output_dir: str) -> Dict[str, str]:
+    """
+    Publish source_dir into output_dir with hashed asset names and precompressed files.
+
+    Returns:
+        Mapping of original relative path to published relative path
+    """
+    contents = {}
+    for rel_path in _site_files(source_dir):
+        with open(os.path.join(source_dir, *rel_path.split("/")), "rb") as f:
+            contents[rel_path] = f.read()
+
+    manifest = {
+        rel_path: _hashed_name(rel_path, data) if rel_path.endswith(HASHED_EXTENSIONS) else rel_path
+        for rel_path, data in contents.items()
+    }
+
+    def rewrite(html_path: str, html: str) -> str:
+        base = os.path.dirname(html_path)
+
+        def replace(match):
+            target = os.path.normpath(os.path.join(base, match.group("path"))).replace(os.sep, "/")
+            if manifest.get(target, target) == target:
+                return match.group(0)
+            return match.group("attr") + os.path.relpath(manifest[target], base or ".").replace(os.sep, "/")
+
+        return ASSET_REFERENCE.sub(replace, html)
+
+    os.makedirs(output_dir, exist_ok=True)
+    published = set()
+    for rel_path, data in contents.items():
+        if rel_path.endswith(".html"):
+            data = rewrite(rel_path, data.decode("utf-8")).encode("utf-8")
+        out_rel = manifest[rel_path]
+        out_path = os.path.join(output_dir, *out_rel.split("/"))
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        _write_if_changed(out_path, data)
+        published.add(out_rel)
+        if out_rel.endswith(COMPRESSIBLE_EXTENSIONS) and len(data) >= MIN_COMPRESS_SIZE:
+            for suffix, blob in _compressed_variants(data).items():
+                _write_if_changed(out_path + suffix, blob)
+                published.add(out_rel + suffix)
+
+    # Drop assets from earlier builds
+    for rel_path in list(_site_files(output_dir)):
+        if rel_path not in published and not rel_path.endswith(".tmp"):
+            try:
+                os.remove(os.path.join(output_dir, *rel_path.split("/")))
+            except FileNotFoundError:
+                pass
+    return manifest
+
+
+def accepted_encodings(accept_encoding: str) -> Set[str]:
+    """Content codings the client accepts (q=0 excluded)"""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class AssetStaticFiles(StaticFiles):
+    """StaticFiles that serves precompressed variants and sets cache headers"""
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        full_path = os.fspath(full_path)
+        headers = {"Cache-Control": IMMUTABLE if HASHED_NAME.search(full_path) else REVALIDATE}
+        request_headers = Headers(scope=scope)
+        variant = self._variant(full_path, request_headers.get("accept-encoding", ""))
+        if variant is not None:
+            encoding, variant_path, variant_stat = variant
+            headers.update({"Content-Encoding": encoding, "Vary": "Accept-Encoding"})
+            # Content type of the original file, ETag of the variant
+            media_type = mimetypes.guess_type(full_path)[0] or "text/plain"
+            response = FileResponse(variant_path, status_code=status_code, headers=headers,
+                                    media_type=media_type, stat_result=variant_stat)
+        else:
+            if os.path.exists(full_path + ".gz"):
+                headers["Vary"] = "Accept-Encoding"
+            response = FileResponse(full_path, status_code=status_code, headers=headers, stat_result=stat_result)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    @staticmethod
+    def _variant(full_path: str, accept_encoding: str):
+        if not accept_encoding:
+            return None
+        accepted = accepted_encodings(accept_encoding)
+        for encoding, suffix in ENCODINGS:
+            if encoding in accepted:
+                try:
+                    return encoding, full_path + suffix, os.stat(full_path + suffix)
+                except FileNotFoundError:
+                    continue
+        return None
+
+
+class DevStaticFiles(StaticFiles):
+    """StaticFiles that stops browsers caching anything, so edits show up on reload"""
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if isinstance(response, FileResponse):
+            response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
+            response.headers["Pragma"] = "no-cache"
+            response.headers["Expires"] = "0"
+        return response
+
+
+def main(argv: Optional[list] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print(__doc__)
+        sys.exit(2)
+    manifest = build_static_assets(argv[0], argv[1])
+    for original, published in sorted(manifest.items()):
+        if original != published:
+            print(f"{original} -> {published}")
+    print(f"Published {len(manifest)} files to {argv[1]} (brotli {'on' if brotli else 'off'})")
+
+
+if __name__ == "__main__":
+    main()
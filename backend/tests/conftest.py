@@ -3,6 +3,9 @@ import os
 from unittest.mock import Mock, MagicMock
 from dataclasses import dataclass
 
+import hashlib
+
+import numpy as np
 import pytest
 
 # Add backend to path so imports work
@@ -11,6 +14,52 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 from vector_store import SearchResults
 
 
+# ── Real VectorStore with a deterministic offline embedder ─────────
+
+
+class HashEmbedding:
+    """Bag-of-words hashing embedder standing in for the sentence-transformers model."""
+
+    def __init__(self, dim: int = 64):
+        self.dim = dim
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        vectors = []
+        for text in texts:
+            v = np.zeros(self.dim, dtype=np.float32)
+            for word in text.lower().split():
+                v[int(hashlib.md5(word.encode()).hexdigest(), 16) % self.dim] += 1.0
+            norm = np.linalg.norm(v)
+            vectors.append(v / norm if norm else v)
+        return vectors
+
+
+@pytest.fixture
+def hash_embedding():
+    return HashEmbedding()
+
+
+@pytest.fixture
+def make_vector_store(tmp_path, monkeypatch, hash_embedding):
+    """Factory for VectorStores backed by a temporary ChromaDB and the hashing embedder."""
+    import vector_store
+
+    monkeypatch.setattr(vector_store, "create_embedding_function", lambda backend, model: hash_embedding)
+    stores = []
+
+    def factory(embedding_model="test-model", **kwargs):
+        kwargs.setdefault("embedding_batch_window_ms", 0)
+        store = vector_store.VectorStore(str(tmp_path / "chroma"), embedding_model, **kwargs)
+        stores.append(store)
+        return store
+
+    yield factory
+    for store in stores:
+        store.embedding_service.close()
+
+
 # ── Shared mock RAG system fixture ──────────────────────────────────
 
 
@@ -33,6 +82,7 @@ def mock_vector_store():
     store = Mock()
     store.search.return_value = SearchResults(documents=[], metadata=[], distances=[])
     store.get_lesson_link.return_value = None
+    store.get_lesson_links.side_effect = lambda pairs: dict.fromkeys(pairs)
     return store
 
 
@@ -275,6 +275,9 @@ class TestAIGenerator:
 
         # 3 API calls total: initial + 2 rounds in handler
         assert generator.client.messages.create.call_count == 3
+        calls = generator.client.messages.create.call_args_list
+        assert calls[1][1]["tool_choice"] == {"type": "auto"}
+        assert calls[2][1]["tool_choice"] == {"type": "none"}  # Last round forces an answer
         # Text extracted from last response's text block
         assert result == "Still need more info"
 
@@ -305,3 +308,150 @@ class TestAIGenerator:
         assert tool_result["type"] == "tool_result"
         assert "Error executing tool" in tool_result["content"]
         assert "Connection failed" in tool_result["content"]
+
+
+class TestAIGeneratorTransport:
+    def test_calls_go_through_the_transport(self, generator, mock_anthropic_response_text):
+        generator.client.messages.create.return_value = mock_anthropic_response_text
+        generator.transport = Mock(wraps=generator.transport)
+
+        generator.generate_response(query="Hello")
+
+        generator.transport.call.assert_called_once()
+        assert generator.transport.call.call_args[0][0] is generator.client.messages.create
+        assert generator.get_stats()["calls"] == 1
+
+    def test_overloaded_api_raises_unavailable(self, generator):
+        import anthropic
+        import httpx
+        from llm_transport import LLMTransport, LLMUnavailableError
+
+        response = httpx.Response(529, request=httpx.Request("POST", "https://api.anthropic.com"))
+        generator.transport = LLMTransport(max_retries=1, sleep=lambda s: None)
+        generator.client.messages.create.side_effect = anthropic.InternalServerError(
+            "overloaded", response=response, body=None
+        )
+
+        with pytest.raises(LLMUnavailableError):
+            generator.generate_response(query="Hello")
+
+        assert generator.client.messages.create.call_count == 2
+
+
+class TestAdaptiveToolRounds:
+    def test_system_prompt_states_configured_round_limit(self, mock_anthropic_response_text):
+        gen = AIGenerator(api_key="test-key", model="test-model", max_tool_rounds=4)
+        gen.client = Mock()
+        gen.client.messages.create.return_value = mock_anthropic_response_text
+
+        gen.generate_response(query="Q")
+
+        system = gen.client.messages.create.call_args[1]["system"]
+        assert "up to **4 tool calls**" in system
+        assert "{tool_call_limit}" not in system
+
+    def test_zero_round_limit_rejected(self):
+        with pytest.raises(ValueError):
+            AIGenerator(api_key="test-key", model="test-model", max_tool_rounds=0)
+
+    def _final(self, text="Final answer", tokens=None):
+        response = Mock()
+        response.stop_reason = "end_turn"
+        response.content = [Mock(type="text", text=text)]
+        if tokens is not None:
+            response.usage = Mock(input_tokens=tokens, output_tokens=0)
+        return response
+
+    def test_close_search_match_forces_an_answer(
+        self, generator, tool_definitions, mock_anthropic_response_tool_use
+    ):
+        generator.early_stop_distance = 0.8
+        generator.client.messages.create.side_effect = [mock_anthropic_response_tool_use, self._final()]
+        tool_manager = Mock()
+        tool_manager.execute_tool.return_value = "results"
+        tool_manager.get_best_distance.return_value = 0.3
+
+        result = generator.generate_response(query="Q", tools=tool_definitions, tool_manager=tool_manager)
+
+        assert result == "Final answer"
+        followup = generator.client.messages.create.call_args_list[1][1]
+        assert followup["tool_choice"] == {"type": "none"}
+        assert generator.get_stats()["rounds"]["early_stop"] == 1
+
+    def test_distant_match_keeps_tools_available(
+        self, generator, tool_definitions, mock_anthropic_response_tool_use
+    ):
+        generator.early_stop_distance = 0.8
+        generator.client.messages.create.side_effect = [mock_anthropic_response_tool_use, self._final()]
+        tool_manager = Mock()
+        tool_manager.execute_tool.return_value = "results"
+        tool_manager.get_best_distance.return_value = 1.4
+
+        generator.generate_response(query="Q", tools=tool_definitions, tool_manager=tool_manager)
+
+        assert generator.client.messages.create.call_args_list[1][1]["tool_choice"] == {"type": "auto"}
+
+    def test_token_budget_stops_further_rounds(
+        self, generator, tool_definitions, mock_anthropic_response_tool_use
+    ):
+        generator.token_budget = 1000
+        mock_anthropic_response_tool_use.usage = Mock(input_tokens=900, output_tokens=150)
+        generator.client.messages.create.side_effect = [mock_anthropic_response_tool_use, self._final(tokens=500)]
+        tool_manager = Mock()
+        tool_manager.execute_tool.return_value = "results"
+
+        generator.generate_response(query="Q", tools=tool_definitions, tool_manager=tool_manager)
+
+        assert generator.client.messages.create.call_args_list[1][1]["tool_choice"] == {"type": "none"}
+        rounds = generator.get_stats()["rounds"]
+        assert rounds["token_budget"] == 1 and rounds["tokens"] == 1550
+
+    def test_latency_budget_stops_further_rounds(
+        self, generator, tool_definitions, mock_anthropic_response_tool_use
+    ):
+        generator.latency_budget = 1e-9
+        generator.client.messages.create.side_effect = [mock_anthropic_response_tool_use, self._final()]
+        tool_manager = Mock()
+        tool_manager.execute_tool.return_value = "results"
+
+        generator.generate_response(query="Q", tools=tool_definitions, tool_manager=tool_manager)
+
+        assert generator.get_stats()["rounds"]["latency_budget"] == 1
+
+    def test_earlier_tool_results_are_compacted(
+        self, generator, tool_definitions, mock_anthropic_response_tool_use,
+        mock_anthropic_response_tool_use_outline
+    ):
+        generator.compact_chars = 10
+        generator.client.messages.create.side_effect = [
+            mock_anthropic_response_tool_use,
+            mock_anthropic_response_tool_use_outline,
+            self._final(),
+        ]
+        tool_manager = Mock()
+        tool_manager.execute_tool.side_effect = ["A" * 50, "B" * 50]
+
+        generator.generate_response(query="Q", tools=tool_definitions, tool_manager=tool_manager)
+
+        third_messages = generator.client.messages.create.call_args_list[2][1]["messages"]
+        assert third_messages[2]["content"][0]["content"].startswith("A" * 10 + "\n[...")
+        assert third_messages[4]["content"][0]["content"] == "B" * 50  # Latest round kept whole
+
+    def test_round_counts_in_stats(
+        self, generator, tool_definitions, mock_anthropic_response_tool_use,
+        mock_anthropic_response_tool_use_outline
+    ):
+        generator.client.messages.create.side_effect = [
+            mock_anthropic_response_tool_use,
+            mock_anthropic_response_tool_use_outline,
+            mock_anthropic_response_tool_use,
+        ]
+        tool_manager = Mock()
+        tool_manager.execute_tool.return_value = "results"
+
+        generator.generate_response(query="Q", tools=tool_definitions, tool_manager=tool_manager)
+
+        rounds = generator.get_stats()["rounds"]
+        assert rounds["tool_responses"] == 1 and rounds["tool_rounds"] == 2
+        assert rounds["rounds_histogram"] == {2: 1}
+        assert rounds["max_rounds"] == 1 and rounds["avg_rounds"] == 2.0
@@ -5,14 +5,23 @@ Defines API routes inline using a test app to avoid import issues
 with static file mounts that reference non-existent directories.
 """
 
+import os
+import sys
 from unittest.mock import Mock, patch, MagicMock
 
 import pytest
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, UploadFile, File
 from fastapi.testclient import TestClient
 from pydantic import BaseModel
 from typing import List, Optional
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from document_extractors import SUPPORTED_EXTENSIONS
+from ingestion_queue import IngestionJob, QueueFullError
+
+MAX_UPLOAD_BYTES = 1024
+
 
 # ── Test app (mirrors backend/app.py routes without static file mount) ──
 
@@ -20,6 +29,7 @@ from typing import List, Optional
 class QueryRequest(BaseModel):
     query: str
     session_id: Optional[str] = None
+    retrieval_only: bool = False
 
 
 class QueryResponse(BaseModel):
@@ -33,7 +43,7 @@ class CourseStats(BaseModel):
     course_titles: List[str]
 
 
-def create_test_app(mock_rag_system):
+def create_test_app(mock_rag_system, ingestion_queue):
     """Build a minimal FastAPI app with the same endpoints as app.py."""
     app = FastAPI()
 
@@ -43,7 +53,9 @@ def create_test_app(mock_rag_system):
             session_id = request.session_id
             if not session_id:
                 session_id = mock_rag_system.session_manager.create_session()
-            answer, sources = mock_rag_system.query(request.query, session_id)
+            answer, sources = mock_rag_system.query(
+                request.query, session_id, retrieval_only=request.retrieval_only
+            )
             return QueryResponse(answer=answer, sources=sources, session_id=session_id)
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
@@ -59,6 +71,42 @@ def create_test_app(mock_rag_system):
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
+    @app.get("/api/metrics")
+    async def get_metrics():
+        try:
+            return {**mock_rag_system.get_metrics(), "ingestion": ingestion_queue.get_stats()}
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    @app.post("/api/documents", response_model=IngestionJob, status_code=202)
+    async def upload_document(file: UploadFile = File(...)):
+        filename = os.path.basename(file.filename or "")
+        if not filename.lower().endswith(SUPPORTED_EXTENSIONS):
+            raise HTTPException(status_code=400, detail="Unsupported file type")
+        data = await file.read(MAX_UPLOAD_BYTES + 1)
+        if len(data) > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="File too large")
+        try:
+            return ingestion_queue.submit(filename, data)
+        except QueueFullError as e:
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    @app.get("/api/documents/jobs", response_model=List[IngestionJob])
+    async def list_ingestion_jobs(limit: int = 50):
+        try:
+            return ingestion_queue.list_jobs(limit)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    @app.get("/api/documents/jobs/{job_id}", response_model=IngestionJob)
+    async def get_ingestion_job(job_id: str):
+        job = ingestion_queue.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+        return job
+
     return app
 
 
@@ -75,13 +123,27 @@ def mock_rag():
         "total_courses": 3,
         "course_titles": ["Intro to APIs", "MCP Course", "Python Basics"],
     }
+    rag.get_metrics.return_value = {"embedding": {"queue_depth": 0, "batches": 4}}
     return rag
 
 
 @pytest.fixture
-def client(mock_rag):
+def mock_queue():
+    """Mock IngestionQueue that accepts every upload."""
+    queue = Mock()
+    queue.submit.side_effect = lambda filename, data: IngestionJob(
+        id="job_1", filename=filename, status="queued", created_at=1.0
+    )
+    queue.get.return_value = None
+    queue.list_jobs.return_value = []
+    queue.get_stats.return_value = {"queued": 0, "running": 0, "done": 0, "failed": 0, "max_pending": 16}
+    return queue
+
+
+@pytest.fixture
+def client(mock_rag, mock_queue):
     """TestClient wired to the test app."""
-    app = create_test_app(mock_rag)
+    app = create_test_app(mock_rag, mock_queue)
     return TestClient(app)
 
 
@@ -123,7 +185,11 @@ class TestQueryEndpoint:
 
     def test_query_passes_query_to_rag(self, client, mock_rag):
         client.post("/api/query", json={"query": "Tell me about MCP"})
-        mock_rag.query.assert_called_once_with("Tell me about MCP", "session_1")
+        mock_rag.query.assert_called_once_with("Tell me about MCP", "session_1", retrieval_only=False)
+
+    def test_query_retrieval_only_flag(self, client, mock_rag):
+        client.post("/api/query", json={"query": "Tell me about MCP", "retrieval_only": True})
+        mock_rag.query.assert_called_once_with("Tell me about MCP", "session_1", retrieval_only=True)
 
     def test_query_missing_body_returns_422(self, client):
         resp = client.post("/api/query", json={})
@@ -176,6 +242,86 @@ class TestCoursesEndpoint:
         assert resp.status_code == 405
 
 
+# ── /api/metrics tests ──────────────────────────────────────────────
+
+
+class TestMetricsEndpoint:
+    def test_metrics_returns_200(self, client):
+        resp = client.get("/api/metrics")
+        assert resp.status_code == 200
+
+    def test_metrics_returns_embedding_stats(self, client):
+        data = client.get("/api/metrics").json()
+        assert data["embedding"]["batches"] == 4
+
+    def test_metrics_error_returns_500(self, client, mock_rag):
+        mock_rag.get_metrics.side_effect = RuntimeError("boom")
+        resp = client.get("/api/metrics")
+        assert resp.status_code == 500
+
+
+# ── /api/documents tests ───────────────────────────────────────────
+
+
+class TestDocumentsEndpoint:
+    def test_upload_returns_202_with_job(self, client, mock_queue):
+        resp = client.post("/api/documents", files={"file": ("course.txt", b"Course Title: X", "text/plain")})
+
+        assert resp.status_code == 202
+        assert resp.json()["id"] == "job_1"
+        assert resp.json()["status"] == "queued"
+        mock_queue.submit.assert_called_once_with("course.txt", b"Course Title: X")
+
+    def test_upload_unsupported_type_returns_400(self, client, mock_queue):
+        resp = client.post("/api/documents", files={"file": ("notes.odt", b"x", "application/octet-stream")})
+
+        assert resp.status_code == 400
+        mock_queue.submit.assert_not_called()
+
+    def test_upload_too_large_returns_413(self, client, mock_queue):
+        resp = client.post("/api/documents", files={"file": ("course.txt", b"x" * 2048, "text/plain")})
+
+        assert resp.status_code == 413
+        mock_queue.submit.assert_not_called()
+
+    def test_full_queue_returns_429_with_retry_after(self, client, mock_queue):
+        mock_queue.submit.side_effect = QueueFullError("Ingestion queue is full")
+
+        resp = client.post("/api/documents", files={"file": ("course.txt", b"x", "text/plain")})
+
+        assert resp.status_code == 429
+        assert resp.headers["retry-after"] == "30"
+
+    def test_upload_without_file_returns_422(self, client):
+        assert client.post("/api/documents").status_code == 422
+
+    def test_job_status(self, client, mock_queue):
+        mock_queue.get.return_value = IngestionJob(
+            id="job_1", filename="course.txt", status="done", created_at=1.0, chunks=7
+        )
+
+        data = client.get("/api/documents/jobs/job_1").json()
+
+        assert (data["status"], data["chunks"]) == ("done", 7)
+
+    def test_unknown_job_returns_404(self, client):
+        assert client.get("/api/documents/jobs/missing").status_code == 404
+
+    def test_list_jobs(self, client, mock_queue):
+        mock_queue.list_jobs.return_value = [
+            IngestionJob(id="job_1", filename="a.txt", status="queued", created_at=1.0)
+        ]
+
+        data = client.get("/api/documents/jobs?limit=5").json()
+
+        assert [job["id"] for job in data] == ["job_1"]
+        mock_queue.list_jobs.assert_called_once_with(5)
+
+    def test_metrics_include_ingestion(self, client):
+        data = client.get("/api/metrics").json()
+        assert data["ingestion"]["max_pending"] == 16
+
+
 # ── / (root) tests ─────────────────────────────────────────────────
 
 
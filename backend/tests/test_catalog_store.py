@@ -0,0 +1,73 @@
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import catalog_store
+from catalog_store import CourseCatalog
+from models import Course, Lesson
+
+
+def course(title, lessons=3, **kwargs):
+    return Course(title=title, lessons=[
+        Lesson(lesson_number=n, title=f"{title} lesson {n}", lesson_link=f"https://example.com/{title}/{n}")
+        for n in range(lessons)
+    ], **kwargs)
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = CourseCatalog(str(tmp_path / "catalog.sqlite3"))
+    catalog.upsert_course(course("A", instructor="Ada", course_link="https://example.com/A"))
+    catalog.upsert_course(course("B", lessons=2))
+    yield catalog
+    catalog.close()
+
+
+class TestCourseCatalog:
+    def test_courses_with_ordered_lessons(self, catalog):
+        a = catalog.get_course("A")
+
+        assert a["instructor"] == "Ada" and a["lesson_count"] == 3
+        assert [l["lesson_number"] for l in a["lessons"]] == [0, 1, 2]
+        assert a["lessons"][1] == {"lesson_number": 1, "lesson_title": "A lesson 1",
+                                   "lesson_link": "https://example.com/A/1"}
+        assert "instructor" not in catalog.get_course("B")  # Unset fields are omitted
+        assert catalog.get_course("missing") is None
+        assert [c["title"] for c in catalog.get_courses()] == ["A", "B"]
+
+    def test_upsert_replaces_lessons(self, catalog):
+        catalog.upsert_course(course("A", lessons=1))
+
+        assert len(catalog.get_course("A")["lessons"]) == 1
+        assert catalog.get_lesson_links([("A", 2)]) == {("A", 2): None}
+
+    def test_batched_lesson_links(self, catalog, monkeypatch):
+        monkeypatch.setattr(catalog_store, "LOOKUP_BATCH", 2)
+        pairs = [("A", 0), ("B", 1), ("A", 0), ("A", 9), ("C", 0), ("A", 2)]
+
+        links = catalog.get_lesson_links(pairs)
+
+        assert links == {
+            ("A", 0): "https://example.com/A/0",
+            ("B", 1): "https://example.com/B/1",
+            ("A", 9): None,
+            ("C", 0): None,
+            ("A", 2): "https://example.com/A/2",
+        }
+
+    def test_delete_and_clear(self, catalog):
+        catalog.delete_course("A")
+
+        assert catalog.get_titles() == ["B"]
+        assert catalog.get_lesson_links([("A", 0)]) == {("A", 0): None}
+        catalog.clear()
+        assert catalog.count() == 0
+
+    def test_persists_across_reopen(self, catalog):
+        reopened = CourseCatalog(catalog.path)
+
+        assert reopened.get_course_link("A") == "https://example.com/A"
+        reopened.close()
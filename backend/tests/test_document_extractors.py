@@ -0,0 +1,199 @@
+import sys
+import os
+import threading
+import time
+import zipfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from document_extractors import (
+    ExtractedDocument,
+    ExtractorPool,
+    extract_docx,
+    extract_document,
+    needs_extraction,
+)
+from document_processor import DocumentProcessor
+
+
+def write_docx(path, paragraphs):
+    """Minimal DOCX: a zip with word/document.xml holding (style, text) paragraphs"""
+    body = []
+    for style, text in paragraphs:
+        style_xml = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+        runs = "<w:br/>".join(f"<w:r><w:t>{part}</w:t></w:r>" for part in text.split("\n"))
+        body.append(f"<w:p>{style_xml}{runs}</w:p>")
+    xml = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{''.join(body)}</w:body></w:document>"
+    )
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("word/document.xml", xml)
+    return str(path)
+
+
+def slow_extract(file_path):
+    """Stands in for a pathological file; runs in a worker process"""
+    time.sleep(30)
+
+
+def slow_or_extract(file_path):
+    """Hangs on files named slow*, takes a second on busy*, extracts the rest"""
+    name = os.path.basename(file_path)
+    if name.startswith("slow"):
+        slow_extract(file_path)
+    if name.startswith("busy"):
+        time.sleep(1)
+    return extract_document(file_path)
+
+
+class TestExtractedDocument:
+    def test_locate_uses_last_location_at_or_before_line(self):
+        document = ExtractedDocument(lines=["a"] * 10, locations=[(0, 1, None), (4, 2, None), (7, 3, None)])
+
+        assert document.locate(0) == (1, None)
+        assert document.locate(6) == (2, None)
+        assert document.locate(7) == (3, None)
+
+    def test_locate_before_first_location(self):
+        document = ExtractedDocument(lines=["a"] * 3, locations=[(2, None, "Intro")])
+
+        assert document.locate(1) == (None, None)
+        assert document.locate(2) == (None, "Intro")
+
+
+class TestDocxExtraction:
+    def test_paragraphs_and_heading_sections(self, tmp_path):
+        path = write_docx(tmp_path / "course.docx", [
+            ("Title", "Course Title: Docx Course"),
+            (None, "Course Link: https://example.com"),
+            (None, "Course Instructor: Someone"),
+            ("Heading1", "Getting started"),
+            (None, "First line\nSecond line"),
+        ])
+
+        document = extract_docx(path)
+
+        assert document.lines == [
+            "Course Title: Docx Course", "Course Link: https://example.com",
+            "Course Instructor: Someone", "Getting started", "First line", "Second line",
+        ]
+        assert document.locations == [(0, None, "Course Title: Docx Course"), (3, None, "Getting started")]
+
+    def test_chunks_carry_sections(self, tmp_path):
+        path = write_docx(tmp_path / "course.docx", [
+            (None, "Course Title: Docx Course"),
+            (None, "Course Link: https://example.com"),
+            (None, "Course Instructor: Someone"),
+            (None, ""),
+            (None, "Lesson 1: Basics"),
+            ("Heading2", "Servers"),
+            (None, "Servers expose tools."),
+            ("Heading2", "Clients"),
+            (None, "Clients call tools."),
+        ])
+        processor = DocumentProcessor(chunk_size=25, chunk_overlap=0)
+
+        course, chunks = processor.stream_extracted_document(extract_document(path), path)
+        chunks = list(chunks)
+
+        assert course.title == "Docx Course"
+        assert [(c.content.split(": ", 1)[1], c.section) for c in chunks] == [
+            ("Servers Servers expose", "Servers"),
+            ("tools.", "Servers"),
+            ("Clients Clients call", "Clients"),
+            ("tools.", "Clients"),
+        ]
+
+
+class TestPdfExtraction:
+    def test_pages_are_recorded(self, tmp_path):
+        pypdf = pytest.importorskip("pypdf")
+        from pypdf.generic import NameObject, DecodedStreamObject, DictionaryObject
+
+        writer = pypdf.PdfWriter()
+        font = DictionaryObject({
+            NameObject("/Type"): NameObject("/Font"),
+            NameObject("/Subtype"): NameObject("/Type1"),
+            NameObject("/BaseFont"): NameObject("/Helvetica"),
+        })
+        for text in ("Course Title: Pdf Course", "Page two text."):
+            page = writer.add_blank_page(612, 792)
+            page[NameObject("/Resources")] = DictionaryObject({
+                NameObject("/Font"): DictionaryObject({NameObject("/F1"): writer._add_object(font)})
+            })
+            stream = DecodedStreamObject()
+            stream.set_data(f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode())
+            page[NameObject("/Contents")] = writer._add_object(stream)
+        path = tmp_path / "course.pdf"
+        with open(path, "wb") as f:
+            writer.write(f)
+
+        document = extract_document(str(path))
+
+        assert [page for _, page, _ in document.locations] == [1, 2]
+        assert "Page two text." in document.lines[document.locations[1][0]:]
+
+
+class TestExtractorPool:
+    def test_needs_extraction(self):
+        assert needs_extraction("a/b.PDF")
+        assert needs_extraction("b.docx")
+        assert not needs_extraction("b.txt")
+
+    def test_extracts_in_worker_process(self, tmp_path):
+        path = write_docx(tmp_path / "course.docx", [(None, "Hello")])
+        pool = ExtractorPool(max_workers=1, timeout=60)
+        try:
+            assert pool.extract(path).lines == ["Hello"]
+        finally:
+            pool.close()
+
+    def test_timeout_terminates_worker_and_recovers(self, tmp_path):
+        path = write_docx(tmp_path / "course.docx", [(None, "Hello")])
+        pool = ExtractorPool(max_workers=1, timeout=0.5, extractor=slow_extract)
+        try:
+            with pytest.raises(TimeoutError):
+                pool.extract(path)
+
+            pool.extractor = extract_document
+            pool.timeout = 60
+            assert pool.extract(path).lines == ["Hello"]
+        finally:
+            pool.close()
+
+    def test_timeout_does_not_fail_files_in_flight(self, tmp_path):
+        slow = write_docx(tmp_path / "slow.docx", [(None, "Never")])
+        fast = write_docx(tmp_path / "busy.docx", [(None, "Hello")])
+        pool = ExtractorPool(max_workers=2, timeout=5, extractor=slow_or_extract)
+        try:
+            pool.extract(fast)  # Start the workers before timing anything
+            results = {}
+
+            def run(name, path):
+                try:
+                    results[name] = pool.extract(path).lines
+                except TimeoutError as e:
+                    results[name] = e
+
+            pool.timeout = 2
+            slow_thread = threading.Thread(target=run, args=("slow", slow))
+            slow_thread.start()
+            time.sleep(1.5)
+            # Still running when the slow file times out and its pool is terminated
+            fast_thread = threading.Thread(target=run, args=("fast", fast))
+            fast_thread.start()
+            slow_thread.join()
+            fast_thread.join()
+
+            assert isinstance(results["slow"], TimeoutError)
+            assert results["fast"] == ["Hello"]
+        finally:
+            pool.close()
+
+    def test_unsupported_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            extract_document(str(tmp_path / "notes.odt"))
@@ -0,0 +1,212 @@
+import sys
+import os
+import random
+import re
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.bench_chunker import legacy_chunk_text
+from document_processor import DocumentProcessor
+
+
+COURSE_DOC = """Course Title: Building MCP Servers
+Course Link: https://example.com/mcp
+Course Instructor: Ada Lovelace
+
+Lesson 0: Introduction
+Lesson Link: https://example.com/mcp/0
+Welcome to the course. We will build servers.
+
+Lesson 1: Tools
+Lesson Link: https://example.com/mcp/1
+Tools let a model call functions. They are declared with a schema.
+
+Lesson 2: Resources
+Resources expose data. Clients read them.
+"""
+
+
+@pytest.fixture
+def processor():
+    return DocumentProcessor(chunk_size=800, chunk_overlap=100)
+
+
+@pytest.fixture
+def course_file(tmp_path):
+    path = tmp_path / "course.txt"
+    path.write_text(COURSE_DOC, encoding="utf-8")
+    return str(path)
+
+
+LEGACY_SENTENCES = re.compile(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\!|\?)\s+(?=[A-Z])')
+
+
+def random_text(rng, max_sentence_words):
+    """Sentences with abbreviations, decimals and mixed whitespace between and inside them"""
+    words = ["data", "Mr.", "e.g.", "U.S.", "3.5", "Dr.", "tool", "MCP", "server", "i.e.", "x"]
+    sentences = []
+    for _ in range(rng.randint(0, 40)):
+        body = [rng.choice(words) for _ in range(rng.randint(1, max_sentence_words))]
+        sentences.append(rng.choice(["The", "A", "Then", "so"]) + " " + " ".join(body) + rng.choice(".!?"))
+    separators = [" ", "  ", "\n", "\n\n", "\t "]
+    text = "".join(sentence + rng.choice(separators) for sentence in sentences)
+    return rng.choice(["", " ", "\n "]) + text
+
+
+class TestChunkText:
+    @pytest.mark.parametrize("chunk_size,chunk_overlap", [(800, 100), (200, 0), (120, 60), (100, 95), (60, 200)])
+    def test_matches_legacy_chunker(self, chunk_size, chunk_overlap):
+        processor = DocumentProcessor(chunk_size, chunk_overlap)
+        rng = random.Random(chunk_size * 1000 + chunk_overlap)
+
+        compared = 0
+        while compared < 200:
+            text = random_text(rng, max_sentence_words=max(1, chunk_size // 20))
+            # Only inputs where every sentence fits in a chunk; oversized ones are now split
+            if any(len(sentence) > chunk_size for sentence in LEGACY_SENTENCES.split(" ".join(text.split()))):
+                continue
+
+            assert processor.chunk_text(text) == legacy_chunk_text(text, chunk_size, chunk_overlap)
+            compared += 1
+
+    def test_offsets_slice_the_original_text(self):
+        processor = DocumentProcessor(120, 40)
+        rng = random.Random(7)
+
+        for _ in range(200):
+            text = random_text(rng, max_sentence_words=5)
+            for chunk, start, end in processor.chunk_text_with_offsets(text):
+                assert " ".join(text[start:end].split()) == chunk
+                assert text[start] == chunk[0] and text[end - 1] == chunk[-1]
+
+    def test_oversized_sentence_is_split_at_word_boundaries(self):
+        processor = DocumentProcessor(chunk_size=50, chunk_overlap=0)
+        sentence = " ".join(["word"] * 40) + "."
+
+        chunks = processor.chunk_text(sentence)
+
+        assert len(chunks) > 1
+        assert all(len(chunk) <= 50 for chunk in chunks)
+        assert " ".join(chunks) == sentence
+
+    def test_oversized_word_is_hard_split(self):
+        processor = DocumentProcessor(chunk_size=10, chunk_overlap=0)
+
+        chunks = processor.chunk_text("A" * 25)
+
+        assert chunks == ["A" * 10, "A" * 10, "A" * 5]
+
+    def test_empty_text(self):
+        assert DocumentProcessor(100, 10).chunk_text_with_offsets(" \n ") == []
+
+
+class TestProcessCourseDocument:
+    def test_parses_header(self, processor, course_file):
+        course, _ = processor.process_course_document(course_file)
+
+        assert course.title == "Building MCP Servers"
+        assert course.course_link == "https://example.com/mcp"
+        assert course.instructor == "Ada Lovelace"
+
+    def test_parses_lessons_and_links(self, processor, course_file):
+        course, _ = processor.process_course_document(course_file)
+
+        assert [lesson.lesson_number for lesson in course.lessons] == [0, 1, 2]
+        assert course.lessons[1].title == "Tools"
+        assert course.lessons[1].lesson_link == "https://example.com/mcp/1"
+        assert course.lessons[2].lesson_link is None
+
+    def test_chunks_carry_lesson_and_index(self, processor, course_file):
+        _, chunks = processor.process_course_document(course_file)
+
+        assert sorted({c.lesson_number for c in chunks}) == [0, 1, 2]
+        assert [c.chunk_index for c in chunks] == list(range(len(chunks)))
+        assert all("Lesson Link" not in c.content for c in chunks)
+
+    def test_every_lesson_chunk_has_course_and_lesson_prefix(self, tmp_path):
+        processor = DocumentProcessor(chunk_size=40, chunk_overlap=0)
+        path = tmp_path / "course.txt"
+        path.write_text(
+            "Course Title: Prefixes\nCourse Link: https://x\nCourse Instructor: Someone\n\n"
+            "Lesson 1: First\nOne sentence here. Another sentence here. A third one.\n"
+            "Lesson 2: Last\nMore words here. And some more words.\n",
+            encoding="utf-8",
+        )
+
+        _, chunks = processor.process_course_document(str(path))
+
+        assert len([c for c in chunks if c.lesson_number == 1]) > 1
+        for chunk in chunks:
+            assert chunk.content.startswith(f"Course Prefixes Lesson {chunk.lesson_number} content: ")
+
+    def test_header_and_markers_are_case_insensitive(self, processor, tmp_path):
+        path = tmp_path / "course.txt"
+        path.write_text(
+            "course title: Lower\nCOURSE LINK: https://x\ncourse instructor: Someone\n\n"
+            "LESSON 3: Shouting\nlesson link: https://x/3\nContent.\n",
+            encoding="utf-8",
+        )
+
+        course, chunks = processor.process_course_document(str(path))
+
+        assert (course.title, course.course_link, course.instructor) == ("Lower", "https://x", "Someone")
+        assert course.lessons[0].lesson_number == 3
+        assert course.lessons[0].lesson_link == "https://x/3"
+        assert chunks[0].content.endswith("Content.")
+
+    def test_chunks_record_offsets_within_lesson(self, processor, course_file):
+        _, chunks = processor.process_course_document(course_file)
+
+        lesson_one = "Tools let a model call functions. They are declared with a schema."
+        chunk = next(c for c in chunks if c.lesson_number == 1)
+        assert (chunk.start_char, chunk.end_char) == (0, len(lesson_one))
+
+    def test_document_without_lessons(self, processor, tmp_path):
+        path = tmp_path / "plain.txt"
+        path.write_text("Plain Title\nCourse Link: x\nCourse Instructor: y\n\nJust text. More text.", encoding="utf-8")
+
+        course, chunks = processor.process_course_document(str(path))
+
+        assert course.lessons == []
+        assert chunks
+        assert all(c.lesson_number is None for c in chunks)
+        assert chunks[0].content == "Just text. More text."
+
+
+class TestStreamCourseDocument:
+    def test_header_available_before_body_is_read(self, processor, course_file):
+        course, chunks = processor.stream_course_document(course_file)
+
+        assert course.title == "Building MCP Servers"
+        assert course.lessons == []  # nothing consumed yet
+
+    def test_lessons_close_as_chunks_are_consumed(self, processor, course_file):
+        course, chunks = processor.stream_course_document(course_file)
+
+        first = next(chunks)
+
+        assert first.lesson_number == 0
+        assert [lesson.lesson_number for lesson in course.lessons] == [0]
+        rest = list(chunks)
+        assert [lesson.lesson_number for lesson in course.lessons] == [0, 1, 2]
+        assert {c.lesson_number for c in rest} == {0, 1, 2}
+
+    def test_matches_eager_processing(self, processor, course_file):
+        course, chunks = processor.stream_course_document(course_file)
+        streamed = list(chunks)
+
+        eager_course, eager_chunks = processor.process_course_document(course_file)
+
+        assert course == eager_course
+        assert streamed == eager_chunks
+
+    def test_undecodable_bytes_are_dropped(self, processor, tmp_path):
+        path = tmp_path / "bad.txt"
+        path.write_bytes(b"Course Title: Caf\xff\nx\ny\n\nLesson 1: A\nHello.\n")
+
+        course, chunks = processor.process_course_document(str(path))
+
+        assert course.title == "Caf"
+        assert {c.lesson_number for c in chunks} == {1}
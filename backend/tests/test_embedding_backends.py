@@ -0,0 +1,76 @@
+import sys
+import os
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from embedding_backends import (
+    ONNX,
+    ONNX_INT8,
+    SENTENCE_TRANSFORMERS,
+    create_embedding_function,
+)
+
+
+PARITY_SENTENCES = [
+    "What is the Model Context Protocol?",
+    "Lesson 2 covers building an MCP server with FastMCP.",
+    "Retrieval-augmented generation combines search with a language model.",
+    "Chroma stores embeddings alongside metadata for filtering.",
+    "short",
+]
+
+
+def _load_or_skip(backend):
+    """Build an embedding backend, skipping when its model cannot be loaded offline."""
+    try:
+        fn = create_embedding_function(backend, "all-MiniLM-L6-v2")
+        fn(["warm up"])
+    except Exception as e:
+        pytest.skip(f"{backend} model unavailable: {e}")
+    return fn
+
+
+def _cosine_rows(a, b):
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    return (a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+
+
+class TestCreateEmbeddingFunction:
+    def test_unknown_backend_raises(self):
+        with pytest.raises(ValueError, match="Unknown embedding backend"):
+            create_embedding_function("tensorflow", "all-MiniLM-L6-v2")
+
+    @pytest.mark.parametrize("backend", [ONNX, ONNX_INT8])
+    def test_onnx_rejects_other_models(self, backend):
+        with pytest.raises(ValueError, match="only supports"):
+            create_embedding_function(backend, "all-mpnet-base-v2")
+
+    @pytest.mark.parametrize("backend", [ONNX, ONNX_INT8])
+    def test_onnx_accepts_namespaced_model_name(self, backend):
+        fn = create_embedding_function(backend, "sentence-transformers/all-MiniLM-L6-v2")
+        assert fn.quantized == (backend == ONNX_INT8)
+
+
+class TestEmbeddingParity:
+    """Embeddings from the ONNX backends must match the PyTorch reference model."""
+
+    @pytest.mark.parametrize("backend,threshold", [(ONNX, 0.999), (ONNX_INT8, 0.97)])
+    def test_cosine_similarity_to_reference(self, backend, threshold):
+        reference = _load_or_skip(SENTENCE_TRANSFORMERS)
+        candidate = _load_or_skip(backend)
+
+        similarity = _cosine_rows(reference(PARITY_SENTENCES), candidate(PARITY_SENTENCES))
+
+        assert similarity.min() >= threshold
+
+    def test_batch_padding_does_not_change_embeddings(self):
+        candidate = _load_or_skip(ONNX)
+
+        batched = candidate(PARITY_SENTENCES)
+        single = [candidate([s])[0] for s in PARITY_SENTENCES]
+
+        assert _cosine_rows(batched, single).min() >= 0.9999
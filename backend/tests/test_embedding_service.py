@@ -0,0 +1,156 @@
+import sys
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from embedding_service import EmbeddingService
+
+
+class RecordingEncoder:
+    """Fake encoder that records the size of every batch it receives."""
+
+    def __init__(self):
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def __call__(self, texts):
+        with self.lock:
+            self.batches.append(list(texts))
+        return [[float(len(t))] for t in texts]
+
+
+@pytest.fixture
+def encoder():
+    return RecordingEncoder()
+
+
+class TestEmbeddingService:
+    def test_embed_returns_vectors_in_order(self, encoder):
+        service = EmbeddingService(encoder, max_batch_size=32, max_wait_ms=1)
+        try:
+            result = service.embed(["a", "bbb", "cc"])
+        finally:
+            service.close()
+
+        assert result == [[1.0], [3.0], [2.0]]
+
+    def test_empty_request_resolves_immediately(self, encoder):
+        service = EmbeddingService(encoder)
+        try:
+            assert service.embed([]) == []
+        finally:
+            service.close()
+
+        assert encoder.batches == []
+
+    def test_concurrent_requests_are_coalesced(self, encoder):
+        service = EmbeddingService(encoder, max_batch_size=64, max_wait_ms=50)
+        texts = [f"text {i}" * (i + 1) for i in range(16)]
+        try:
+            with ThreadPoolExecutor(max_workers=16) as pool:
+                results = list(pool.map(lambda t: service.embed([t]), texts))
+        finally:
+            service.close()
+
+        # Each caller gets its own embedding back
+        assert results == [[[float(len(t))]] for t in texts]
+        # ...but the encoder saw fewer forward passes than requests
+        assert len(encoder.batches) < len(texts)
+
+    def test_batch_size_caps_coalescing(self, encoder):
+        service = EmbeddingService(encoder, max_batch_size=4, max_wait_ms=50)
+        try:
+            futures = [service.submit([f"t{i}"]) for i in range(10)]
+            for f in futures:
+                f.result(timeout=5)
+        finally:
+            service.close()
+
+        assert max(len(b) for b in encoder.batches) <= 4
+
+    def test_encoder_error_propagates_to_callers(self):
+        def failing(texts):
+            raise RuntimeError("model crashed")
+
+        service = EmbeddingService(failing, max_wait_ms=1)
+        try:
+            with pytest.raises(RuntimeError, match="model crashed"):
+                service.embed(["x"])
+            assert service.get_stats()["errors"] == 1
+        finally:
+            service.close()
+
+    def test_stats(self, encoder):
+        service = EmbeddingService(encoder, max_batch_size=32, max_wait_ms=1)
+        try:
+            service.embed(["a", "b"])
+            service.embed(["c"])
+            stats = service.get_stats()
+        finally:
+            service.close()
+
+        assert stats["requests"] == 2
+        assert stats["texts"] == 3
+        assert stats["batches"] >= 1
+        assert stats["queue_depth"] == 0
+        assert stats["avg_batch_size"] > 0
+
+
+class TestBackgroundPriority:
+    def test_background_request_is_split_into_slices(self, encoder):
+        service = EmbeddingService(encoder, max_batch_size=4, max_wait_ms=0)
+        texts = [f"t{i}" * (i + 1) for i in range(10)]
+        try:
+            result = service.embed(texts, background=True)
+        finally:
+            service.close()
+
+        assert result == [[float(len(t))] for t in texts]
+        assert [len(batch) for batch in encoder.batches] == [4, 4, 2]
+
+    def test_foreground_requests_jump_ahead_of_background_slices(self):
+        release = threading.Event()
+        started = threading.Event()
+        batches = []
+
+        def encode(texts):
+            batches.append(list(texts))
+            if len(batches) == 1:
+                started.set()
+                release.wait(5)  # Hold the worker on the first background slice
+            return [[0.0] for _ in texts]
+
+        service = EmbeddingService(encode, max_batch_size=2, max_wait_ms=0)
+        try:
+            background = service.submit(["b1", "b2", "b3", "b4", "b5", "b6"], background=True)
+            assert started.wait(5)
+            query = service.submit(["query"])
+            release.set()
+            query.result(timeout=5)
+            background.result(timeout=5)
+        finally:
+            service.close()
+
+        # The query runs right after the slice in progress, before the remaining slices
+        assert batches[1] == ["query"]
+        assert service.get_stats()["background_requests"] == 1
+
+    def test_background_slice_error_fails_whole_request(self):
+        calls = []
+
+        def encode(texts):
+            calls.append(texts)
+            if len(calls) == 2:
+                raise RuntimeError("model crashed")
+            return [[0.0] for _ in texts]
+
+        service = EmbeddingService(encode, max_batch_size=2, max_wait_ms=0)
+        try:
+            with pytest.raises(RuntimeError, match="model crashed"):
+                service.embed(["a", "b", "c", "d", "e"], background=True, timeout=5)
+        finally:
+            service.close()
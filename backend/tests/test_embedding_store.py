@@ -0,0 +1,101 @@
+import sys
+import os
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from embedding_store import EmbeddingStore
+from models import Course, CourseChunk
+
+
+class TestEmbeddingStore:
+    def test_put_and_get(self, tmp_path):
+        store = EmbeddingStore(str(tmp_path), "model-a")
+        store.put_many(["hello", "world"], [[1.0, 0.0], [0.0, 1.0]])
+
+        hello, missing, world = store.get_many(["hello", "nope", "world"])
+
+        assert np.allclose(hello, [1.0, 0.0])
+        assert missing is None
+        assert np.allclose(world, [0.0, 1.0])
+
+    def test_persists_across_reopen(self, tmp_path):
+        EmbeddingStore(str(tmp_path), "model-a").put_many(["hello"], [[0.5, 0.5]])
+
+        reopened = EmbeddingStore(str(tmp_path), "model-a")
+
+        assert len(reopened) == 1
+        assert np.allclose(reopened.get_many(["hello"])[0], [0.5, 0.5])
+
+    def test_models_are_namespaced(self, tmp_path):
+        EmbeddingStore(str(tmp_path), "model-a").put_many(["hello"], [[0.5, 0.5]])
+
+        other = EmbeddingStore(str(tmp_path), "org/model-b")
+
+        assert other.get_many(["hello"]) == [None]
+
+    def test_grows_past_initial_capacity(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(EmbeddingStore, "INITIAL_CAPACITY", 4)
+        store = EmbeddingStore(str(tmp_path), "model-a")
+        texts = [f"text {i}" for i in range(10)]
+        store.put_many(texts[:3], [[i, 0.0] for i in range(3)])
+        store.put_many(texts[3:], [[i, 0.0] for i in range(3, 10)])
+
+        reopened = EmbeddingStore(str(tmp_path), "model-a")
+
+        assert len(reopened) == 10
+        assert [v[0] for v in reopened.get_many(texts)] == list(range(10))
+
+    def test_dimension_mismatch_raises(self, tmp_path):
+        store = EmbeddingStore(str(tmp_path), "model-a")
+        store.put_many(["a"], [[1.0, 0.0]])
+
+        with pytest.raises(ValueError, match="dimension"):
+            store.put_many(["b"], [[1.0, 0.0, 0.0]])
+
+    def test_embed_only_computes_misses(self, tmp_path, hash_embedding):
+        store = EmbeddingStore(str(tmp_path), "model-a")
+        store.embed(["alpha", "beta"], hash_embedding)
+
+        vectors = store.embed(["beta", "gamma", "gamma"], hash_embedding)
+
+        assert hash_embedding.calls == [["alpha", "beta"], ["gamma"]]
+        assert len(vectors) == 3
+        assert np.allclose(vectors[1], vectors[2])
+        assert store.get_stats()["hits"] == 1
+
+
+class TestVectorStoreEmbeddingReuse:
+    def _chunks(self, title="MCP Course"):
+        return [
+            CourseChunk(content=f"chunk {i} about servers", course_title=title, lesson_number=1, chunk_index=i)
+            for i in range(3)
+        ]
+
+    def test_rebuild_reuses_stored_embeddings(self, make_vector_store, hash_embedding, tmp_path):
+        store = make_vector_store(embedding_store_path=str(tmp_path / "emb"))
+        store.add_course_content(self._chunks())
+        store.clear_all_data()
+        hash_embedding.calls.clear()
+
+        store.add_course_content(self._chunks())
+
+        assert hash_embedding.calls == []
+        assert store.course_content.count() == 3
+
+    def test_model_change_reembeds_in_background(self, make_vector_store, hash_embedding, tmp_path):
+        store = make_vector_store("model-a", embedding_store_path=str(tmp_path / "emb"))
+        store.add_course_metadata(Course(title="MCP Course", course_link="https://example.com", instructor="Ada"))
+        store.add_course_content(self._chunks())
+        store.embedding_service.close()
+
+        migrated = make_vector_store("model-b", embedding_store_path=str(tmp_path / "emb"))
+
+        assert migrated.wait_for_reembed(timeout=30)
+        assert migrated.course_content.metadata["embedding_model"] == "model-b"
+        assert migrated.course_catalog.metadata["embedding_model"] == "model-b"
+        assert migrated.course_content.count() == 3
+        assert len(migrated.embedding_store) == 4
+        assert not migrated.search("servers").is_empty()
@@ -0,0 +1,120 @@
+import sys
+import os
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from folder_watcher import FolderWatcher, IngestionManifest, file_digest, scan_folder
+
+EXTENSIONS = (".txt", ".pdf", ".docx")
+
+
+class TestScanFolder:
+    def test_only_supported_files_are_fingerprinted(self, tmp_path):
+        (tmp_path / "course.txt").write_text("hello")
+        (tmp_path / "notes.md").write_text("ignored")
+        (tmp_path / "sub").mkdir()
+
+        snapshot = scan_folder(str(tmp_path), EXTENSIONS)
+
+        assert list(snapshot) == [str(tmp_path / "course.txt")]
+        assert snapshot[str(tmp_path / "course.txt")][0] == 5
+
+    def test_missing_folder_is_empty(self, tmp_path):
+        assert scan_folder(str(tmp_path / "missing"), EXTENSIONS) == {}
+
+    def test_digest_ignores_timestamps(self, tmp_path):
+        path = tmp_path / "course.txt"
+        path.write_text("same content")
+        before = file_digest(str(path))
+        os.utime(path, ns=(0, 0))
+
+        assert file_digest(str(path)) == before
+
+
+class TestIngestionManifest:
+    def test_round_trip(self, tmp_path):
+        manifest = IngestionManifest(str(tmp_path / "manifest.json"))
+        manifest.record("/docs/a.txt", (10, 123), "abc", "Course A")
+        manifest.save()
+
+        reloaded = IngestionManifest(str(tmp_path / "manifest.json"))
+
+        assert reloaded.get("/docs/a.txt") == {
+            "size": 10, "mtime_ns": 123, "digest": "abc", "course_title": "Course A"
+        }
+
+    def test_corrupt_manifest_starts_empty(self, tmp_path):
+        path = tmp_path / "manifest.json"
+        path.write_text("{not json")
+
+        assert IngestionManifest(str(path)).entries == {}
+
+    def test_files_in_is_scoped_to_folder(self, tmp_path):
+        manifest = IngestionManifest(str(tmp_path / "manifest.json"))
+        manifest.record(str(tmp_path / "docs" / "a.txt"), (1, 1), "x", "A")
+        manifest.record(str(tmp_path / "other" / "b.txt"), (1, 1), "y", "B")
+
+        assert manifest.files_in(str(tmp_path / "docs")) == [str(tmp_path / "docs" / "a.txt")]
+
+
+class TestFolderWatcher:
+    def test_polling_fires_once_after_burst_settles(self, tmp_path):
+        calls = []
+        fired = threading.Event()
+
+        def on_change():
+            calls.append(scan_folder(str(tmp_path), EXTENSIONS))
+            fired.set()
+
+        watcher = FolderWatcher(str(tmp_path), on_change, EXTENSIONS,
+                                debounce=0.2, poll_interval=0.02, use_watchfiles=False)
+        watcher.start()
+        try:
+            for i in range(3):
+                (tmp_path / f"course{i}.txt").write_text(f"course {i}")
+            assert fired.wait(5)
+        finally:
+            watcher.stop(timeout=5)
+
+        assert watcher.mode == "polling"
+        assert len(calls) == 1
+        assert len(calls[0]) == 3
+
+    def test_unsupported_files_do_not_trigger(self, tmp_path):
+        fired = threading.Event()
+        watcher = FolderWatcher(str(tmp_path), fired.set, EXTENSIONS,
+                                debounce=0.05, poll_interval=0.02, use_watchfiles=False)
+        watcher.start()
+        try:
+            (tmp_path / "notes.md").write_text("ignored")
+            assert not fired.wait(0.3)
+        finally:
+            watcher.stop(timeout=5)
+
+    def test_callback_errors_do_not_stop_watching(self, tmp_path):
+        calls = []
+
+        def on_change():
+            calls.append(1)
+            raise RuntimeError("sync failed")
+
+        watcher = FolderWatcher(str(tmp_path), on_change, EXTENSIONS,
+                                debounce=0.05, poll_interval=0.02, use_watchfiles=False)
+        watcher.start()
+        try:
+            (tmp_path / "a.txt").write_text("a")
+            for _ in range(100):
+                if calls:
+                    break
+                time.sleep(0.02)
+            (tmp_path / "b.txt").write_text("b")
+            for _ in range(100):
+                if len(calls) >= 2:
+                    break
+                time.sleep(0.02)
+        finally:
+            watcher.stop(timeout=5)
+
+        assert len(calls) >= 2
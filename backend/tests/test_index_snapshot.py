@@ -0,0 +1,154 @@
+import sys
+import os
+import io
+import json
+import tarfile
+
+import chromadb
+import pytest
+from chromadb.config import Settings
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from config import Config
+from index_snapshot import (
+    MANIFEST_NAME, SnapshotError, create_snapshot, index_exists, read_manifest,
+    restore_snapshot, verify_snapshot
+)
+from models import Course, CourseChunk
+
+
+def make_config(root, **overrides):
+    config = Config()
+    config.EMBEDDING_MODEL = "test-model"
+    config.VECTOR_BACKEND = "chroma"
+    config.CHROMA_PATH = str(root / "chroma")
+    config.EMBEDDING_STORE_PATH = str(root / "embedding_store")
+    config.DOCS_MANIFEST_PATH = str(root / "docs_manifest.json")
+    config.NUMPY_INDEX_PATH = str(root / "numpy_index")
+    for key, value in overrides.items():
+        setattr(config, key, value)
+    return config
+
+
+@pytest.fixture
+def snapshot(make_vector_store, tmp_path):
+    """An archive of a two-course index, plus the config it was built with"""
+    store = make_vector_store(embedding_store_path=str(tmp_path / "embedding_store"))
+    for title in ("Course A", "Course B"):
+        store.add_course_content([
+            CourseChunk(content=f"{title} chunk {i}", course_title=title, lesson_number=1, chunk_index=i)
+            for i in range(3)
+        ])
+        store.add_course_metadata(Course(title=title))
+    (tmp_path / "docs_manifest.json").write_text(json.dumps({"/docs/a.txt": {"course_title": "Course A"}}))
+
+    config = make_config(tmp_path)
+    archive = str(tmp_path / "index.tar")
+    create_snapshot(config, archive, store)
+    return archive, config
+
+
+def rewrite_archive(archive, transform):
+    """Copy an archive member by member, letting transform replace (info, data) pairs"""
+    with tarfile.open(archive) as tar:
+        members = [(m, tar.extractfile(m).read()) for m in tar.getmembers()]
+    with tarfile.open(archive, "w") as tar:
+        for info, data in members:
+            info, data = transform(info, data)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+
+
+class TestCreateSnapshot:
+    def test_manifest_records_model_backend_and_files(self, snapshot):
+        archive, _ = snapshot
+
+        manifest = read_manifest(archive)
+
+        assert manifest["embedding_model"] == "test-model"
+        assert manifest["vector_backend"] == "chroma"
+        assert "chroma/chroma.sqlite3" in manifest["files"]
+        assert "docs_manifest.json" in manifest["files"]
+        assert any(name.startswith("embedding_store/") for name in manifest["files"])
+
+    def test_verify_accepts_intact_archive(self, snapshot):
+        archive, _ = snapshot
+
+        assert verify_snapshot(archive)["files"]
+
+    def test_embedding_store_can_be_left_out(self, snapshot, tmp_path):
+        _, config = snapshot
+
+        manifest = create_snapshot(config, str(tmp_path / "small.tar"), include_embedding_store=False)
+
+        assert not any(name.startswith("embedding_store/") for name in manifest["files"])
+
+
+class TestRestoreSnapshot:
+    def test_restored_index_serves_without_reembedding(self, snapshot, tmp_path):
+        archive, _ = snapshot
+        target = make_config(tmp_path / "node")
+
+        restore_snapshot(target, archive)
+
+        assert index_exists(target)
+        client = chromadb.PersistentClient(target.CHROMA_PATH, settings=Settings(anonymized_telemetry=False))
+        assert sorted(client.get_collection("course_catalog").get()["ids"]) == ["Course A", "Course B"]
+        assert client.get_collection("course_content").count() == 6
+        assert json.loads(open(target.DOCS_MANIFEST_PATH).read())["/docs/a.txt"]["course_title"] == "Course A"
+
+    def test_model_mismatch_is_rejected(self, snapshot, tmp_path):
+        archive, _ = snapshot
+        target = make_config(tmp_path / "node", EMBEDDING_MODEL="other-model")
+
+        with pytest.raises(SnapshotError, match="other-model"):
+            restore_snapshot(target, archive)
+        assert not index_exists(target)
+
+    def test_existing_index_requires_force(self, snapshot, tmp_path):
+        archive, _ = snapshot
+        target = make_config(tmp_path / "node")
+        restore_snapshot(target, archive)
+
+        with pytest.raises(SnapshotError, match="already exists"):
+            restore_snapshot(target, archive)
+        restore_snapshot(target, archive, force=True)
+
+    def test_corrupt_file_leaves_existing_index_untouched(self, snapshot, tmp_path):
+        archive, _ = snapshot
+        target = make_config(tmp_path / "node")
+        restore_snapshot(target, archive)
+        before = open(os.path.join(target.CHROMA_PATH, "chroma.sqlite3"), "rb").read()
+
+        rewrite_archive(archive, lambda info, data: (
+            (info, data[:-1] + bytes([data[-1] ^ 1])) if info.name == "chroma/chroma.sqlite3" else (info, data)
+        ))
+
+        with pytest.raises(SnapshotError, match="Checksum mismatch"):
+            restore_snapshot(target, archive, force=True)
+        assert open(os.path.join(target.CHROMA_PATH, "chroma.sqlite3"), "rb").read() == before
+
+    def test_members_outside_the_manifest_are_rejected(self, snapshot):
+        archive, _ = snapshot
+
+        def add_escape(info, data):
+            if info.name == MANIFEST_NAME:
+                manifest = json.loads(data)
+                manifest["files"]["../escape"] = {"size": 0, "blake2b": ""}
+                return info, json.dumps(manifest).encode()
+            if info.name == "docs_manifest.json":
+                info.name = "../escape"
+            return info, data
+
+        rewrite_archive(archive, add_escape)
+
+        with pytest.raises(SnapshotError, match="Unexpected archive member"):
+            verify_snapshot(archive)
+
+    def test_not_a_snapshot(self, tmp_path):
+        path = tmp_path / "junk.tar"
+        path.write_bytes(b"not a tar file")
+
+        with pytest.raises(SnapshotError, match="not a valid index snapshot"):
+            read_manifest(str(path))
@@ -0,0 +1,144 @@
+import sys
+import os
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from ingestion_queue import DONE, FAILED, QUEUED, RUNNING, IngestionQueue, QueueFullError
+from models import Course
+
+
+@pytest.fixture
+def ingest():
+    return Mock(return_value=(Course(title="Uploaded Course"), 12))
+
+
+@pytest.fixture
+def make_queue(tmp_path, ingest):
+    queues = []
+
+    def factory(**kwargs):
+        queue = IngestionQueue(str(tmp_path / "queue"), ingest, **kwargs)
+        queues.append(queue)
+        return queue
+
+    yield factory
+    for queue in queues:
+        queue.stop(timeout=5)
+
+
+class TestSubmit:
+    def test_submit_stores_file_and_queues_job(self, make_queue, tmp_path):
+        queue = make_queue()
+
+        job = queue.submit("course.txt", b"Course Title: Uploaded Course")
+
+        assert job.status == QUEUED
+        assert queue.get(job.id).filename == "course.txt"
+        with open(tmp_path / "queue" / "uploads" / job.id / "course.txt", "rb") as f:
+            assert f.read() == b"Course Title: Uploaded Course"
+
+    def test_filename_path_components_are_dropped(self, make_queue, tmp_path):
+        queue = make_queue()
+
+        job = queue.submit("../../etc/course.txt", b"x")
+
+        assert job.filename == "course.txt"
+        assert os.path.exists(tmp_path / "queue" / "uploads" / job.id / "course.txt")
+
+    def test_full_queue_rejects_submissions(self, make_queue):
+        queue = make_queue(max_pending=2)
+        queue.submit("a.txt", b"a")
+        queue.submit("b.txt", b"b")
+
+        with pytest.raises(QueueFullError):
+            queue.submit("c.txt", b"c")
+
+    def test_finished_jobs_free_capacity(self, make_queue):
+        queue = make_queue(max_pending=1)
+        queue.submit("a.txt", b"a")
+        queue.run_next()
+
+        queue.submit("b.txt", b"b")
+
+        assert queue.pending_count() == 1
+
+
+class TestProcessing:
+    def test_run_next_ingests_oldest_job_in_background_mode(self, make_queue, ingest):
+        queue = make_queue()
+        first = queue.submit("a.txt", b"a")
+        queue.submit("b.txt", b"b")
+
+        job = queue.run_next()
+
+        assert job.id == first.id
+        assert (job.status, job.course_title, job.chunks) == (DONE, "Uploaded Course", 12)
+        path, = ingest.call_args.args
+        assert path.endswith(os.path.join(first.id, "a.txt"))
+        assert ingest.call_args.kwargs == {"background": True}
+        assert not os.path.exists(os.path.dirname(path))  # Upload removed once the job is done
+
+    def test_unparseable_document_fails_job(self, make_queue, ingest):
+        ingest.return_value = (None, 0)
+        queue = make_queue()
+        queue.submit("a.txt", b"a")
+
+        job = queue.run_next()
+
+        assert job.status == FAILED
+        assert job.error
+
+    def test_ingest_exception_fails_job(self, make_queue, ingest):
+        ingest.side_effect = RuntimeError("disk full")
+        queue = make_queue()
+        queue.submit("a.txt", b"a")
+
+        job = queue.run_next()
+
+        assert (job.status, job.error) == (FAILED, "disk full")
+        assert os.listdir(queue.uploads_path) == []
+
+    def test_run_next_on_empty_queue(self, make_queue):
+        assert make_queue().run_next() is None
+
+    def test_worker_processes_submitted_jobs(self, make_queue, ingest):
+        done = threading.Event()
+        ingest.side_effect = lambda path, background: done.set() or (Course(title="T"), 1)
+        queue = make_queue()
+        queue.start()
+
+        job = queue.submit("a.txt", b"a")
+
+        assert done.wait(5)
+        queue.stop(timeout=5)
+        assert queue.get(job.id).status == DONE
+
+    def test_stats_count_jobs_by_status(self, make_queue, ingest):
+        queue = make_queue(max_pending=4)
+        queue.submit("a.txt", b"a")
+        queue.submit("b.txt", b"b")
+        queue.run_next()
+
+        stats = queue.get_stats()
+
+        assert (stats["queued"], stats["done"], stats["max_pending"]) == (1, 1, 4)
+
+
+class TestPersistence:
+    def test_jobs_survive_restart_and_running_jobs_are_requeued(self, tmp_path, ingest):
+        path = str(tmp_path / "queue")
+        queue = IngestionQueue(path, ingest)
+        job = queue.submit("a.txt", b"a")
+        queue._claim_next()  # Simulate a crash mid-job
+
+        reopened = IngestionQueue(path, ingest)
+        # Opening alone leaves it alone: another process may be running it
+        assert reopened.get(job.id).status == RUNNING
+
+        assert reopened.requeue_interrupted() == 1
+        assert reopened.get(job.id).status == QUEUED
+        assert reopened.run_next().status == DONE
@@ -0,0 +1,150 @@
+import sys
+import os
+from unittest.mock import Mock
+
+import anthropic
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from llm_transport import (
+    CircuitBreaker, LLMTransport, LLMUnavailableError, build_anthropic_client, retry_after_seconds
+)
+
+
+def api_error(status, headers=None):
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    error_class = {429: anthropic.RateLimitError, 400: anthropic.BadRequestError}.get(
+        status, anthropic.InternalServerError
+    )
+    return error_class("error", response=response, body=None)
+
+
+def connection_error():
+    return anthropic.APITimeoutError(request=httpx.Request("POST", "https://api.anthropic.com/v1/messages"))
+
+
+@pytest.fixture
+def sleeps():
+    return []
+
+
+@pytest.fixture
+def transport(sleeps):
+    return LLMTransport(max_concurrency=2, max_retries=3, backoff_base=0.5, backoff_max=8.0,
+                        breaker_threshold=2, breaker_cooldown=30.0, sleep=sleeps.append)
+
+
+class TestRetries:
+    def test_retries_overload_then_succeeds(self, transport, sleeps):
+        fn = Mock(side_effect=[api_error(529), connection_error(), "ok"])
+
+        assert transport.call(fn, model="m") == "ok"
+
+        assert fn.call_count == 3
+        assert len(sleeps) == 2
+        assert all(0 <= s <= 1.0 for s in sleeps)  # Jittered, capped at base * 2^(n-1)
+        stats = transport.get_stats()
+        assert stats["calls"] == 3 and stats["retries"] == 2 and stats["failures"] == 0
+
+    def test_retry_after_header_is_honoured(self, transport, sleeps):
+        fn = Mock(side_effect=[api_error(429, {"retry-after": "3"}), "ok"])
+
+        transport.call(fn)
+
+        assert sleeps == [3.0]
+
+    def test_retry_after_beyond_budget_gives_up(self, transport, sleeps):
+        fn = Mock(side_effect=[api_error(429, {"retry-after": "120"}), "ok"])
+
+        with pytest.raises(LLMUnavailableError):
+            transport.call(fn)
+
+        assert fn.call_count == 1 and sleeps == []
+
+    def test_exhausted_retries_raise_unavailable(self, transport):
+        fn = Mock(side_effect=api_error(503))
+
+        with pytest.raises(LLMUnavailableError):
+            transport.call(fn)
+
+        assert fn.call_count == 4  # First attempt + 3 retries
+        assert transport.get_stats()["failures"] == 1
+
+    def test_client_errors_are_not_retried(self, transport):
+        fn = Mock(side_effect=api_error(400))
+
+        with pytest.raises(anthropic.BadRequestError):
+            transport.call(fn)
+
+        assert fn.call_count == 1
+
+    def test_retry_after_parsing(self):
+        assert retry_after_seconds(api_error(429, {"retry-after-ms": "1500"})) == 1.5
+        assert retry_after_seconds(api_error(429, {"retry-after": "2"})) == 2.0
+        assert retry_after_seconds(api_error(429, {"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+        assert retry_after_seconds(api_error(429)) is None
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures_and_fails_fast(self, transport):
+        failing = Mock(side_effect=api_error(503))
+        for _ in range(2):
+            with pytest.raises(LLMUnavailableError):
+                transport.call(failing)
+
+        healthy = Mock(return_value="ok")
+        with pytest.raises(LLMUnavailableError, match="circuit open"):
+            transport.call(healthy)
+
+        healthy.assert_not_called()
+        stats = transport.get_stats()
+        assert stats["circuit"] == "open" and stats["rejected"] == 1 and stats["circuit_opened"] == 1
+
+    def test_half_open_trial_closes_or_reopens(self):
+        now = [0.0]
+        breaker = CircuitBreaker(threshold=1, cooldown=10, clock=lambda: now[0])
+        breaker.record_failure()
+        assert not breaker.allow()
+
+        now[0] = 10
+        assert breaker.allow()       # The trial call
+        assert not breaker.allow()   # Only one at a time
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+
+        now[0] = 20
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+
+
+class TestConcurrency:
+    def test_queue_timeout_degrades_and_is_counted(self):
+        transport = LLMTransport(max_concurrency=1, queue_timeout=0.01)
+        transport._slots.acquire()  # Another call holds the only slot
+
+        with pytest.raises(LLMUnavailableError, match="slot"):
+            transport.call(Mock())
+
+        stats = transport.get_stats()
+        assert stats["queue_timeouts"] == 1
+        assert stats["max_waiting"] == 1 and stats["waiting"] == 0
+        assert stats["max_wait_ms"] >= 10
+
+    def test_slot_is_released_after_errors(self, transport):
+        with pytest.raises(anthropic.BadRequestError):
+            transport.call(Mock(side_effect=api_error(400)))
+
+        assert transport.get_stats()["in_flight"] == 0
+        assert transport.call(Mock(return_value="ok")) == "ok"
+
+
+class TestClient:
+    def test_client_uses_pooled_transport_without_sdk_retries(self):
+        client = build_anthropic_client("test-key", max_connections=4, connect_timeout=2.0, read_timeout=30.0)
+
+        assert client.max_retries == 0
+        assert client.timeout.connect == 2.0 and client.timeout.read == 30.0
@@ -0,0 +1,291 @@
+import sys
+import os
+import threading
+
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from numpy_index import CoursePartitionCache, NumpyVectorIndex, mmr_select, relevance_cutoff, top_k
+from models import CourseChunk
+
+
+def _rows(course, lessons, per_lesson=3, seed=0):
+    """Random unit embeddings with metadata for `lessons` lessons of one course."""
+    rng = np.random.default_rng(seed)
+    docs, metas = [], []
+    for lesson in lessons:
+        for i in range(per_lesson):
+            docs.append(f"{course} lesson {lesson} chunk {i}")
+            metas.append({"course_title": course, "lesson_number": lesson, "chunk_index": i})
+    return docs, metas, rng.normal(size=(len(docs), 8)).astype(np.float32)
+
+
+def _brute_force(index, query, predicate, k):
+    q = query / np.linalg.norm(query)
+    scored = [
+        (float(np.dot(index._matrix[row], q)), row)
+        for row, meta in enumerate(index.metadatas) if predicate(meta)
+    ]
+    scored.sort(key=lambda item: -item[0])
+    return [index.documents[row] for _, row in scored[:k]]
+
+
+@pytest.fixture
+def index(tmp_path):
+    idx = NumpyVectorIndex(str(tmp_path / "idx"), "test-model")
+    for seed, course in enumerate(["Course A", "Course B", "Course C"]):
+        idx.add(*_rows(course, [0, 1, 2], seed=seed))
+    return idx
+
+
+class TestTopK:
+    def test_returns_best_first(self):
+        assert list(top_k(np.array([0.1, 0.9, 0.5, 0.7]), 2)) == [1, 3]
+
+    def test_k_larger_than_input(self):
+        assert list(top_k(np.array([0.1, 0.9]), 5)) == [1, 0]
+
+
+class TestMMR:
+    def test_prefers_diverse_candidates(self):
+        query = np.array([1.0, 0.0, 0.0])
+        candidates = np.array([[0.9, 0.1, 0.0], [0.9, 0.1, 0.0], [0.7, 0.0, 0.7]])
+
+        assert mmr_select(query, candidates, 2, lambda_mult=0.5) == [0, 2]
+        assert mmr_select(query, candidates, 2, lambda_mult=1.0) == [0, 1]
+
+    def test_relevance_cutoff_uses_cross_course_pairs(self):
+        samples = {"A": np.array([[1.0, 0.0]]), "B": np.array([[0.0, 1.0]]), "C": np.array([[1.0, 0.0]])}
+
+        # A-B and B-C are orthogonal (distance 2), A-C identical (distance 0)
+        assert relevance_cutoff(samples, 50) == pytest.approx(2.0)
+        assert relevance_cutoff(samples, 0) == pytest.approx(0.0)
+        assert relevance_cutoff({"A": samples["A"]}, 50) is None
+
+
+class TestNumpyVectorIndex:
+    def test_ranges_are_contiguous(self, index):
+        assert index.course_ranges["Course B"] == (9, 18)
+        assert index.lesson_ranges[("Course B", 1)] == (12, 15)
+
+    @pytest.mark.parametrize("course,lesson", [
+        (None, None), ("Course A", None), ("Course C", 2), (None, 1),
+    ])
+    def test_matches_brute_force(self, index, course, lesson):
+        query = np.random.default_rng(42).normal(size=8).astype(np.float32)
+
+        docs, metas, distances = index.search(query, course_title=course, lesson_number=lesson, limit=4)
+
+        expected = _brute_force(
+            index, query,
+            lambda m: (course is None or m["course_title"] == course)
+            and (lesson is None or m["lesson_number"] == lesson),
+            4,
+        )
+        assert docs == expected
+        assert distances == sorted(distances)
+
+    def test_distance_is_squared_l2_of_unit_vectors(self, index):
+        query = index._matrix[4].copy()
+
+        docs, _, distances = index.search(query, limit=1)
+
+        assert docs == [index.documents[4]]
+        assert distances[0] == pytest.approx(0.0, abs=1e-5)
+
+    def test_search_can_return_embeddings(self, index):
+        documents, _, distances, embeddings = index.search(np.ones(8), limit=3, with_embeddings=True)
+
+        assert embeddings.shape == (3, 8)
+        query = np.ones(8) / np.linalg.norm(np.ones(8))
+        assert np.allclose(2.0 - 2.0 * embeddings @ query, distances, atol=1e-5)
+
+    def test_sample_course_embeddings(self, index):
+        samples = index.sample_course_embeddings(4)
+
+        assert set(samples) == {"Course A", "Course B", "Course C"}
+        assert all(vectors.shape == (4, 8) for vectors in samples.values())
+
+    def test_unknown_course_returns_nothing(self, index):
+        assert index.search(np.ones(8), course_title="Nope") == ([], [], [])
+
+    def test_interleaved_adds_are_regrouped(self, tmp_path):
+        idx = NumpyVectorIndex(str(tmp_path / "idx"))
+        idx.add(*_rows("Course A", [0]))
+        idx.add(*_rows("Course B", [0]))
+        idx.add(*_rows("Course A", [1], seed=3))
+
+        assert idx.course_ranges == {"Course A": (0, 6), "Course B": (6, 9)}
+        assert [m["lesson_number"] for m in idx.metadatas[:6]] == [0, 0, 0, 1, 1, 1]
+
+    def test_persists_and_memory_maps(self, index, tmp_path):
+        reopened = NumpyVectorIndex(str(tmp_path / "idx"))
+
+        assert reopened.count() == 27
+        assert reopened.embedding_model == "test-model"
+        assert isinstance(reopened._matrix, np.memmap)
+        query = np.ones(8, dtype=np.float32)
+        assert reopened.search(query, "Course B", 2) == index.search(query, "Course B", 2)
+
+    def test_interrupted_append_is_discarded_on_load(self, index, tmp_path):
+        # Rows written without the meta.json update that makes them count
+        stale_docs, stale_metas, stale_vectors = _rows("Course X", [0], seed=7)
+        with open(tmp_path / "idx" / "embeddings.f32", "ab") as f:
+            f.write(stale_vectors.tobytes())
+        with open(tmp_path / "idx" / "chunks.jsonl", "a", encoding="utf-8") as f:
+            f.write('{"document": "stale", "metadata": {"course_title": "Course X"}}\n')
+
+        reopened = NumpyVectorIndex(str(tmp_path / "idx"))
+        assert reopened.count() == 27
+        docs, metas, vectors = _rows("Course D", [0], seed=9)
+        reopened.add(docs, metas, vectors)
+
+        again = NumpyVectorIndex(str(tmp_path / "idx"))
+        assert again.count() == 30
+        assert "Course X" not in again.course_ranges
+        assert again.search(vectors[0], "Course D", limit=1)[0] == [docs[0]]
+
+    def test_loaded_metadata_shares_course_title_strings(self, index, tmp_path):
+        reopened = NumpyVectorIndex(str(tmp_path / "idx"))
+
+        titles = {id(meta["course_title"]) for meta in reopened.metadatas}
+        assert len(titles) == 3  # One string per course, not per chunk
+
+    def test_reembed_does_not_block_searches(self, index, tmp_path):
+        searched = []
+
+        def embed(texts):
+            # A search from another thread while the corpus is being embedded
+            thread = threading.Thread(target=lambda: searched.append(index.search(np.ones(8), "Course A", limit=1)))
+            thread.start()
+            thread.join(5)
+            return np.random.default_rng(len(texts)).normal(size=(len(texts), 4))
+
+        index.reembed(embed, "new-model", batch_size=10)
+
+        assert len(searched) == 3 and all(len(docs) == 1 for docs, _, _ in searched)
+        reopened = NumpyVectorIndex(str(tmp_path / "idx"))
+        assert reopened.embedding_model == "new-model" and reopened._matrix.shape == (27, 4)
+
+    def test_delete_course(self, index, tmp_path):
+        removed = index.delete_course("Course A")
+
+        assert removed == 9
+        assert "Course A" not in index.course_ranges
+        assert index.course_ranges["Course B"] == (0, 9)
+        assert NumpyVectorIndex(str(tmp_path / "idx")).count() == 18
+
+    def test_clear(self, index, tmp_path):
+        index.clear()
+
+        assert index.count() == 0
+        assert NumpyVectorIndex(str(tmp_path / "idx")).count() == 0
+
+
+class TestVectorStoreNumpyBackend:
+    def test_search_uses_numpy_index(self, make_vector_store, tmp_path):
+        store = make_vector_store(vector_backend="numpy", numpy_index_path=str(tmp_path / "idx"))
+        store.add_course_content([
+            CourseChunk(content="servers expose tools", course_title="MCP", lesson_number=1, chunk_index=0),
+            CourseChunk(content="clients call tools", course_title="MCP", lesson_number=2, chunk_index=1),
+        ])
+
+        results = store.search("servers expose tools", lesson_number=1)
+
+        assert store.course_content.count() == 0
+        assert results.documents == ["servers expose tools"]
+        assert results.distances[0] == pytest.approx(0.0, abs=1e-5)
+
+    def test_other_process_writes_are_picked_up(self, make_vector_store, tmp_path):
+        path = str(tmp_path / "numpy_index")
+        writer = make_vector_store(vector_backend="numpy", numpy_index_path=path)
+        reader = make_vector_store(vector_backend="numpy", numpy_index_path=path,
+                                   refresh_interval=1e-9, search_cache_size=16)
+        assert reader.search("mcp servers").is_empty()
+
+        writer.add_course_content([CourseChunk(content="mcp servers expose tools", course_title="MCP",
+                                               lesson_number=1, chunk_index=0)])
+
+        assert reader.search("mcp servers").documents == ["mcp servers expose tools"]
+
+    def test_unknown_backend_raises(self, make_vector_store):
+        with pytest.raises(ValueError, match="Unknown vector backend"):
+            make_vector_store(vector_backend="faiss")
+
+
+class TestCoursePartitionCache:
+    def _loader(self, calls):
+        def load(course):
+            calls.append(course)
+            return _rows(course, [0, 1])
+        return load
+
+    def test_loads_once_and_reuses(self):
+        calls = []
+        cache = CoursePartitionCache(self._loader(calls))
+
+        first = cache.get("Course A")
+        second = cache.get("Course A")
+
+        assert first is second
+        assert calls == ["Course A"]
+        assert first.lesson_ranges[("Course A", 1)] == (3, 6)
+
+    def test_evicts_least_recently_used(self):
+        calls = []
+        cache = CoursePartitionCache(self._loader(calls), max_partitions=2)
+        cache.get("A")
+        cache.get("B")
+        cache.get("A")
+        cache.get("C")  # evicts B
+
+        cache.get("B")
+
+        assert calls == ["A", "B", "C", "B"]
+        assert cache.get_stats()["evictions"] == 2
+
+    def test_invalidate_forces_reload(self):
+        calls = []
+        cache = CoursePartitionCache(self._loader(calls))
+        cache.get("A")
+
+        cache.invalidate(["A"])
+        cache.get("A")
+
+        assert calls == ["A", "A"]
+
+
+class TestVectorStoreFilteredSearch:
+    def _chunks(self, course, lessons, offset=0):
+        return [
+            CourseChunk(content=f"{course} lesson {lesson} topic {i}", course_title=course,
+                        lesson_number=lesson, chunk_index=offset + i)
+            for i, lesson in enumerate(lessons)
+        ]
+
+    def test_course_filter_routes_to_partition(self, make_vector_store):
+        store = make_vector_store()
+        store.add_course_content(self._chunks("Alpha", [1, 1, 2, 2]))
+        store.add_course_content(self._chunks("Beta", [1, 2]))
+        store.course_content.query = Mock(side_effect=AssertionError("global search used"))
+        store._resolve_course_name = lambda name: name
+
+        results = store.search("lesson 2 topic", course_name="Alpha", lesson_number=2, limit=10)
+
+        assert len(results.documents) == 2
+        assert all(m["course_title"] == "Alpha" and m["lesson_number"] == 2 for m in results.metadata)
+        assert store.get_search_stats()["partitions"]["loads"] == 1
+
+    def test_writes_invalidate_partition(self, make_vector_store):
+        store = make_vector_store()
+        store._resolve_course_name = lambda name: name
+        store.add_course_content(self._chunks("Alpha", [1]))
+        assert len(store.search("topic", course_name="Alpha", limit=10).documents) == 1
+
+        store.add_course_content(self._chunks("Alpha", [2], offset=1))
+
+        assert len(store.search("topic", course_name="Alpha", limit=10).documents) == 2
@@ -0,0 +1,124 @@
+import sys
+import os
+from unittest.mock import Mock
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from query_router import QueryRouter, classify, match_course
+
+COURSES = [
+    {
+        "title": "MCP: Build Rich-Context AI Apps with Anthropic",
+        "course_link": "https://example.com/mcp",
+        "instructor": "Elie Schoppik",
+        "lessons": [
+            {"lesson_number": 0, "lesson_title": "Introduction", "lesson_link": "https://example.com/mcp/0"},
+            {"lesson_number": 1, "lesson_title": "Why MCP", "lesson_link": "https://example.com/mcp/1"},
+        ],
+    },
+    {
+        "title": "Advanced Retrieval for AI with Chroma",
+        "course_link": "https://example.com/chroma",
+        "instructor": "Anton Troynikov",
+        "lessons": [{"lesson_number": 0, "lesson_title": "Introduction", "lesson_link": None}],
+    },
+    {"title": "Building Towards Computer Use with Anthropic", "lessons": []},
+]
+TITLES = [c["title"] for c in COURSES]
+
+
+@pytest.fixture
+def router():
+    store = Mock()
+    store.get_all_courses_metadata.return_value = COURSES
+    return QueryRouter(store)
+
+
+class TestClassify:
+    @pytest.mark.parametrize("query,intent", [
+        ("What is the outline of the MCP course?", "outline"),
+        ("List all lessons in the Chroma course", "outline"),
+        ("How many lessons does the computer use course have?", "outline"),
+        ("Give me the link to the Chroma course", "course_link"),
+        ("What is the MCP course's URL?", "course_link"),
+        ("Chroma course link please", "course_link"),
+        ("What is lesson 2's link in the MCP course?", "lesson"),
+        ("Link to lesson 1 of the MCP course", "lesson"),
+        ("What is the title of lesson 0 in the Chroma course?", "lesson"),
+        ("Who teaches the MCP course?", "instructor"),
+        ("Who is the instructor of the MCP course?", "instructor"),
+        ("Show me the lessons of the MCP course", "outline"),
+    ])
+    def test_structural_queries(self, query, intent):
+        assert classify(query) == intent
+
+    @pytest.mark.parametrize("query", [
+        "What is MCP?",
+        "Explain the outline of the retrieval pipeline",
+        "What is lesson 1 of the MCP course about?",
+        "How does the MCP client link to servers?",
+        "Who created the MCP protocol?",
+        "What is the structure of an MCP server in the MCP course?",
+        "Which lessons of the Chroma course cover embeddings?",
+        "What lessons mention prompt caching?",
+        "How many lessons cover embeddings?",
+        "What is the link between embeddings and reranking in the Chroma course?",
+        "Is there a URL shortener example in the MCP course?",
+        "What is the link between lesson 1 and lesson 2 of the MCP course?",
+    ])
+    def test_content_queries_need_the_model(self, query):
+        assert classify(query) is None
+
+
+class TestMatchCourse:
+    def test_distinctive_title_words(self):
+        assert match_course("outline of the mcp course", TITLES) == TITLES[0]
+        assert match_course("lessons in the Chroma course", TITLES) == TITLES[1]
+        assert match_course("Computer Use course outline", TITLES) == TITLES[2]
+
+    def test_full_title(self):
+        assert match_course("outline of Advanced Retrieval for AI with Chroma", TITLES) == TITLES[1]
+
+    def test_shared_or_missing_words_do_not_match(self):
+        assert match_course("outline of the Anthropic course", TITLES) is None
+        assert match_course("what is this course's outline", TITLES) is None
+
+
+class TestQueryRouter:
+    def test_outline_answer(self, router):
+        answer, sources = router.route("Show me the outline of the MCP course")
+
+        assert "Lesson 1: Why MCP" in answer
+        assert sources == [{"text": TITLES[0], "link": "https://example.com/mcp"}]
+
+    def test_lesson_link_answer(self, router):
+        answer, sources = router.route("Link to lesson 1 of the MCP course")
+
+        assert "Why MCP" in answer and "https://example.com/mcp/1" in answer
+        assert sources[0]["text"] == f"{TITLES[0]} - Lesson 1"
+
+    def test_missing_lesson(self, router):
+        answer, _ = router.route("Title of lesson 7 in the Chroma course")
+
+        assert "has no lesson 7" in answer
+
+    def test_instructor_answer(self, router):
+        answer, _ = router.route("Who teaches the Chroma course?")
+
+        assert answer == f"**{TITLES[1]}** is taught by Anton Troynikov."
+
+    def test_missing_instructor_falls_through(self, router):
+        assert router.route("Who teaches the computer use course?") is None
+
+    def test_unrouted_queries_and_stats(self, router):
+        router.route("What is MCP?")
+        router.route("Outline of the Anthropic course")  # Ambiguous course
+        router.route("Outline of the MCP course")
+
+        stats = router.get_stats()
+        assert stats["routed"] == 1 and stats["fallthrough"] == 2
+        assert stats["by_intent"] == {"outline": 1}
+        # The catalog is only read for queries that look structural
+        assert router.store.get_all_courses_metadata.call_count == 2
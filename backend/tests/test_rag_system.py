@@ -1,5 +1,6 @@
 import sys
 import os
+import threading
 from unittest.mock import Mock, patch, MagicMock
 
 import pytest
@@ -32,6 +33,8 @@ def rag_system():
     rag.tool_manager = Mock()
     rag.tool_manager.get_tool_definitions.return_value = [{"name": "search"}]
     rag.tool_manager.get_last_sources.return_value = [{"text": "Source 1", "link": None}]
+    rag.query_router = Mock()
+    rag.query_router.route.return_value = None
 
     return rag
 
@@ -99,3 +102,397 @@ class TestRAGSystemQuery:
         assert len(result) == 2
         assert result[0] == "AI response text"
         assert isinstance(result[1], list)
+
+
+class TestRAGSystemFastPath:
+    def test_routed_query_skips_the_model(self, rag_system):
+        sources = [{"text": "MCP Course", "link": "https://example.com/mcp"}]
+        rag_system.query_router.route.return_value = ("**MCP Course**\n\nLessons: ...", sources)
+
+        response, returned_sources = rag_system.query("Outline of the MCP course", session_id="s1")
+
+        rag_system.ai_generator.generate_response.assert_not_called()
+        assert response.startswith("**MCP Course**")
+        assert returned_sources == sources
+        rag_system.session_manager.add_exchange.assert_called_once_with(
+            "s1", "Outline of the MCP course", response
+        )
+
+    def test_retrieval_only_returns_excerpts_without_generation(self, rag_system):
+        rag_system.search_tool.execute.return_value = "[MCP Course - Lesson 1]\nMCP connects tools."
+
+        response, sources = rag_system.query("What is MCP?", session_id="s1", retrieval_only=True)
+
+        rag_system.ai_generator.generate_response.assert_not_called()
+        rag_system.query_router.route.assert_not_called()
+        assert response == "[MCP Course - Lesson 1]\nMCP connects tools."
+        assert sources == [{"text": "Source 1", "link": None}]
+        rag_system.session_manager.add_exchange.assert_not_called()
+
+
+class TestRAGSystemPrefetch:
+    def test_question_is_searched_alongside_the_model_call(self, rag_system):
+        rag_system.query("What is MCP?", session_id="s1")
+
+        rag_system.search_tool.prefetch.assert_called_once_with("What is MCP?", rag_system._prefetch_pool)
+        rag_system.search_tool.clear_prefetch.assert_called_once()
+
+    def test_prefetch_is_cleared_when_the_model_fails(self, rag_system):
+        rag_system.ai_generator.generate_response.side_effect = RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            rag_system.query("What is MCP?")
+
+        rag_system.search_tool.clear_prefetch.assert_called_once()
+
+    def test_inject_mode_adds_excerpts_to_the_prompt(self, rag_system):
+        rag_system.prefetch_mode = "inject"
+        rag_system.search_tool.execute.return_value = "[MCP Course - Lesson 1]\nMCP connects tools."
+        rag_system.search_tool.last_sources = [{"text": "MCP Course - Lesson 1", "link": None}]
+
+        rag_system.query("What is MCP?")
+
+        prompt = rag_system.ai_generator.generate_response.call_args[1]["query"]
+        assert prompt.startswith("Answer this question about course materials: What is MCP?")
+        assert "MCP connects tools." in prompt
+
+    def test_inject_mode_without_results_keeps_the_prompt(self, rag_system):
+        rag_system.prefetch_mode = "inject"
+        rag_system.search_tool.execute.return_value = "No relevant content found."
+        rag_system.search_tool.last_sources = []
+
+        rag_system.query("What is MCP?")
+
+        prompt = rag_system.ai_generator.generate_response.call_args[1]["query"]
+        assert prompt == "Answer this question about course materials: What is MCP?"
+
+
+class TestRAGSystemConcurrentQueries:
+    def test_each_query_gets_its_own_sources(self, rag_system):
+        from search_tools import CourseSearchTool, ToolManager
+        from vector_store import SearchResults
+
+        store = Mock()
+        store.search.side_effect = lambda query, **kwargs: SearchResults(
+            documents=[f"{query} text"], metadata=[{"course_title": f"{query} Course"}], distances=[0.2]
+        )
+        store.get_lesson_links.side_effect = lambda pairs: dict.fromkeys(pairs)
+        rag_system.search_tool = CourseSearchTool(store)
+        rag_system.tool_manager = ToolManager()
+        rag_system.tool_manager.register_tool(rag_system.search_tool)
+        rag_system._prefetch_pool = None
+
+        # Both requests search before either reads its sources
+        both_searched = threading.Barrier(2, timeout=5)
+
+        def generate_response(query, tool_manager, **kwargs):
+            topic = query.rsplit(" ", 1)[-1]
+            tool_manager.execute_tool("search_course_content", query=topic)
+            both_searched.wait()
+            return f"About {topic}"
+
+        rag_system.ai_generator.generate_response.side_effect = generate_response
+        results = {}
+
+        def ask(topic):
+            results[topic] = rag_system.query(f"Tell me about {topic}")
+
+        threads = [threading.Thread(target=ask, args=(topic,)) for topic in ("MCP", "Chroma")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for topic in ("MCP", "Chroma"):
+            response, sources = results[topic]
+            assert response == f"About {topic}"
+            assert [source["text"] for source in sources] == [f"{topic} Course"]
+
+
+class TestRAGSystemDegradedQuery:
+    def test_unavailable_api_answers_from_retrieval(self, rag_system):
+        from llm_transport import LLMUnavailableError
+
+        rag_system.ai_generator.generate_response.side_effect = LLMUnavailableError("circuit open")
+        rag_system.search_tool.execute.return_value = "[MCP Course - Lesson 1]\nMCP connects tools."
+        rag_system.search_tool.last_sources = [{"text": "MCP Course - Lesson 1", "link": None}]
+
+        response, sources = rag_system.query("What is MCP?", session_id="s1")
+
+        rag_system.search_tool.execute.assert_called_once_with(query="What is MCP?")
+        assert "temporarily unavailable" in response
+        assert "MCP connects tools." in response
+        assert sources == [{"text": "Source 1", "link": None}]
+        rag_system.session_manager.add_exchange.assert_not_called()
+
+    def test_failed_retrieval_still_answers(self, rag_system):
+        from llm_transport import LLMUnavailableError
+
+        rag_system.ai_generator.generate_response.side_effect = LLMUnavailableError("down")
+        rag_system.search_tool.execute.side_effect = RuntimeError("index unavailable")
+
+        response, _ = rag_system.query("What is MCP?")
+
+        assert "temporarily unavailable" in response
+
+
+class TestRAGSystemIngestion:
+    def _stream(self, title="MCP Course", n_chunks=5):
+        from models import Course, CourseChunk
+
+        course = Course(title=title)
+        chunks = (
+            CourseChunk(content=f"chunk {i}", course_title=title, lesson_number=1, chunk_index=i)
+            for i in range(n_chunks)
+        )
+        return course, chunks
+
+    def test_add_course_document_writes_in_batches(self, rag_system):
+        rag_system.config.INGEST_BATCH_SIZE = 2
+        rag_system.document_processor.stream_course_document.return_value = self._stream(n_chunks=5)
+
+        course, count = rag_system.add_course_document("course.txt")
+
+        assert count == 5
+        batch_sizes = [len(c.args[0]) for c in rag_system.vector_store.add_course_content.call_args_list]
+        assert batch_sizes == [2, 2, 1]
+        rag_system.vector_store.add_course_metadata.assert_called_once_with(course)
+
+    def test_background_ingestion_yields_between_batches(self, rag_system):
+        rag_system.config.INGEST_BATCH_SIZE = 2
+        rag_system.config.INGESTION_BATCH_PAUSE = 0.25
+        rag_system.document_processor.stream_course_document.return_value = self._stream(n_chunks=5)
+
+        with patch("rag_system.time.sleep") as sleep:
+            rag_system.add_course_document("course.txt", background=True)
+
+        assert all(c.kwargs == {"background": True}
+                   for c in rag_system.vector_store.add_course_content.call_args_list)
+        assert [c.args for c in sleep.call_args_list] == [(0.25,), (0.25,)]
+
+    def test_binary_documents_go_through_extractor_pool(self, rag_system):
+        rag_system.extractor_pool = Mock()
+        rag_system.document_processor.stream_extracted_document.return_value = self._stream(n_chunks=1)
+
+        course, count = rag_system.add_course_document("course.pdf")
+
+        rag_system.extractor_pool.extract.assert_called_once_with("course.pdf")
+        rag_system.document_processor.stream_extracted_document.assert_called_once_with(
+            rag_system.extractor_pool.extract.return_value, "course.pdf"
+        )
+        rag_system.document_processor.stream_course_document.assert_not_called()
+        assert count == 1
+
+    def test_extraction_timeout_is_reported_not_raised(self, rag_system):
+        rag_system.extractor_pool = Mock()
+        rag_system.extractor_pool.extract.side_effect = TimeoutError("too slow")
+
+        assert rag_system.add_course_document("course.pdf") == (None, 0)
+        rag_system.vector_store.add_course_content.assert_not_called()
+
+    def test_extraction_errors_can_be_raised(self, rag_system):
+        rag_system.extractor_pool = Mock()
+        rag_system.extractor_pool.extract.side_effect = TimeoutError("too slow")
+
+        with pytest.raises(TimeoutError, match="too slow"):
+            rag_system.add_course_document("course.pdf", raise_errors=True)
+
+    def test_reingesting_replaces_the_course(self, rag_system):
+        rag_system.document_processor.stream_course_document.return_value = self._stream(n_chunks=2)
+        order = []
+        rag_system.vector_store.delete_course.side_effect = lambda title: order.append(("delete", title))
+        rag_system.vector_store.add_course_content.side_effect = lambda batch, **kw: order.append(("add", len(batch)))
+
+        rag_system.add_course_document("course.txt")
+
+        assert order == [("delete", "MCP Course"), ("add", 2)]
+
+    @pytest.mark.parametrize("backend", ["chroma", "numpy"])
+    def test_ingesting_the_same_course_twice_keeps_one_copy(self, rag_system, make_vector_store, tmp_path, backend):
+        rag_system.vector_store = make_vector_store(
+            vector_backend=backend, numpy_index_path=str(tmp_path / "numpy_index")
+        )
+        store = rag_system.vector_store
+        count = lambda: store.content_index.count() if backend == "numpy" else store.course_content.count()
+
+        rag_system._ingest_course(*self._stream(n_chunks=5))
+        rag_system._ingest_course(*self._stream(n_chunks=5))
+        assert count() == 5
+
+        rag_system._ingest_course(*self._stream(n_chunks=3))  # The document shrank
+        assert count() == 3
+        assert store.get_existing_course_titles() == ["MCP Course"]
+
+    def test_add_course_folder_skips_existing_without_reading_body(self, rag_system, tmp_path):
+        (tmp_path / "course.txt").write_text("Course Title: MCP Course\n")
+        course, chunks = self._stream()
+        consumed = []
+        rag_system.document_processor.stream_course_document.return_value = (
+            course, (consumed.append(c) or c for c in chunks)
+        )
+        rag_system.vector_store.get_existing_course_titles.return_value = ["MCP Course"]
+
+        courses, total_chunks = rag_system.add_course_folder(str(tmp_path))
+
+        assert (courses, total_chunks) == (0, 0)
+        assert consumed == []
+        rag_system.vector_store.add_course_content.assert_not_called()
+
+
+class TestRAGSystemAddCourseFiles:
+    def _stream_by_name(self, file_path):
+        from models import Course, CourseChunk
+
+        title = os.path.splitext(os.path.basename(file_path))[0].split("-")[0]
+        return Course(title=title), iter([
+            CourseChunk(content="chunk", course_title=title, chunk_index=i) for i in range(2)
+        ])
+
+    def test_files_are_ingested_in_parallel_with_progress(self, rag_system):
+        rag_system.document_processor.stream_course_document.side_effect = self._stream_by_name
+        rag_system.vector_store.get_existing_course_titles.return_value = []
+        progress = []
+
+        courses, chunks = rag_system.add_course_files(
+            ["a.txt", "b.txt", "c.txt"], workers=3, on_progress=lambda *args: progress.append(args)
+        )
+
+        assert (courses, chunks) == (3, 6)
+        assert sorted(p[0] for p in progress) == [1, 2, 3]
+        assert all(p[1] == 3 and p[5] is None for p in progress)
+
+    def test_existing_and_duplicate_titles_are_skipped(self, rag_system):
+        rag_system.document_processor.stream_course_document.side_effect = self._stream_by_name
+        rag_system.vector_store.get_existing_course_titles.return_value = ["a"]
+        errors = {}
+
+        courses, _ = rag_system.add_course_files(
+            ["a.txt", "b-1.txt", "b-2.txt"], workers=2,
+            on_progress=lambda done, total, path, course, count, error: errors.__setitem__(path, error)
+        )
+
+        assert courses == 1
+        assert errors["a.txt"] == "course already exists"
+        assert sorted(error is None for error in (errors["b-1.txt"], errors["b-2.txt"])) == [False, True]
+
+    def test_force_reingests_existing(self, rag_system):
+        rag_system.document_processor.stream_course_document.side_effect = self._stream_by_name
+        rag_system.vector_store.get_existing_course_titles.return_value = ["a"]
+
+        assert rag_system.add_course_files(["a.txt"], skip_existing=False) == (1, 2)
+        rag_system.vector_store.delete_course.assert_called_once_with("a")
+
+
+class TestRAGSystemFolderSync:
+    @pytest.fixture
+    def docs(self, rag_system, tmp_path):
+        """A docs folder whose files are parsed as courses titled by their first line"""
+        from models import Course, CourseChunk
+
+        indexed = set()
+
+        def stream(file_path):
+            with open(file_path) as f:
+                title = f.readline().strip()
+            return Course(title=title), iter([
+                CourseChunk(content="chunk", course_title=title, lesson_number=1, chunk_index=0)
+            ])
+
+        rag_system.config.DOCS_MANIFEST_PATH = str(tmp_path / "manifest.json")
+        rag_system.document_processor.stream_course_document.side_effect = stream
+        rag_system.vector_store.get_existing_course_titles.side_effect = lambda: sorted(indexed)
+        rag_system.vector_store.add_course_metadata.side_effect = lambda course: indexed.add(course.title)
+        rag_system.vector_store.delete_course.side_effect = indexed.discard
+        folder = tmp_path / "docs"
+        folder.mkdir()
+        return folder
+
+    def _bump_mtime(self, path):
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def test_new_files_are_added_once(self, rag_system, docs):
+        (docs / "a.txt").write_text("Course A\n")
+
+        first = rag_system.sync_course_folder(str(docs))
+        second = rag_system.sync_course_folder(str(docs))
+
+        assert (first["added"], first["chunks"]) == (1, 1)
+        assert second == {"added": 0, "updated": 0, "removed": 0, "unchanged": 1, "chunks": 0}
+        assert rag_system.document_processor.stream_course_document.call_count == 1
+
+    def test_modified_file_replaces_old_course(self, rag_system, docs):
+        path = docs / "a.txt"
+        path.write_text("Course A\n")
+        rag_system.sync_course_folder(str(docs))
+
+        path.write_text("Course A Renamed\n")
+        self._bump_mtime(path)
+        summary = rag_system.sync_course_folder(str(docs))
+
+        assert summary["updated"] == 1
+        rag_system.vector_store.delete_course.assert_any_call("Course A")
+        assert rag_system.vector_store.get_existing_course_titles() == ["Course A Renamed"]
+
+    def test_touched_but_unchanged_file_is_not_reingested(self, rag_system, docs):
+        path = docs / "a.txt"
+        path.write_text("Course A\n")
+        rag_system.sync_course_folder(str(docs))
+
+        self._bump_mtime(path)
+        summary = rag_system.sync_course_folder(str(docs))
+
+        assert summary["unchanged"] == 1
+        assert rag_system.document_processor.stream_course_document.call_count == 1
+
+    def test_removed_file_deletes_course(self, rag_system, docs):
+        (docs / "a.txt").write_text("Course A\n")
+        (docs / "b.txt").write_text("Course B\n")
+        rag_system.sync_course_folder(str(docs))
+
+        (docs / "a.txt").unlink()
+        summary = rag_system.sync_course_folder(str(docs))
+
+        assert summary["removed"] == 1
+        assert rag_system.vector_store.get_existing_course_titles() == ["Course B"]
+
+    def test_existing_courses_are_adopted_without_reingestion(self, rag_system, docs):
+        (docs / "a.txt").write_text("Course A\n")
+        rag_system.vector_store.add_course_metadata(Mock(title="Course A"))
+
+        summary = rag_system.sync_course_folder(str(docs))
+
+        assert summary["unchanged"] == 1
+        rag_system.vector_store.add_course_content.assert_not_called()
+
+    def test_failed_file_is_retried_on_next_sync(self, rag_system, docs):
+        (docs / "a.txt").write_text("Course A\n")
+        rag_system.vector_store.add_course_content.side_effect = [RuntimeError("disk full"), None]
+
+        assert rag_system.sync_course_folder(str(docs))["added"] == 0
+        assert rag_system.sync_course_folder(str(docs))["added"] == 1
+
+    def test_watch_syncs_then_starts_watcher(self, rag_system, docs):
+        (docs / "a.txt").write_text("Course A\n")
+
+        with patch("rag_system.FolderWatcher") as MockWatcher:
+            courses, chunks = rag_system.add_course_folder(str(docs), watch=True)
+
+        assert (courses, chunks) == (1, 1)
+        MockWatcher.return_value.start.assert_called_once()
+        rag_system.stop_watching()
+        MockWatcher.return_value.stop.assert_called_once()
+
+
+class TestRAGSystemMetrics:
+    def test_metrics_include_embedding_stats(self, rag_system):
+        rag_system.vector_store.get_embedding_stats.return_value = {"batches": 3}
+
+        metrics = rag_system.get_metrics()
+
+        assert metrics["embedding"] == {"batches": 3}
+
+    def test_metrics_include_llm_transport_stats(self, rag_system):
+        rag_system.ai_generator.get_stats.return_value = {"retries": 2, "circuit": "closed"}
+
+        assert rag_system.get_metrics()["llm"] == {"retries": 2, "circuit": "closed"}
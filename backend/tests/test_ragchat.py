@@ -0,0 +1,123 @@
+import sys
+import os
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import ragchat
+from vector_store import SearchResults
+
+
+@pytest.fixture
+def rag_system():
+    rag = Mock()
+    rag.vector_store.search.return_value = SearchResults(
+        documents=["Course MCP Lesson 1 content: servers expose tools"],
+        metadata=[{"course_title": "MCP", "lesson_number": 1}],
+        distances=[0.25]
+    )
+    rag.get_metrics.return_value = {"embedding": {"batches": 2, "avg_batch_size": 1.5}, "search": {}}
+    return rag
+
+
+def run(rag_system, *argv):
+    with patch("rag_system.RAGSystem", return_value=rag_system):
+        ragchat.main(list(argv))
+
+
+class TestConfigOverrides:
+    def test_values_are_coerced_to_field_types(self):
+        config = ragchat.build_config(["MAX_RESULTS=9", "WATCH_DOCS=true", "CHROMA_PATH=/data/db"])
+
+        assert (config.MAX_RESULTS, config.WATCH_DOCS, config.CHROMA_PATH) == (9, True, "/data/db")
+
+    def test_unknown_field_is_rejected(self):
+        with pytest.raises(SystemExit):
+            ragchat.build_config(["NOT_A_FIELD=1"])
+
+
+class TestIngestCommand:
+    def test_folders_expand_to_supported_files(self, rag_system, tmp_path, capsys):
+        (tmp_path / "b.txt").write_text("b")
+        (tmp_path / "a.pdf").write_bytes(b"a")
+        (tmp_path / "notes.md").write_text("ignored")
+        rag_system.add_course_files.return_value = (2, 10)
+
+        run(rag_system, "ingest", str(tmp_path), "--workers", "3")
+
+        args, kwargs = rag_system.add_course_files.call_args
+        assert args[0] == [str(tmp_path / "a.pdf"), str(tmp_path / "b.txt")]
+        assert kwargs["workers"] == 3
+        assert kwargs["skip_existing"] is True
+        assert "Added 2 courses, 10 chunks" in capsys.readouterr().out
+
+    def test_progress_lines(self, rag_system, tmp_path, capsys):
+        (tmp_path / "a.txt").write_text("a")
+
+        def add_course_files(files, workers, skip_existing, on_progress):
+            on_progress(1, 1, files[0], Mock(title="Course A"), 4, None)
+            return 1, 4
+
+        rag_system.add_course_files.side_effect = add_course_files
+
+        run(rag_system, "ingest", str(tmp_path))
+
+        assert "[1/1] a.txt: Course A (4 chunks)" in capsys.readouterr().out
+
+
+class TestSearchCommand:
+    def test_prints_results_and_timings(self, rag_system, capsys):
+        run(rag_system, "search", "tools", "--course", "MCP", "--repeat", "3")
+
+        assert rag_system.vector_store.search.call_count == 3
+        rag_system.vector_store.search.assert_called_with("tools", course_name="MCP", lesson_number=None, limit=None)
+        out = capsys.readouterr().out
+        assert "0.2500  MCP / lesson 1" in out
+        assert "over 2 repeats" in out
+
+    def test_zero_repeats_is_rejected(self, rag_system):
+        with pytest.raises(SystemExit):
+            run(rag_system, "search", "tools", "--repeat", "0")
+
+        rag_system.vector_store.search.assert_not_called()
+
+
+class TestQueryAndStatsCommands:
+    def test_query_prints_answer_and_sources(self, rag_system, capsys):
+        rag_system.query.return_value = ("MCP is a protocol.", [{"text": "MCP - Lesson 1", "link": "https://x"}])
+
+        run(rag_system, "query", "What is MCP?")
+
+        rag_system.query.assert_called_once_with("What is MCP?", None, retrieval_only=False)
+        out = capsys.readouterr().out
+        assert "MCP is a protocol." in out
+        assert "MCP - Lesson 1 <https://x>" in out
+
+    def test_stats_is_json(self, rag_system, capsys):
+        rag_system.get_course_analytics.return_value = {"total_courses": 1, "course_titles": ["MCP"]}
+
+        run(rag_system, "stats")
+
+        assert json.loads(capsys.readouterr().out)["courses"]["total_courses"] == 1
+
+
+class TestBenchCommand:
+    def test_default_queries_come_from_lesson_titles(self, rag_system, capsys):
+        rag_system.vector_store.get_all_courses_metadata.return_value = [
+            {"title": "MCP", "lessons": [{"lesson_number": 1, "lesson_title": "Intro"}]}
+        ]
+
+        run(rag_system, "bench", "--iterations", "2", "--concurrency", "2")
+
+        # One warm-up plus two passes over two queries
+        assert rag_system.vector_store.search.call_count == 5
+        assert "4 searches (2 distinct)" in capsys.readouterr().out
+
+    def test_percentile(self):
+        values = sorted(float(i) for i in range(1, 101))
+
+        assert ragchat.percentile(values, 50) == 50.0
+        assert ragchat.percentile(values, 99) == 99.0
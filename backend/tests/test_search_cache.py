@@ -0,0 +1,42 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from search_cache import SearchResultCache, normalize_query
+
+
+class TestSearchResultCache:
+    def test_normalize_query(self):
+        assert normalize_query("  What is\tMCP? ") == normalize_query("what is mcp?") == "what is mcp?"
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = SearchResultCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_entries_expire_after_ttl(self):
+        now = [0.0]
+        cache = SearchResultCache(ttl=10, clock=lambda: now[0])
+        cache.put("a", 1)
+
+        now[0] = 9.9
+        assert cache.get("a") == 1
+        now[0] = 10
+        assert cache.get("a") is None
+        assert cache.get_stats()["expirations"] == 1 and cache.get_stats()["entries"] == 0
+
+    def test_hit_rate(self):
+        cache = SearchResultCache()
+        cache.put("a", 1)
+        for key in ["a", "a", "a", "b"]:
+            cache.get(key)
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 3 and stats["misses"] == 1 and stats["hit_rate"] == 0.75
@@ -6,7 +6,7 @@ import pytest
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from search_tools import CourseSearchTool, ToolManager
+from search_tools import CourseOutlineTool, CourseSearchTool, ToolManager
 from vector_store import SearchResults
 
 
@@ -90,13 +90,35 @@ class TestCourseSearchTool:
 
     def test_sources_include_lesson_links(self, mock_vector_store, sample_search_results):
         mock_vector_store.search.return_value = sample_search_results
-        mock_vector_store.get_lesson_link.return_value = "https://example.com/lesson1"
+        mock_vector_store.get_lesson_links.side_effect = None
+        mock_vector_store.get_lesson_links.return_value = {("Intro to APIs", 1): "https://example.com/lesson1"}
         tool = CourseSearchTool(mock_vector_store)
 
         tool.execute(query="APIs")
 
-        mock_vector_store.get_lesson_link.assert_called()
+        mock_vector_store.get_lesson_links.assert_called_once_with([("Intro to APIs", 1), ("MCP Course", 3)])
+        mock_vector_store.get_lesson_link.assert_not_called()
         assert tool.last_sources[0]["link"] == "https://example.com/lesson1"
+        assert tool.last_sources[1]["link"] is None
+
+    def test_sources_are_deduplicated_per_lesson(self, mock_vector_store):
+        mock_vector_store.search.return_value = SearchResults(
+            documents=["chunk a", "chunk b", "chunk c"],
+            metadata=[
+                {"course_title": "MCP Course", "lesson_number": 3},
+                {"course_title": "MCP Course", "lesson_number": 1},
+                {"course_title": "MCP Course", "lesson_number": 3},
+            ],
+            distances=[0.2, 0.4, 0.3],
+        )
+        tool = CourseSearchTool(mock_vector_store)
+
+        result = tool.execute(query="MCP")
+
+        assert result.count("[MCP Course - Lesson 3]") == 2  # The model still sees every chunk
+        assert [(s["text"], s["score"]) for s in tool.last_sources] == [
+            ("MCP Course - Lesson 3", 0.9), ("MCP Course - Lesson 1", 0.8)
+        ]
 
     def test_get_tool_definition(self, mock_vector_store):
         tool = CourseSearchTool(mock_vector_store)
@@ -108,10 +130,52 @@ class TestCourseSearchTool:
         assert "input_schema" in defn
         assert "query" in defn["input_schema"]["properties"]
 
+    def test_sources_carry_similarity_scores(self, mock_vector_store, sample_search_results):
+        mock_vector_store.search.return_value = sample_search_results
+        tool = CourseSearchTool(mock_vector_store)
+
+        tool.execute(query="APIs")
+
+        assert [source["score"] for source in tool.last_sources] == [0.85, 0.75]
+
+    def test_best_distance_of_last_search(self, mock_vector_store, sample_search_results):
+        mock_vector_store.search.return_value = sample_search_results
+        tool = CourseSearchTool(mock_vector_store)
+        manager = ToolManager()
+        manager.register_tool(tool)
+
+        tool.execute(query="APIs")
+        assert manager.get_best_distance() == 0.3
+
+        manager.reset_sources()
+        assert manager.get_best_distance() is None
+
 
 # ── ToolManager tests ────────────────────────────────────────────────
 
 
+class TestCourseOutlineTool:
+    def test_outline_from_catalog(self, mock_vector_store):
+        mock_vector_store._resolve_course_name.return_value = "MCP Course"
+        mock_vector_store.get_course_metadata.return_value = {
+            "title": "MCP Course",
+            "course_link": "https://example.com/mcp",
+            "lessons": [{"lesson_number": 0, "lesson_title": "Intro", "lesson_link": None}],
+        }
+
+        result = CourseOutlineTool(mock_vector_store).execute(course_name="MCP")
+
+        mock_vector_store.get_course_metadata.assert_called_once_with("MCP Course")
+        assert "Course link: https://example.com/mcp" in result
+        assert "Lesson 0: Intro" in result
+
+    def test_missing_catalog_entry(self, mock_vector_store):
+        mock_vector_store._resolve_course_name.return_value = "MCP Course"
+        mock_vector_store.get_course_metadata.return_value = None
+
+        assert "No metadata found" in CourseOutlineTool(mock_vector_store).execute(course_name="MCP")
+
+
 class TestToolManager:
     def _make_mock_tool(self, name="mock_tool", result="mock result"):
         tool = Mock()
@@ -167,3 +231,53 @@ class TestToolManager:
         manager.reset_sources()
 
         assert tool.last_sources == []
+
+
+# ── Prefetch tests ───────────────────────────────────────────────────
+
+
+class TestCourseSearchToolPrefetch:
+    @pytest.fixture
+    def pool(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            yield pool
+
+    def test_similar_tool_query_uses_prefetched_results(self, mock_vector_store, sample_search_results, pool):
+        mock_vector_store.search.return_value = sample_search_results
+        tool = CourseSearchTool(mock_vector_store)
+        tool.prefetch("What is MCP?", pool).result()
+
+        result = tool.execute(query="MCP basics")
+
+        assert "Doc 2 content about MCP" in result
+        mock_vector_store.search.assert_called_once_with(query="What is MCP?")
+        assert tool.get_prefetch_stats() == {"prefetched": 1, "hits": 1, "misses": 0}
+
+    def test_filtered_or_different_query_searches_again(self, mock_vector_store, pool):
+        tool = CourseSearchTool(mock_vector_store)
+        tool.prefetch("What is MCP?", pool).result()
+
+        tool.execute(query="MCP", course_name="MCP Course")
+        tool.execute(query="vector database reranking")
+
+        assert mock_vector_store.search.call_count == 3
+        assert tool.get_prefetch_stats()["misses"] == 2
+
+    def test_cleared_prefetch_is_not_reused(self, mock_vector_store, pool):
+        tool = CourseSearchTool(mock_vector_store)
+        tool.prefetch("What is MCP?", pool).result()
+        tool.clear_prefetch()
+
+        tool.execute(query="What is MCP?")
+
+        assert mock_vector_store.search.call_count == 2
+        assert tool.get_prefetch_stats()["hits"] == 0
+
+    def test_query_similarity(self):
+        from search_tools import query_similarity
+
+        assert query_similarity("What is MCP?", "MCP basics") == 0.5
+        assert query_similarity("prompt caching", "Prompt caching") == 1.0
+        assert query_similarity("prompt caching", "vector search") == 0.0
@@ -0,0 +1,145 @@
+import sys
+import os
+import asyncio
+import subprocess
+import textwrap
+
+import pytest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from config import BACKEND_DIR, Config
+from server import RequestTimeoutMiddleware, claim_writer_lock, server_options
+
+
+class TestServerOptions:
+    def test_production_uses_config(self):
+        config = Config()
+        config.WORKERS, config.KEEPALIVE_TIMEOUT, config.LIMIT_CONCURRENCY = 4, 20, 0
+
+        options = server_options(config)
+
+        assert options["workers"] == 4
+        assert options["timeout_keep_alive"] == 20
+        assert options["limit_concurrency"] is None
+        assert options["app_dir"] == BACKEND_DIR
+        assert options["loop"] in ("uvloop", "asyncio")
+        assert options["http"] in ("httptools", "h11")
+        assert "reload" not in options
+
+    def test_dev_reloads_in_a_single_process(self):
+        options = server_options(Config(), dev=True)
+
+        assert options["reload"] is True
+        assert "workers" not in options
+
+    def test_default_paths_do_not_depend_on_cwd(self):
+        config = Config()
+
+        for path in (config.CHROMA_PATH, config.DOCS_PATH, config.FRONTEND_PATH, config.INGESTION_QUEUE_PATH):
+            assert os.path.isabs(path)
+        assert config.FRONTEND_PATH == os.path.join(os.path.dirname(BACKEND_DIR), "frontend")
+
+
+class TestRequestTimeout:
+    def _client(self, timeout):
+        app = FastAPI()
+
+        @app.get("/api/slow")
+        async def slow():
+            await asyncio.sleep(1)
+            return {"done": True}
+
+        @app.get("/static/slow")
+        async def static_slow():
+            await asyncio.sleep(0.2)
+            return {"done": True}
+
+        app.add_middleware(RequestTimeoutMiddleware, timeout=timeout)
+        return TestClient(app)
+
+    def test_slow_api_request_gets_504(self):
+        response = self._client(0.05).get("/api/slow")
+
+        assert response.status_code == 504
+        assert "timed out" in response.json()["detail"]
+
+    def test_non_api_routes_are_not_limited(self):
+        assert self._client(0.05).get("/static/slow").status_code == 200
+
+    def test_zero_disables(self):
+        assert self._client(0).get("/api/slow").status_code == 200
+
+
+class TestWriterLock:
+    def test_only_one_process_claims_the_lock(self, tmp_path, monkeypatch):
+        import server
+
+        monkeypatch.setattr(server, "_writer_lock_file", None)
+        lock_path = str(tmp_path / "writer.lock")
+        assert claim_writer_lock(lock_path)
+        held = server._writer_lock_file
+
+        # A second process (as another server worker would be) is refused
+        script = textwrap.dedent(f"""
+            import sys
+            sys.path.insert(0, {BACKEND_DIR!r})
+            from server import claim_writer_lock
+            print(claim_writer_lock({lock_path!r}))
+        """)
+        result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=60)
+
+        held.close()
+        assert result.stdout.strip() == "False"
+
+
+class TestSnapshotRestore:
+    def _config(self, tmp_path):
+        config = Config()
+        config.CHROMA_PATH = str(tmp_path / "chroma")
+        config.INDEX_SNAPSHOT_PATH = str(tmp_path / "index.tar")
+        return config
+
+    def test_concurrent_workers_restore_once(self, tmp_path, monkeypatch):
+        import server
+        import threading
+        import time
+
+        calls = []
+
+        def fake_restore(config, archive_path):
+            calls.append(archive_path)
+            time.sleep(0.05)  # Others must wait rather than start their own restore
+            os.makedirs(config.CHROMA_PATH)
+            open(os.path.join(config.CHROMA_PATH, "chroma.sqlite3"), "w").close()
+
+        monkeypatch.setattr(server, "restore_snapshot", fake_restore)
+        config = self._config(tmp_path)
+        results = []
+        workers = [
+            threading.Thread(target=lambda: results.append(server.restore_index_snapshot(config)))
+            for _ in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        assert calls == [config.INDEX_SNAPSHOT_PATH]
+        assert sorted(results) == [False, False, False, True]
+
+    def test_skipped_without_snapshot_or_with_an_index(self, tmp_path, monkeypatch):
+        import server
+
+        monkeypatch.setattr(server, "restore_snapshot", lambda *args: pytest.fail("restored"))
+        config = self._config(tmp_path)
+        config.INDEX_SNAPSHOT_PATH = ""
+        assert not server.restore_index_snapshot(config)
+
+        config = self._config(tmp_path)
+        os.makedirs(config.CHROMA_PATH)
+        open(os.path.join(config.CHROMA_PATH, "chroma.sqlite3"), "w").close()
+        assert not server.restore_index_snapshot(config)
@@ -0,0 +1,132 @@
+import sys
+import os
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from config import config
+from static_assets import (
+    AssetStaticFiles, DevStaticFiles, IMMUTABLE, REVALIDATE, accepted_encodings, build_static_assets
+)
+
+SCRIPT = "console.log('hello');\n" * 40
+STYLE = "body { color: black; }\n" * 40
+
+
+@pytest.fixture
+def frontend(tmp_path):
+    source = tmp_path / "frontend"
+    source.mkdir()
+    (source / "index.html").write_text(
+        '<html><head><link rel="stylesheet" href="style.css?v=11" />'
+        '<script src="https://cdn.example.com/lib.js"></script></head>'
+        '<body><script src="script.js?v=10"></script>' + "<p>content</p>" * 40 + "</body></html>"
+    )
+    (source / "script.js").write_text(SCRIPT)
+    (source / "style.css").write_text(STYLE)
+    (source / "package.json").write_text("{}")
+    return source
+
+
+@pytest.fixture
+def built(frontend, tmp_path):
+    output = tmp_path / "build"
+    manifest = build_static_assets(str(frontend), str(output))
+    return output, manifest
+
+
+def client_for(directory, static_class=AssetStaticFiles):
+    app = FastAPI()
+    app.mount("/", static_class(directory=str(directory), html=True), name="static")
+    return TestClient(app)
+
+
+class TestBuild:
+    def test_assets_are_hashed_and_html_rewritten(self, built):
+        output, manifest = built
+
+        assert manifest["index.html"] == "index.html"
+        assert manifest["script.js"].startswith("script.") and manifest["script.js"] != "script.js"
+        html = (output / "index.html").read_text()
+        assert f'src="{manifest["script.js"]}"' in html
+        assert f'href="{manifest["style.css"]}"' in html
+        assert "https://cdn.example.com/lib.js" in html
+        assert not (output / "package.json").exists()
+
+    def test_compressible_files_are_precompressed(self, built):
+        output, manifest = built
+
+        assert gzip.decompress((output / (manifest["script.js"] + ".gz")).read_bytes()).decode() == SCRIPT
+        assert (output / "index.html.gz").exists()
+
+    def test_rebuild_after_edit_prunes_old_assets(self, frontend, built):
+        output, manifest = built
+        (frontend / "script.js").write_text(SCRIPT + "console.log('changed');\n")
+
+        rebuilt = build_static_assets(str(frontend), str(output))
+
+        assert rebuilt["script.js"] != manifest["script.js"]
+        assert not (output / manifest["script.js"]).exists()
+        assert not (output / (manifest["script.js"] + ".gz")).exists()
+        assert (output / rebuilt["script.js"]).exists()
+
+    def test_real_frontend_references_are_rewritten(self, tmp_path):
+        manifest = build_static_assets(config.FRONTEND_PATH, str(tmp_path / "build"))
+
+        html = (tmp_path / "build" / "index.html").read_text()
+        assert manifest["script.js"] in html and "script.js?v=" not in html
+        assert manifest["style.css"] in html and "style.css?v=" not in html
+
+
+class TestServing:
+    def test_gzip_variant_is_served_when_accepted(self, built):
+        output, manifest = built
+        client = client_for(output)
+
+        response = client.get("/" + manifest["script.js"], headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["content-type"].startswith("text/javascript")
+        assert response.text == SCRIPT  # Decoded by the client
+
+    def test_identity_when_compression_not_accepted(self, built):
+        output, manifest = built
+
+        response = client_for(output).get("/" + manifest["script.js"], headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+        assert response.text == SCRIPT
+
+    def test_cache_headers(self, built):
+        output, manifest = built
+        client = client_for(output)
+
+        assert client.get("/" + manifest["style.css"]).headers["cache-control"] == IMMUTABLE
+        assert client.get("/").headers["cache-control"] == REVALIDATE
+
+    @pytest.mark.parametrize("encoding", ["gzip", "identity"])
+    def test_etag_revalidation_returns_304(self, built, encoding):
+        output, _ = built
+        client = client_for(output)
+        first = client.get("/", headers={"Accept-Encoding": encoding})
+
+        second = client.get("/", headers={"Accept-Encoding": encoding, "If-None-Match": first.headers["etag"]})
+
+        assert second.status_code == 304
+
+    def test_dev_static_files_disable_caching(self, frontend):
+        response = client_for(frontend, DevStaticFiles).get("/script.js")
+
+        assert response.headers["cache-control"] == "no-cache, no-store, must-revalidate"
+
+
+class TestAcceptEncoding:
+    def test_parsing(self):
+        assert accepted_encodings("gzip, deflate, br;q=0.8") == {"gzip", "deflate", "br"}
+        assert accepted_encodings("br;q=0, gzip") == {"gzip"}
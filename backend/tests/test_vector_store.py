@@ -0,0 +1,290 @@
+import sys
+import os
+import threading
+from unittest.mock import patch
+
+import pytest
+from chromadb.errors import InternalError
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from models import Course, CourseChunk, Lesson
+from vector_store import VectorStore
+
+
+def make_chunks(course_title, count, lesson_number=1):
+    return [
+        CourseChunk(content=f"{course_title} chunk {i}", course_title=course_title,
+                    lesson_number=lesson_number, chunk_index=i)
+        for i in range(count)
+    ]
+
+
+class TestChunkIds:
+    def test_ids_are_stable(self):
+        assert VectorStore.chunk_id("MCP Course", 3) == VectorStore.chunk_id("MCP Course", 3)
+
+    def test_titles_differing_in_spacing_do_not_collide(self):
+        ids = {
+            VectorStore.chunk_id("MCP Course", 1),
+            VectorStore.chunk_id("MCP_Course", 1),
+            VectorStore.chunk_id("MCP  Course", 1),
+            VectorStore.chunk_id("MCP Course_1", 1),
+        }
+
+        assert len(ids) == 4
+
+
+class TestContentWrites:
+    def test_large_course_is_written_in_client_sized_batches(self, make_vector_store):
+        store = make_vector_store(write_batch_size=10)
+
+        with patch.object(store.course_content, "upsert", wraps=store.course_content.upsert) as upsert:
+            store.add_course_content(make_chunks("Big Course", 25))
+
+        assert [len(call.kwargs["ids"]) for call in upsert.call_args_list] == [10, 10, 5]
+        assert store.course_content.count() == 25
+
+    def test_write_batch_size_is_capped_at_client_limit(self, make_vector_store):
+        store = make_vector_store(write_batch_size=10**9)
+
+        assert store.write_batch_size == store.client.get_max_batch_size()
+
+    def test_reingesting_replaces_chunks(self, make_vector_store):
+        store = make_vector_store()
+        store.add_course_content(make_chunks("Course A", 5))
+
+        updated = make_chunks("Course A", 5)
+        updated[0].content = "rewritten first chunk"
+        store.add_course_content(updated)
+
+        assert store.course_content.count() == 5
+        record = store.course_content.get(ids=[VectorStore.chunk_id("Course A", 0)])
+        assert record["documents"] == ["rewritten first chunk"]
+
+    def test_unset_optional_fields_are_omitted(self, make_vector_store):
+        store = make_vector_store()
+
+        store.add_course_content(make_chunks("No Lessons", 2, lesson_number=None))
+        store.add_course_metadata(Course(title="No Lessons"))
+
+        content = store.course_content.get(include=["metadatas"])
+        assert all("lesson_number" not in meta for meta in content["metadatas"])
+        catalog = store.course_catalog.get(ids=["No Lessons"], include=["metadatas"])
+        assert "instructor" not in catalog["metadatas"][0]
+
+    def test_catalog_entry_is_upserted(self, make_vector_store):
+        store = make_vector_store()
+        store.add_course_metadata(Course(title="Course A", lessons=[Lesson(lesson_number=1, title="One")]))
+        store.add_course_metadata(Course(title="Course A", instructor="Someone"))
+
+        assert store.get_existing_course_titles() == ["Course A"]
+        assert store.course_catalog.get(ids=["Course A"])["metadatas"][0]["instructor"] == "Someone"
+
+    def test_lessons_are_looked_up_in_the_catalog(self, make_vector_store):
+        store = make_vector_store()
+        store.add_course_metadata(Course(title="Course A", course_link="https://example.com/a", lessons=[
+            Lesson(lesson_number=2, title="Two", lesson_link="https://example.com/a/2"),
+            Lesson(lesson_number=1, title="One"),
+        ]))
+
+        assert store.get_lesson_link("Course A", 2) == "https://example.com/a/2"
+        assert store.get_lesson_link("Course A", 1) is None
+        assert store.get_course_link("Course A") == "https://example.com/a"
+        assert store.get_lesson_links([("Course A", 2), ("Course A", 2), ("Course B", 1)]) == {
+            ("Course A", 2): "https://example.com/a/2", ("Course B", 1): None
+        }
+        metadata = store.get_course_metadata("Course A")
+        assert [l["lesson_title"] for l in metadata["lessons"]] == ["One", "Two"]
+        assert "lessons_json" not in store.course_catalog.get(ids=["Course A"])["metadatas"][0]
+
+    def test_catalog_is_migrated_from_lessons_json(self, make_vector_store):
+        store = make_vector_store()
+        store.course_catalog.add(
+            ids=["Old Course"], documents=["Old Course"], embeddings=store._embed(["Old Course"]),
+            metadatas=[{"title": "Old Course", "instructor": "Someone", "lesson_count": 1,
+                        "lessons_json": '[{"lesson_number": 1, "lesson_title": "One", "lesson_link": "https://x/1"}]'}]
+        )
+
+        reopened = make_vector_store()
+
+        assert reopened.get_existing_course_titles() == ["Old Course"]
+        assert reopened.get_lesson_link("Old Course", 1) == "https://x/1"
+        assert reopened.get_all_courses_metadata()[0]["instructor"] == "Someone"
+
+    def test_delete_course_removes_only_that_course(self, make_vector_store):
+        store = make_vector_store()
+        for title in ("Course A", "Course B"):
+            store.add_course_content(make_chunks(title, 3))
+            store.add_course_metadata(Course(title=title))
+
+        store.delete_course("Course A")
+
+        assert store.get_existing_course_titles() == ["Course B"]
+        remaining = store.course_content.get(include=["metadatas"])["metadatas"]
+        assert {meta["course_title"] for meta in remaining} == {"Course B"}
+
+    def test_delete_course_with_numpy_backend(self, make_vector_store, tmp_path):
+        store = make_vector_store(vector_backend="numpy", numpy_index_path=str(tmp_path / "index"))
+        store.add_course_content(make_chunks("Course A", 3))
+        store.add_course_content(make_chunks("Course B", 2))
+
+        store.delete_course("Course A")
+
+        assert store.content_index.count() == 2
+        assert "Course A" not in store.content_index.course_ranges
+
+
+class TestWriteRetries:
+    def test_transient_errors_are_retried(self, make_vector_store, monkeypatch):
+        store = make_vector_store()
+        monkeypatch.setattr(VectorStore, "WRITE_RETRY_BACKOFF", 0)
+        real_upsert = store.course_content.upsert
+        failures = [InternalError("database is locked")]
+
+        def flaky_upsert(**kwargs):
+            if failures:
+                raise failures.pop()
+            return real_upsert(**kwargs)
+
+        with patch.object(store.course_content, "upsert", side_effect=flaky_upsert) as upsert:
+            store.add_course_content(make_chunks("Course A", 3))
+
+        assert upsert.call_count == 2
+        assert store.course_content.count() == 3
+
+    def test_gives_up_after_max_attempts(self, make_vector_store, monkeypatch):
+        store = make_vector_store()
+        monkeypatch.setattr(VectorStore, "WRITE_RETRY_BACKOFF", 0)
+
+        with patch.object(store.course_content, "upsert", side_effect=InternalError("down")) as upsert:
+            with pytest.raises(InternalError):
+                store.add_course_content(make_chunks("Course A", 3))
+
+        assert upsert.call_count == VectorStore.WRITE_RETRIES
+
+    def test_invalid_writes_fail_immediately(self, make_vector_store):
+        store = make_vector_store()
+
+        with patch.object(store.course_content, "upsert", side_effect=ValueError("bad metadata")) as upsert:
+            with pytest.raises(ValueError):
+                store.add_course_content(make_chunks("Course A", 3))
+
+        assert upsert.call_count == 1
+
+
+def add_texts(store, course_title, texts):
+    store.add_course_metadata(Course(title=course_title))
+    store.add_course_content([
+        CourseChunk(content=text, course_title=course_title, lesson_number=1, chunk_index=i)
+        for i, text in enumerate(texts)
+    ])
+
+
+@pytest.fixture(params=["chroma", "numpy"])
+def relevance_store(request, make_vector_store, tmp_path):
+    def factory(**kwargs):
+        if request.param == "numpy":
+            kwargs.update(vector_backend="numpy", numpy_index_path=str(tmp_path / "numpy_index"))
+        store = make_vector_store(**kwargs)
+        add_texts(store, "MCP", ["mcp protocol servers", "mcp protocol servers tools", "mcp protocol client transport layer"])
+        add_texts(store, "Cooking", ["cooking pasta recipes kitchen", "baking bread recipes oven"])
+        add_texts(store, "Protobuf", ["protocol buffers serialization format", "schema evolution buffers fields"])
+        return store
+    return factory
+
+
+class TestRelevanceAndDiversity:
+    def test_fixed_cutoff_drops_distant_chunks(self, relevance_store):
+        store = relevance_store(max_distance=1.0)
+
+        results = store.search("mcp protocol", limit=10)
+
+        assert results.documents and all(d <= 1.0 for d in results.distances)
+        assert not any("recipes" in doc for doc in results.documents)
+        assert store.get_relevance_stats()["dropped"] > 0
+
+    def test_calibrated_cutoff_from_cross_course_distances(self, relevance_store):
+        store = relevance_store(relevance_percentile=10)
+
+        results = store.search("mcp protocol", limit=10)
+
+        cutoff = store.get_relevance_cutoff()
+        assert cutoff is not None and cutoff < 2.0
+        assert not any("recipes" in doc for doc in results.documents)
+        assert "protocol buffers serialization format" in results.documents
+        assert store.get_relevance_stats()["mode"] == "calibrated"
+
+    def test_recalibration_does_not_block_searches(self, relevance_store):
+        store = relevance_store(relevance_percentile=10)
+        previous = store.get_relevance_cutoff()
+        store._content_changed()
+        store.RELEVANCE_RECALIBRATE_INTERVAL = 0
+        sampling, release = threading.Event(), threading.Event()
+        sample = store._sample_course_embeddings
+
+        def slow_sample():
+            sampling.set()
+            release.wait(5)
+            return sample()
+
+        with patch.object(store, "_sample_course_embeddings", side_effect=slow_sample):
+            calibrating = threading.Thread(target=store.get_relevance_cutoff)
+            calibrating.start()
+            assert sampling.wait(5)
+
+            assert store.get_relevance_cutoff() == previous  # Answered while the other thread samples
+            release.set()
+            calibrating.join(5)
+
+        assert not store._relevance_calibrating and not store._relevance_stale
+
+    def test_unfiltered_results_when_disabled(self, relevance_store):
+        store = relevance_store()
+
+        assert len(store.search("mcp protocol", limit=10).documents) == 7
+
+    def test_mmr_skips_near_duplicates(self, relevance_store):
+        plain = relevance_store().search("mcp protocol", limit=2)
+        assert plain.documents == ["mcp protocol servers", "mcp protocol servers tools"]
+
+        diverse = relevance_store(mmr_lambda=0.5).search("mcp protocol", limit=2)
+
+        assert diverse.documents == ["mcp protocol servers", "mcp protocol client transport layer"]
+        assert diverse.distances == sorted(diverse.distances)
+
+
+class TestSearchCache:
+    def test_repeated_search_skips_embedding(self, make_vector_store, hash_embedding):
+        store = make_vector_store(search_cache_size=16)
+        add_texts(store, "MCP", ["mcp protocol servers", "mcp client transport"])
+
+        first = store.search("MCP protocol", course_name="MCP")
+        calls = len(hash_embedding.calls)
+        second = store.search("  mcp   PROTOCOL ", course_name="mcp")
+
+        assert second.documents == first.documents and second.distances == first.distances
+        assert len(hash_embedding.calls) == calls
+        assert store.get_search_stats()["cache"]["hits"] == 2  # Course name and results
+
+    def test_writes_invalidate_cached_results(self, make_vector_store):
+        store = make_vector_store(search_cache_size=16)
+        add_texts(store, "MCP", ["mcp protocol servers"])
+        assert store.search("mcp protocol").documents == ["mcp protocol servers"]
+
+        store.add_course_content([CourseChunk(content="mcp protocol clients", course_title="MCP",
+                                              lesson_number=1, chunk_index=1)])
+
+        assert "mcp protocol clients" in store.search("mcp protocol").documents
+
+    def test_callers_cannot_modify_cached_results(self, make_vector_store):
+        store = make_vector_store(search_cache_size=16)
+        add_texts(store, "MCP", ["mcp protocol servers"])
+        store.search("mcp protocol").documents.clear()
+
+        assert store.search("mcp protocol").documents == ["mcp protocol servers"]
+
+    def test_disabled_by_default(self, make_vector_store):
+        store = make_vector_store()
+
+        assert store.search_cache is None and store.get_search_stats()["cache"] is None
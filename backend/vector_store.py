@@ -1,11 +1,29 @@
+import hashlib
+import json
+import os
+import threading
+import time
 import chromadb
 from chromadb.config import Settings
-from typing import List, Dict, Any, Optional
+from chromadb.errors import InternalError, RateLimitError
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 from dataclasses import dataclass
-from models import Course, CourseChunk
-from sentence_transformers import SentenceTransformer
+from models import Course, CourseChunk, Lesson
+from embedding_service import EmbeddingService
+from embedding_backends import create_embedding_function, SENTENCE_TRANSFORMERS
+from embedding_store import EmbeddingStore
+from numpy_index import NumpyVectorIndex, CoursePartitionCache, mmr_select, relevance_cutoff
+from search_cache import SearchResultCache, normalize_query
+from catalog_store import CourseCatalog
 
-@dataclass
+# Content index backends accepted by Config.VECTOR_BACKEND
+VECTOR_BACKENDS = ("chroma", "numpy")
+
+# Write failures worth retrying (storage contention, remote client hiccups);
+# anything else, such as invalid metadata, fails immediately
+TRANSIENT_WRITE_ERRORS = (InternalError, RateLimitError, ConnectionError, TimeoutError)
+
+@dataclass(slots=True)
 class SearchResults:
     """Container for search results with metadata"""
     documents: List[str]
@@ -31,32 +49,247 @@ class SearchResults:
         """Check if results are empty"""
         return len(self.documents) == 0
 
+    def copy(self) -> 'SearchResults':
+        """Copy with its own lists (cached results are shared between callers)"""
+        return SearchResults(list(self.documents), list(self.metadata), list(self.distances), self.error)
+
 class VectorStore:
     """Vector storage using ChromaDB for course content and metadata"""
-    
-    def __init__(self, chroma_path: str, embedding_model: str, max_results: int = 5):
+
+    WRITE_RETRIES = 3           # Attempts per write batch
+    WRITE_RETRY_BACKOFF = 0.2   # Seconds before the first retry, doubled each time
+    RELEVANCE_SAMPLE_PER_COURSE = 50       # Chunks per course used to calibrate the relevance cutoff
+    RELEVANCE_RECALIBRATE_INTERVAL = 10.0  # Seconds between recalibrations while content changes
+
+    def __init__(self, chroma_path: str, embedding_model: str, max_results: int = 5,
+                 embedding_batch_size: int = 32, embedding_batch_window_ms: float = 5.0,
+                 embedding_backend: str = SENTENCE_TRANSFORMERS,
+                 embedding_store_path: Optional[str] = None,
+                 vector_backend: str = "chroma",
+                 numpy_index_path: Optional[str] = None,
+                 partition_cache_size: int = 64,
+                 write_batch_size: Optional[int] = None,
+                 max_distance: float = 0.0,
+                 relevance_percentile: float = 0.0,
+                 mmr_lambda: float = 0.0,
+                 mmr_fetch_factor: int = 3,
+                 search_cache_size: int = 0,
+                 search_cache_ttl: float = 300.0,
+                 refresh_interval: float = 0.0):
+        if vector_backend not in VECTOR_BACKENDS:
+            raise ValueError(
+                f"Unknown vector backend '{vector_backend}'. Expected one of: {', '.join(VECTOR_BACKENDS)}"
+            )
         self.max_results = max_results
+        self.embedding_model = embedding_model
+        # Relevance filtering: a fixed distance cutoff, or one calibrated from the
+        # collection at this percentile (0 disables each); MMR diversity when 0 < lambda < 1
+        self.max_distance = max_distance
+        self.relevance_percentile = relevance_percentile
+        self.mmr_lambda = mmr_lambda
+        self.mmr_fetch_factor = max(1, mmr_fetch_factor)
+        self._relevance_lock = threading.Lock()
+        self._relevance_stale = True
+        self._relevance_calibrated_at = 0.0
+        self._relevance_calibrating = False
+        self._relevance_stats = {"cutoff": None, "searches": 0, "dropped": 0}
+        # Repeated searches are answered from a cache keyed by the data version,
+        # which every write to the catalog or content bumps
+        self._data_version = 0
+        self.search_cache = (
+            SearchResultCache(search_cache_size, search_cache_ttl) if search_cache_size > 0 else None
+        )
         # Initialize ChromaDB client
         self.client = chromadb.PersistentClient(
             path=chroma_path,
             settings=Settings(anonymized_telemetry=False)
         )
         
-        # Set up sentence transformer embedding function
-        self.embedding_function = chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name=embedding_model
+        # Set up embedding function for the configured backend (PyTorch, ONNX or int8 ONNX)
+        self.embedding_function = create_embedding_function(embedding_backend, embedding_model)
+
+        # Embeddings are computed by a shared micro-batching worker rather than inline
+        # in each request thread, and handed to ChromaDB as precomputed vectors
+        self.embedding_service = EmbeddingService(
+            self.embedding_function,
+            max_batch_size=embedding_batch_size,
+            max_wait_ms=embedding_batch_window_ms
+        )
+
+        # Precomputed document embeddings, reused across rebuilds and migrations
+        self.embedding_store = (
+            EmbeddingStore(embedding_store_path, embedding_model) if embedding_store_path else None
         )
+
+        # Serializes index writes with background re-embedding
+        self._write_lock = threading.RLock()
+        # Records per Chroma write: the client's limit, optionally capped lower
+        max_batch = self.client.get_max_batch_size()
+        self.write_batch_size = min(write_batch_size, max_batch) if write_batch_size else max_batch
+        self._reembed_thread: Optional[threading.Thread] = None
         
         # Create collections for different types of data
         self.course_catalog = self._create_collection("course_catalog")  # Course titles/instructors
         self.course_content = self._create_collection("course_content")  # Actual course material
+
+        # Other processes serving the same index (server workers that do not ingest) notice
+        # writes through this stamp file and reload what they hold in memory (see _refresh_if_changed)
+        self.refresh_interval = refresh_interval
+        self._stamp_path = os.path.join(chroma_path, "index.stamp")
+        self._stamp_seen = self._read_stamp()
+        self._stamp_checked_at = time.monotonic()
+
+        # Course and lesson details for lookups, kept next to the Chroma files (and in snapshots)
+        self.catalog = CourseCatalog(os.path.join(chroma_path, "catalog.sqlite3"))
+        if self.catalog.count() == 0 and self.course_catalog.count():
+            self._migrate_catalog()
+
+        # Optional flat NumPy index that replaces the course_content collection for search
+        self.numpy_index_path = numpy_index_path
+        self.content_index = (
+            NumpyVectorIndex(numpy_index_path, embedding_model) if vector_backend == "numpy" else None
+        )
+
+        # With Chroma, course-filtered queries are answered exactly from per-course flat
+        # partitions instead of a global HNSW search filtered by `where`
+        self.partitions = (
+            CoursePartitionCache(self._load_course_partition, partition_cache_size)
+            if self.content_index is None and partition_cache_size > 0 else None
+        )
+
+        self._check_index_model()
     
+    def _migrate_catalog(self):
+        """Fill the catalog from an index built when lessons were JSON strings in Chroma metadata"""
+        results = self.course_catalog.get(include=["metadatas"])
+        for title, metadata in zip(results["ids"], results["metadatas"]):
+            metadata = metadata or {}
+            lessons = json.loads(metadata.get("lessons_json") or "[]")
+            self.catalog.upsert_course(Course(
+                title=title,
+                course_link=metadata.get("course_link"),
+                instructor=metadata.get("instructor"),
+                lessons=[
+                    Lesson(lesson_number=l["lesson_number"], title=l.get("lesson_title") or "",
+                           lesson_link=l.get("lesson_link"))
+                    for l in lessons
+                ]
+            ))
+        print(f"Moved {len(results['ids'])} courses' lessons into the course catalog")
+
     def _create_collection(self, name: str):
         """Create or get a ChromaDB collection"""
+        # No embedding function is attached: all vectors are supplied by the embedding service.
+        # The model that produced them is recorded so a model change can be detected later.
         return self.client.get_or_create_collection(
             name=name,
-            embedding_function=self.embedding_function
+            embedding_function=None,
+            metadata={"embedding_model": self.embedding_model}
         )
+
+    def _embed(self, texts: List[str], background: bool = False) -> List[Any]:
+        """Embed texts through the micro-batching embedding service"""
+        return self.embedding_service.embed(texts, background=background)
+
+    def _embed_documents(self, texts: List[str], background: bool = False) -> List[Any]:
+        """Embed documents for indexing, reusing precomputed vectors when available"""
+        if self.embedding_store is None:
+            return self._embed(texts, background)
+        return self.embedding_store.embed(texts, lambda missing: self._embed(missing, background))
+
+    def _check_index_model(self):
+        """Re-embed existing collections in the background if they were built with another model"""
+        stale = []
+        for attr in ("course_catalog", "course_content"):
+            collection = getattr(self, attr)
+            indexed_model = (collection.metadata or {}).get("embedding_model")
+            if indexed_model is None:
+                # Collection predates model tracking; assume it matches the current model
+                collection.modify(metadata={"embedding_model": self.embedding_model})
+            elif indexed_model != self.embedding_model:
+                print(f"Collection {collection.name} was embedded with {indexed_model}, "
+                      f"re-embedding with {self.embedding_model} in the background")
+                stale.append(attr)
+
+        if self.content_index is not None and self.content_index.count():
+            if self.content_index.embedding_model != self.embedding_model:
+                print(f"Vector index was embedded with {self.content_index.embedding_model}, "
+                      f"re-embedding with {self.embedding_model} in the background")
+                stale.append("content_index")
+
+        if stale:
+            self._reembed_thread = threading.Thread(
+                target=self._reembed_collections, args=(stale,), name="reembed", daemon=True
+            )
+            self._reembed_thread.start()
+
+    def _reembed_collections(self, attrs: List[str], page_size: int = 1000):
+        """Rebuild collections with embeddings from the current model, then swap them in"""
+        for attr in attrs:
+            if attr == "content_index":
+                with self._write_lock:
+                    try:
+                        self.content_index.reembed(
+                            lambda texts: self._embed_documents(texts, background=True), self.embedding_model
+                        )
+                        self._content_changed()
+                        print(f"Re-embedded {self.content_index.count()} chunks in the vector index")
+                    except Exception as e:
+                        print(f"Error re-embedding vector index: {e}")
+                continue
+
+            with self._write_lock:
+                old = getattr(self, attr)
+                name = old.name
+                tmp_name = f"{name}_reembed"
+                try:
+                    try:
+                        self.client.delete_collection(tmp_name)
+                    except Exception:
+                        pass
+                    new = self.client.create_collection(
+                        name=tmp_name,
+                        embedding_function=None,
+                        metadata={"embedding_model": self.embedding_model}
+                    )
+
+                    offset = 0
+                    while True:
+                        page = old.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+                        if not page["ids"]:
+                            break
+                        new.add(
+                            ids=page["ids"],
+                            documents=page["documents"],
+                            metadatas=page["metadatas"],
+                            embeddings=self._embed_documents(page["documents"], background=True)
+                        )
+                        offset += len(page["ids"])
+
+                    self.client.delete_collection(name)
+                    new.modify(name=name)
+                    setattr(self, attr, self.client.get_collection(name, embedding_function=None))
+                    if self.partitions is not None:
+                        self.partitions.invalidate()
+                    self._content_changed()
+                    print(f"Re-embedded {offset} documents in {name} with {self.embedding_model}")
+                except Exception as e:
+                    print(f"Error re-embedding {name}: {e}")
+
+    def wait_for_reembed(self, timeout: Optional[float] = None) -> bool:
+        """Block until background re-embedding finishes; returns False on timeout"""
+        if self._reembed_thread is not None:
+            self._reembed_thread.join(timeout)
+            return not self._reembed_thread.is_alive()
+        return True
+
+    def get_embedding_stats(self) -> Dict[str, Any]:
+        """Get queue-depth and batch-size metrics from the embedding service"""
+        stats = self.embedding_service.get_stats()
+        if self.embedding_store is not None:
+            stats["store"] = self.embedding_store.get_stats()
+        stats["reembedding"] = self._reembed_thread is not None and self._reembed_thread.is_alive()
+        return stats
     
     def search(self, 
                query: str,
@@ -75,35 +308,234 @@ class VectorStore:
         Returns:
             SearchResults object with documents and metadata
         """
+        self._refresh_if_changed()
+
         # Step 1: Resolve course name if provided
         course_title = None
         if course_name:
             course_title = self._resolve_course_name(course_name)
             if not course_title:
                 return SearchResults.empty(f"No course found matching '{course_name}'")
-        
-        # Step 2: Build filter for content search
-        filter_dict = self._build_filter(course_title, lesson_number)
-        
-        # Step 3: Search course content
+
         # Use provided limit or fall back to configured max_results
         search_limit = limit if limit is not None else self.max_results
+
+        # Step 2: Serve repeated searches against unchanged data from the cache
+        if self.search_cache is None:
+            return self._search_content(query, course_title, lesson_number, search_limit)
+        key = (normalize_query(query), course_title, lesson_number, search_limit,
+               self._data_version, self.get_relevance_cutoff())
+        cached = self.search_cache.get(key)
+        if cached is not None:
+            return cached.copy()
+        results = self._search_content(query, course_title, lesson_number, search_limit)
+        if not results.error:
+            self.search_cache.put(key, results.copy())
+        return results
+
+    def _search_content(self, query: str, course_title: Optional[str],
+                        lesson_number: Optional[int], search_limit: int) -> SearchResults:
+        """Embed the query and search course content, then filter and diversify the hits"""
+        filter_dict = self._build_filter(course_title, lesson_number)
+
+        # MMR re-ranks a larger candidate pool
+        use_mmr = 0.0 < self.mmr_lambda < 1.0
+        fetch_limit = search_limit * self.mmr_fetch_factor if use_mmr else search_limit
         
         try:
-            results = self.course_content.query(
-                query_texts=[query],
-                n_results=search_limit,
-                where=filter_dict
+            query_embedding = self._embed([query])[0]
+            documents, metadata, distances, embeddings = self._query_content(
+                query_embedding, course_title, lesson_number, filter_dict, fetch_limit, use_mmr
             )
-            return SearchResults.from_chroma(results)
         except Exception as e:
             return SearchResults.empty(f"Search error: {str(e)}")
+
+        # Drop chunks too far away to be relevant, then diversify
+        keep = list(range(len(documents)))
+        cutoff = self.get_relevance_cutoff()
+        if cutoff is not None:
+            keep = [i for i in keep if distances[i] <= cutoff]
+            with self._relevance_lock:
+                self._relevance_stats["searches"] += 1
+                self._relevance_stats["dropped"] += len(documents) - len(keep)
+        if use_mmr and len(keep) > search_limit:
+            picked = mmr_select(query_embedding, [embeddings[i] for i in keep], search_limit, self.mmr_lambda)
+            # Back in distance order
+            keep = sorted(keep[i] for i in picked)
+        keep = keep[:search_limit]
+        return SearchResults(
+            documents=[documents[i] for i in keep],
+            metadata=[metadata[i] for i in keep],
+            distances=[distances[i] for i in keep]
+        )
+
+    def _query_content(self, query_embedding: Any, course_title: Optional[str], lesson_number: Optional[int],
+                       filter_dict: Optional[Dict], limit: int, with_embeddings: bool) -> tuple:
+        """Nearest chunks as (documents, metadata, distances, embeddings or None) from the active backend"""
+        if self.content_index is not None:
+            index = self.content_index
+        elif course_title and self.partitions is not None:
+            # Narrow filter: search only this course's partition
+            index = self.partitions.get(course_title)
+        else:
+            # Unfiltered (or lesson-only) queries use Chroma's global index
+            include = ["documents", "metadatas", "distances"] + (["embeddings"] if with_embeddings else [])
+            results = self.course_content.query(
+                query_embeddings=[query_embedding],
+                n_results=limit,
+                where=filter_dict,
+                include=include
+            )
+            found = SearchResults.from_chroma(results)
+            embeddings = results["embeddings"][0] if with_embeddings and results.get("embeddings") is not None else None
+            return found.documents, found.metadata, found.distances, embeddings
+
+        found = index.search(
+            query_embedding,
+            course_title=course_title,
+            lesson_number=lesson_number,
+            limit=limit,
+            with_embeddings=with_embeddings
+        )
+        return found if with_embeddings else found + (None,)
+
+    def get_relevance_cutoff(self) -> Optional[float]:
+        """
+        Largest distance a search hit may have, or None for no cutoff.
+
+        A fixed max_distance wins; otherwise the cutoff is calibrated from the content
+        collection itself (see relevance_cutoff) and refreshed after the content changes.
+        """
+        if self.max_distance > 0:
+            return self.max_distance
+        if self.relevance_percentile <= 0:
+            return None
+        with self._relevance_lock:
+            fresh = not self._relevance_stale or \
+                time.monotonic() - self._relevance_calibrated_at < self.RELEVANCE_RECALIBRATE_INTERVAL
+            if (self._relevance_calibrated_at and fresh) or self._relevance_calibrating:
+                # Searches keep using the previous cutoff while another thread recalibrates
+                return self._relevance_stats["cutoff"]
+            self._relevance_calibrating = True
+            version = self._data_version
+
+        # Sampling reads every course, so it runs outside the lock
+        try:
+            cutoff = relevance_cutoff(self._sample_course_embeddings(), self.relevance_percentile)
+        except Exception as e:
+            print(f"Error calibrating relevance cutoff: {e}")
+            cutoff = None
+        with self._relevance_lock:
+            self._relevance_stats["cutoff"] = cutoff
+            self._relevance_calibrated_at = time.monotonic()
+            # Writes made while sampling call for another calibration
+            self._relevance_stale = self._data_version != version
+            self._relevance_calibrating = False
+        return cutoff
+
+    def _sample_course_embeddings(self) -> Dict[str, Any]:
+        """A few chunk embeddings per course, for calibrating the relevance cutoff"""
+        if self.content_index is not None:
+            return self.content_index.sample_course_embeddings(self.RELEVANCE_SAMPLE_PER_COURSE)
+        samples = {}
+        for title in self.get_existing_course_titles():
+            results = self.course_content.get(
+                where={"course_title": title},
+                limit=self.RELEVANCE_SAMPLE_PER_COURSE,
+                include=["embeddings"]
+            )
+            if results["embeddings"] is not None and len(results["embeddings"]):
+                samples[title] = results["embeddings"]
+        return samples
+
+    def _content_changed(self, publish: bool = True):
+        """
+        Retire cached search results and schedule relevance recalibration after a write.
+        With `publish`, also touch the stamp file so other processes reload.
+        """
+        with self._relevance_lock:
+            self._data_version += 1
+            self._relevance_stale = True
+        if publish:
+            try:
+                with open(self._stamp_path, "w") as f:
+                    f.write(f"{os.getpid()}:{time.time_ns()}")
+                self._stamp_seen = self._read_stamp()
+            except OSError as e:
+                print(f"Error writing index stamp: {e}")
+
+    def _read_stamp(self) -> Optional[str]:
+        try:
+            with open(self._stamp_path) as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _refresh_if_changed(self):
+        """
+        Reload in-memory state if another process wrote to the index since the last check.
+
+        Checks the stamp at most every refresh_interval seconds. The NumPy index is
+        reopened from disk, partitions are dropped and cached results retired. The
+        SQLite catalog needs nothing, and Chroma reads its own files.
+        """
+        if self.refresh_interval <= 0 or time.monotonic() - self._stamp_checked_at < self.refresh_interval:
+            return
+        self._stamp_checked_at = time.monotonic()
+        stamp = self._read_stamp()
+        if stamp == self._stamp_seen:
+            return
+        self._stamp_seen = stamp
+        with self._write_lock:
+            if self.content_index is not None:
+                self.content_index = NumpyVectorIndex(self.numpy_index_path, self.embedding_model)
+            if self.partitions is not None:
+                self.partitions.invalidate()
+            self._content_changed(publish=False)
+        print("Index changed in another process; reloaded")
     
+    def _load_course_partition(self, course_title: str):
+        """Fetch one course's chunks and embeddings from ChromaDB for a flat partition"""
+        results = self.course_content.get(
+            where={"course_title": course_title},
+            include=["documents", "metadatas", "embeddings"]
+        )
+        return results["documents"], results["metadatas"], results["embeddings"]
+
+    def get_search_stats(self) -> Dict[str, Any]:
+        """Get search-path metrics (course partition cache)"""
+        return {
+            "backend": "numpy" if self.content_index is not None else "chroma",
+            "partitions": self.partitions.get_stats() if self.partitions is not None else None,
+            "relevance": self.get_relevance_stats(),
+            "cache": self.search_cache.get_stats() if self.search_cache is not None else None
+        }
+
+    def get_relevance_stats(self) -> Dict[str, Any]:
+        with self._relevance_lock:
+            stats = dict(self._relevance_stats)
+        stats["mode"] = "fixed" if self.max_distance > 0 else "calibrated" if self.relevance_percentile > 0 else "off"
+        if self.max_distance > 0:
+            stats["cutoff"] = self.max_distance
+        stats["mmr_lambda"] = self.mmr_lambda
+        return stats
+
     def _resolve_course_name(self, course_name: str) -> Optional[str]:
         """Use vector search to find best matching course by name"""
+        key = ("course", normalize_query(course_name), self._data_version)
+        if self.search_cache is not None:
+            cached = self.search_cache.get(key)
+            if cached is not None:
+                return cached
+        title = self._match_course_name(course_name)
+        if title is not None and self.search_cache is not None:
+            self.search_cache.put(key, title)
+        return title
+
+    def _match_course_name(self, course_name: str) -> Optional[str]:
         try:
             results = self.course_catalog.query(
-                query_texts=[course_name],
+                query_embeddings=self._embed([course_name]),
                 n_results=1
             )
             
@@ -132,72 +564,140 @@ class VectorStore:
             
         return {"lesson_number": lesson_number}
     
-    def add_course_metadata(self, course: Course):
-        """Add course information to the catalog for semantic search"""
-        import json
+    @staticmethod
+    def chunk_id(course_title: str, chunk_index: int) -> str:
+        """
+        Stable ID of a content chunk: a hash of its (course title, chunk index) position.
+
+        Hashing the JSON-encoded pair keeps IDs short and unambiguous for any title,
+        unlike joining the title and index with separators that may occur in titles.
+        The position, not the text, is hashed so that re-ingesting a course upserts
+        over its previous chunks instead of accumulating stale ones.
+        """
+        key = json.dumps([course_title, chunk_index], ensure_ascii=False)
+        return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _clean_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop None values, which Chroma rejects (e.g. a course without an instructor)"""
+        return {key: value for key, value in metadata.items() if value is not None}
 
+    def _upsert(self, collection, ids: List[str], documents: List[str],
+                metadatas: List[Dict[str, Any]], embeddings: Any):
+        """Upsert records in batches no larger than the client allows, retrying transient errors"""
+        for start in range(0, len(ids), self.write_batch_size):
+            end = start + self.write_batch_size
+            for attempt in range(self.WRITE_RETRIES):
+                try:
+                    collection.upsert(
+                        ids=ids[start:end],
+                        documents=documents[start:end],
+                        metadatas=metadatas[start:end],
+                        embeddings=embeddings[start:end]
+                    )
+                    break
+                except TRANSIENT_WRITE_ERRORS as e:
+                    if attempt == self.WRITE_RETRIES - 1:
+                        raise
+                    delay = self.WRITE_RETRY_BACKOFF * 2 ** attempt
+                    print(f"Write to {collection.name} failed ({e}); retrying in {delay:.1f}s")
+                    time.sleep(delay)
+
+    def add_course_metadata(self, course: Course):
+        """Add course information to the catalog for semantic search and lesson lookups"""
         course_text = course.title
-        
-        # Build lessons metadata and serialize as JSON string
-        lessons_metadata = []
-        for lesson in course.lessons:
-            lessons_metadata.append({
-                "lesson_number": lesson.lesson_number,
-                "lesson_title": lesson.title,
-                "lesson_link": lesson.lesson_link
-            })
-        
-        self.course_catalog.add(
-            documents=[course_text],
-            metadatas=[{
-                "title": course.title,
-                "instructor": course.instructor,
-                "course_link": course.course_link,
-                "lessons_json": json.dumps(lessons_metadata),  # Serialize as JSON string
-                "lesson_count": len(course.lessons)
-            }],
-            ids=[course.title]
-        )
-    
-    def add_course_content(self, chunks: List[CourseChunk]):
-        """Add course content chunks to the vector store"""
+
+        with self._write_lock:
+            self._upsert(
+                self.course_catalog,
+                ids=[course.title],
+                documents=[course_text],
+                metadatas=[self._clean_metadata({
+                    "title": course.title,
+                    "instructor": course.instructor,
+                    "course_link": course.course_link,
+                    "lesson_count": len(course.lessons)
+                })],
+                embeddings=self._embed_documents([course_text])
+            )
+            # Lessons live in the structured catalog, keyed by (course, lesson number)
+            self.catalog.upsert_course(course)
+            self._content_changed()
+
+    def add_course_content(self, chunks: List[CourseChunk], background: bool = False):
+        """
+        Add or replace course content chunks.
+
+        Chunks are embedded and written one client-sized batch at a time, so courses
+        with tens of thousands of chunks never exceed Chroma's maximum batch size.
+        With `background`, embeddings yield to query traffic (see EmbeddingService).
+        """
         if not chunks:
             return
-        
-        documents = [chunk.content for chunk in chunks]
-        metadatas = [{
-            "course_title": chunk.course_title,
-            "lesson_number": chunk.lesson_number,
-            "chunk_index": chunk.chunk_index
-        } for chunk in chunks]
-        # Use title with chunk index for unique IDs
-        ids = [f"{chunk.course_title.replace(' ', '_')}_{chunk.chunk_index}" for chunk in chunks]
-        
-        self.course_content.add(
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids
-        )
-    
+
+        for start in range(0, len(chunks), self.write_batch_size):
+            batch = chunks[start:start + self.write_batch_size]
+            documents = [chunk.content for chunk in batch]
+            # Optional fields (lesson number, page, section) are omitted when unset
+            metadatas = [self._clean_metadata({
+                "course_title": chunk.course_title,
+                "lesson_number": chunk.lesson_number,
+                "chunk_index": chunk.chunk_index,
+                "page_number": chunk.page_number,
+                "section": chunk.section
+            }) for chunk in batch]
+
+            embeddings = self._embed_documents(documents, background)
+            with self._write_lock:
+                if self.content_index is not None:
+                    self.content_index.add(documents, metadatas, embeddings)
+                else:
+                    self._upsert(
+                        self.course_content,
+                        ids=[self.chunk_id(chunk.course_title, chunk.chunk_index) for chunk in batch],
+                        documents=documents,
+                        metadatas=metadatas,
+                        embeddings=embeddings
+                    )
+                    if self.partitions is not None:
+                        self.partitions.invalidate({chunk.course_title for chunk in batch})
+                self._content_changed()
+
     def clear_all_data(self):
         """Clear all data from both collections"""
         try:
-            self.client.delete_collection("course_catalog")
-            self.client.delete_collection("course_content")
-            # Recreate collections
-            self.course_catalog = self._create_collection("course_catalog")
-            self.course_content = self._create_collection("course_content")
+            with self._write_lock:
+                self.client.delete_collection("course_catalog")
+                self.client.delete_collection("course_content")
+                # Recreate collections
+                self.course_catalog = self._create_collection("course_catalog")
+                self.course_content = self._create_collection("course_content")
+                self.catalog.clear()
+                if self.content_index is not None:
+                    self.content_index.clear()
+                if self.partitions is not None:
+                    self.partitions.invalidate()
+                self._content_changed()
         except Exception as e:
             print(f"Error clearing data: {e}")
-    
+
+    def delete_course(self, course_title: str):
+        """Remove a course's catalog entry and all of its content chunks"""
+        with self._write_lock:
+            self.course_catalog.delete(ids=[course_title])
+            self.catalog.delete_course(course_title)
+            if self.content_index is not None:
+                self.content_index.delete_course(course_title)
+            else:
+                self.course_content.delete(where={"course_title": course_title})
+            if self.partitions is not None:
+                self.partitions.invalidate({course_title})
+            self._content_changed()
+
     def get_existing_course_titles(self) -> List[str]:
         """Get all existing course titles from the vector store"""
         try:
-            # Get all documents from the catalog
-            results = self.course_catalog.get()
-            if results and 'ids' in results:
-                return results['ids']
-            return []
+            return self.catalog.get_titles()
         except Exception as e:
             print(f"Error getting existing course titles: {e}")
             return []
@@ -205,63 +705,59 @@ class VectorStore:
     def get_course_count(self) -> int:
         """Get the total number of courses in the vector store"""
         try:
-            results = self.course_catalog.get()
-            if results and 'ids' in results:
-                return len(results['ids'])
-            return 0
+            return self.catalog.count()
         except Exception as e:
             print(f"Error getting course count: {e}")
             return 0
     
     def get_all_courses_metadata(self) -> List[Dict[str, Any]]:
-        """Get metadata for all courses in the vector store"""
-        import json
+        """Get metadata for all courses in the vector store, each with its `lessons` list"""
         try:
-            results = self.course_catalog.get()
-            if results and 'metadatas' in results:
-                # Parse lessons JSON for each course
-                parsed_metadata = []
-                for metadata in results['metadatas']:
-                    course_meta = metadata.copy()
-                    if 'lessons_json' in course_meta:
-                        course_meta['lessons'] = json.loads(course_meta['lessons_json'])
-                        del course_meta['lessons_json']  # Remove the JSON string version
-                    parsed_metadata.append(course_meta)
-                return parsed_metadata
-            return []
+            return self.catalog.get_courses()
         except Exception as e:
             print(f"Error getting courses metadata: {e}")
             return []
 
+    def get_course_metadata(self, course_title: str) -> Optional[Dict[str, Any]]:
+        """Get one course's metadata and lessons, or None if it is not in the catalog"""
+        try:
+            return self.catalog.get_course(course_title)
+        except Exception as e:
+            print(f"Error getting course metadata: {e}")
+            return None
+
     def get_course_link(self, course_title: str) -> Optional[str]:
         """Get course link for a given course title"""
         try:
-            # Get course by ID (title is the ID)
-            results = self.course_catalog.get(ids=[course_title])
-            if results and 'metadatas' in results and results['metadatas']:
-                metadata = results['metadatas'][0]
-                return metadata.get('course_link')
-            return None
+            return self.catalog.get_course_link(course_title)
         except Exception as e:
             print(f"Error getting course link: {e}")
             return None
     
     def get_lesson_link(self, course_title: str, lesson_number: int) -> Optional[str]:
         """Get lesson link for a given course title and lesson number"""
-        import json
         try:
-            # Get course by ID (title is the ID)
-            results = self.course_catalog.get(ids=[course_title])
-            if results and 'metadatas' in results and results['metadatas']:
-                metadata = results['metadatas'][0]
-                lessons_json = metadata.get('lessons_json')
-                if lessons_json:
-                    lessons = json.loads(lessons_json)
-                    # Find the lesson with matching number
-                    for lesson in lessons:
-                        if lesson.get('lesson_number') == lesson_number:
-                            return lesson.get('lesson_link')
-            return None
+            return self.catalog.get_lesson_links([(course_title, lesson_number)])[(course_title, lesson_number)]
         except Exception as e:
             print(f"Error getting lesson link: {e}")
+            return None
+
+    def get_lesson_links(self, pairs: Iterable[Tuple[str, int]]) -> Dict[Tuple[str, int], Optional[str]]:
+        """
+        Get the links of many lessons in one catalog read.
+
+        Args:
+            pairs: (course title, lesson number) pairs; duplicates are looked up once
+
+        Returns:
+            Link per distinct pair (None when unknown, or for every pair if the catalog read fails)
+        """
+        pairs = list(pairs)
+        if not pairs:
+            return {}
+        try:
+            return self.catalog.get_lesson_links(pairs)
+        except Exception as e:
+            print(f"Error getting lesson links: {e}")
+            return dict.fromkeys(pairs)
     
\ No newline at end of file
@@ -12,5 +12,9 @@ fi
 echo "Starting Course Materials RAG System..."
 echo "Make sure you have set your ANTHROPIC_API_KEY in .env"
 
-# Change to backend directory and start the server
-cd backend && uv run uvicorn app:app --reload --port 8000
\ No newline at end of file
+# Development (auto-reload) by default; ./run.sh --prod for the tuned production server
+if [ "$1" = "--prod" ]; then
+    shift
+    exec uv run python backend/server.py "$@"
+fi
+exec uv run python backend/server.py --dev "$@"
\ No newline at end of file